@@ -5,10 +5,10 @@
  * @format
  */
 
-import React from 'react';
-import { NavigationContainer } from '@react-navigation/native';
+import React, { useEffect, useRef } from 'react';
+import { NavigationContainer, useNavigationContainerRef } from '@react-navigation/native';
 import { createStackNavigator } from '@react-navigation/stack';
-import { StatusBar, StyleSheet, useColorScheme, View } from 'react-native';
+import { Alert, Linking, StatusBar, StyleSheet, useColorScheme, View } from 'react-native';
 
 // Import screens
 import SplashScreen from './src/screens/SplashScreen';
@@ -16,14 +16,85 @@ import DriverLoginScreen from './src/screens/DriverLoginScreen';
 import PickupStartScreen from './src/screens/PickupStartScreen';
 import UpdatingStatsScreen from './src/screens/UpdatingStatsScreen';
 import FinalPickupScreen from './src/screens/FinalPickupScreen';
+import ApiService from './src/services/api';
+import CompletionQueue from './src/services/completionQueue';
+import SessionStore from './src/services/sessionStore';
+import { TRACING_CONFIG } from './src/utils/config';
+import { isDeviceCheckUrl, runDeviceCheck } from './src/utils/deviceCheck';
+import { tracer } from './src/utils/tracing';
 
 const Stack = createStackNavigator();
 
 function App() {
   const isDarkMode = useColorScheme() === 'dark';
+  const navigationRef = useNavigationContainerRef();
+  const currentScreen = useRef(null);
+
+  // Resume syncing stop completions queued before the app was closed
+  useEffect(() => {
+    tracer.configure({
+      enabled: TRACING_CONFIG.ENABLED,
+      serviceName: TRACING_CONFIG.SERVICE_NAME,
+      exportUrl: TRACING_CONFIG.EXPORT_URL,
+      batchSize: TRACING_CONFIG.BATCH_SIZE,
+    });
+    CompletionQueue.start();
+  }, []);
+
+  // adb_fleet.py's in-app login probe (see src/utils/deviceCheck.js)
+  useEffect(() => {
+    Linking.getInitialURL().then(url => isDeviceCheckUrl(url) && runDeviceCheck(url));
+    const subscription = Linking.addEventListener('url', ({ url }) => isDeviceCheckUrl(url) && runDeviceCheck(url));
+    return () => subscription.remove();
+  }, []);
+
+  // A completion the backend refused is no longer retried on its own: let the driver decide
+  useEffect(() => CompletionQueue.onFailure(failed => {
+    const photosMissing = failed.filter(item => item.failed.photoMissing).length;
+    if (photosMissing > 0) {
+      // Retrying cannot bring a deleted photo back; the stop can still be completed without it
+      Alert.alert(
+        'Stop not synced',
+        `The photo of ${photosMissing} completed stop(s) is no longer on this phone.`,
+        [
+          { text: 'Discard', style: 'destructive', onPress: () => CompletionQueue.discardFailed() },
+          { text: 'Send without photo', onPress: () => CompletionQueue.retryFailed({ withoutPhoto: true }) },
+        ]
+      );
+      return;
+    }
+    Alert.alert(
+      'Stop not synced',
+      `${failed.length} completed stop(s) were refused by the server: ${failed[0].failed.error}`,
+      [
+        { text: 'Discard', style: 'destructive', onPress: () => CompletionQueue.discardFailed() },
+        { text: 'Retry', onPress: () => CompletionQueue.retryFailed() },
+      ]
+    );
+  }), []);
+
+  // Dev instrumentation: session reads made while on each screen, and how
+  // many of them still reached AsyncStorage (the rest came from memory)
+  const logSessionReads = () => {
+    const next = navigationRef.getCurrentRoute()?.name;
+    const stats = SessionStore.takeStats();
+    const cache = ApiService.takeCacheStats();
+    if (__DEV__ && currentScreen.current && stats.reads > 0) {
+      console.log(`📊 ${currentScreen.current}: ${stats.reads} session reads, ${stats.storageReads} from storage, ${stats.writes} writes`);
+    }
+    if (__DEV__ && currentScreen.current && cache.hits + cache.misses + cache.coalesced > 0) {
+      console.log(`📊 ${currentScreen.current}: ${cache.hits + cache.coalesced} stop/pickup requests saved ` +
+        `(${cache.hits} cache hits, ${cache.coalesced} coalesced), ${cache.misses} sent`);
+    }
+    currentScreen.current = next;
+  };
 
   return (
-    <NavigationContainer>
+    <NavigationContainer
+      ref={navigationRef}
+      onReady={logSessionReads}
+      onStateChange={logSessionReads}
+    >
       <StatusBar barStyle={isDarkMode ? 'light-content' : 'dark-content'} />
       <Stack.Navigator 
         initialRouteName="Splash"
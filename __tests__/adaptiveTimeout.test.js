@@ -0,0 +1,114 @@
+/**
+ * @format
+ */
+
+import { adaptiveFetch, hedgeDelayFor, latencyStats, timeoutFor } from '../src/utils/adaptiveTimeout';
+
+const record = (endpoint, latencies) => latencies.forEach(ms => latencyStats.record(endpoint, ms));
+const repeat = (ms, count) => Array(count).fill(ms);
+
+// fetch() answering each call after the next delay, or rejecting like fetch when aborted first
+const respondAfter = delays =>
+  jest.fn(
+    (url, { signal }) =>
+      new Promise((resolve, reject) => {
+        const timer = setTimeout(() => resolve(new Response('{}', { status: 200 })), delays.shift());
+        signal.addEventListener('abort', () => {
+          clearTimeout(timer);
+          const error = new Error('Aborted');
+          error.name = 'AbortError';
+          reject(error);
+        });
+      })
+  );
+
+let realFetch;
+
+beforeEach(() => {
+  jest.useFakeTimers();
+  realFetch = global.fetch;
+  latencyStats.samples = {};
+  latencyStats.takeCounters();
+});
+
+afterEach(() => {
+  global.fetch = realFetch;
+  jest.useRealTimers();
+});
+
+describe('timeoutFor', () => {
+  test('keeps the fixed timeout until the endpoint has enough samples', () => {
+    record('GET stop', repeat(100, 19));
+    expect(timeoutFor('GET stop', 15000)).toBe(15000);
+
+    latencyStats.record('GET stop', 100);
+    expect(timeoutFor('GET stop', 15000)).toBe(2000);
+  });
+
+  test('is three times the p99, between MIN_TIMEOUT and the fixed timeout', () => {
+    record('GET stop', [...repeat(1000, 19), 1500]);
+    expect(timeoutFor('GET stop', 15000)).toBe(4500);
+
+    record('GET stops', repeat(10, 20));
+    expect(timeoutFor('GET stops', 15000)).toBe(2000);
+
+    record('GET progress', repeat(9000, 20));
+    expect(timeoutFor('GET progress', 15000)).toBe(15000);
+  });
+
+  test('forgets latencies older than the window', () => {
+    record('GET stop', repeat(4000, 100));
+    expect(timeoutFor('GET stop', 15000)).toBe(12000);
+
+    record('GET stop', repeat(200, 100));
+    expect(timeoutFor('GET stop', 15000)).toBe(2000);
+  });
+});
+
+describe('hedgeDelayFor', () => {
+  test('does not hedge until the endpoint has enough samples', () => {
+    record('GET stop', repeat(100, 19));
+    expect(hedgeDelayFor('GET stop')).toBeNull();
+  });
+
+  test('hedges after the p95, and never sooner than MIN_HEDGE_DELAY', () => {
+    record('GET stop', Array.from({ length: 20 }, (_, i) => (i + 1) * 10));
+    expect(hedgeDelayFor('GET stop')).toBe(190);
+
+    record('GET stops', repeat(10, 20));
+    expect(hedgeDelayFor('GET stops')).toBe(50);
+  });
+});
+
+describe('adaptiveFetch', () => {
+  test('retries an idempotent request once after it times out', async () => {
+    global.fetch = respondAfter([5000, 100]);
+    const response = adaptiveFetch('GET stop', 'http://backend/stop', {}, { timeout: 1000, idempotent: true });
+
+    await jest.advanceTimersByTimeAsync(1100);
+    await expect(response.then(r => r.status)).resolves.toBe(200);
+    expect(global.fetch).toHaveBeenCalledTimes(2);
+    expect(latencyStats.takeCounters()).toEqual({ requests: 2, timeouts: 1, retries: 1, hedged: 0, hedgeWins: 0 });
+  });
+
+  test('does not resend a request that is not idempotent', async () => {
+    global.fetch = respondAfter([5000, 100]);
+    const response = adaptiveFetch('POST complete', 'http://backend/complete', { method: 'POST' }, { timeout: 1000 });
+    const rejected = expect(response).rejects.toThrow('Aborted');
+
+    await jest.advanceTimersByTimeAsync(1100);
+    await rejected;
+    expect(global.fetch).toHaveBeenCalledTimes(1);
+  });
+
+  test('hedges a slow request after the p95 and aborts the slower copy', async () => {
+    record('GET stop', repeat(100, 20));
+    global.fetch = respondAfter([1500, 100]);
+    const response = adaptiveFetch('GET stop', 'http://backend/stop', {}, { timeout: 15000, idempotent: true });
+
+    await jest.advanceTimersByTimeAsync(200);
+    await expect(response.then(r => r.status)).resolves.toBe(200);
+    expect(global.fetch.mock.calls.map(([, options]) => options.signal.aborted)).toEqual([true, false]);
+    expect(latencyStats.takeCounters()).toEqual({ requests: 2, timeouts: 0, retries: 0, hedged: 1, hedgeWins: 1 });
+  });
+});
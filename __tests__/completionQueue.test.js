@@ -0,0 +1,141 @@
+/**
+ * @format
+ */
+
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import ApiService from '../src/services/api';
+import CompletionQueue from '../src/services/completionQueue';
+import PhotoUpload from '../src/services/photoUpload';
+
+jest.mock('@react-native-async-storage/async-storage', () =>
+  require('@react-native-async-storage/async-storage/jest/async-storage-mock'),
+);
+
+// Sequences sent by each request, and when each request was made
+let requests;
+let requestTimes;
+let online;
+
+const answer = (assignmentId, sequences) => {
+  requests.push(sequences);
+  requestTimes.push(Date.now());
+  if (!online) {
+    throw new Error('Network request failed');
+  }
+  return sequences;
+};
+
+const settle = () => jest.advanceTimersByTimeAsync(0);
+
+beforeEach(async () => {
+  jest.useFakeTimers();
+  jest.setSystemTime(new Date('2025-01-06T08:00:00Z'));
+  // No jitter: every retry waits 0.75 of its backoff
+  jest.spyOn(Math, 'random').mockReturnValue(0.5);
+  await AsyncStorage.clear();
+
+  CompletionQueue.draining = false;
+  CompletionQueue.drainRequested = false;
+  CompletionQueue.batchSupported = null;
+  CompletionQueue.pendingUpdate = Promise.resolve();
+
+  requests = [];
+  requestTimes = [];
+  online = false;
+  jest.spyOn(PhotoUpload, 'prepare').mockImplementation(async item => item);
+  jest.spyOn(PhotoUpload, 'forget').mockResolvedValue();
+  jest.spyOn(ApiService, 'completeAssignmentStopWithPhoto').mockImplementation(async (assignmentId, sequence) => {
+    answer(assignmentId, [sequence]);
+    return { success: true, completed_sequence: sequence };
+  });
+  jest.spyOn(ApiService, 'completeAssignmentStopsBatch').mockImplementation(async (assignmentId, batch) => {
+    const sequences = answer(assignmentId, batch.map(item => item.sequence));
+    return { success: true, results: sequences.map(sequence => ({ sequence, success: true })) };
+  });
+});
+
+afterEach(() => {
+  jest.restoreAllMocks();
+  jest.useRealTimers();
+});
+
+describe('CompletionQueue', () => {
+  test('sends stops completed during an outage behind the head, in order, in one batch', async () => {
+    await CompletionQueue.enqueue(7, 1, { weight: 3 });
+    await jest.advanceTimersByTimeAsync(2000);
+    // The first attempt and its two quick retries
+    expect(requests).toEqual([[1], [1], [1]]);
+
+    // Stops completed while stop 1 backs off wait behind it instead of going out on their own
+    await CompletionQueue.enqueue(7, 2, { weight: 4 });
+    await CompletionQueue.enqueue(7, 3, { weight: 5 });
+    await CompletionQueue.enqueue(7, 4, { weight: 6 });
+    await settle();
+    expect(requests).toHaveLength(3);
+
+    await jest.advanceTimersByTimeAsync(3000);
+    expect(requests.slice(3)).toEqual([[1, 2, 3, 4], [1, 2, 3, 4], [1, 2, 3, 4]]);
+
+    online = true;
+    await CompletionQueue.enqueue(7, 5, { weight: 7 });
+    await settle();
+    expect(requests).toHaveLength(6);
+
+    await jest.advanceTimersByTimeAsync(10000);
+    expect(requests.slice(6)).toEqual([[1, 2, 3, 4, 5]]);
+    await expect(CompletionQueue.pendingCount()).resolves.toBe(0);
+  });
+
+  test('backs off exponentially from the end of each attempt', async () => {
+    const start = Date.now();
+    await CompletionQueue.enqueue(7, 1, { weight: 3 });
+    await jest.advanceTimersByTimeAsync(20000);
+
+    // Each attempt is three requests (500 ms and 1 s apart), then waits 1.5 s, 3 s, 6 s
+    const attemptStarts = requestTimes.filter((_, i) => i % 3 === 0).map(at => at - start);
+    expect(attemptStarts).toEqual([0, 3000, 7500, 15000]);
+  });
+
+  test('keeps one head of line per assignment', async () => {
+    await CompletionQueue.enqueue(7, 1, { weight: 3 });
+    await jest.advanceTimersByTimeAsync(2000);
+
+    // Another assignment's stop does not wait for assignment 7's backoff
+    online = true;
+    await CompletionQueue.enqueue(8, 1, { weight: 4 });
+    await settle();
+    expect(ApiService.completeAssignmentStopWithPhoto.mock.calls.map(call => call.slice(0, 2)))
+      .toEqual([[7, 1], [7, 1], [7, 1], [8, 1]]);
+    await expect(CompletionQueue.pendingCount()).resolves.toBe(1);
+
+    await jest.advanceTimersByTimeAsync(2000);
+    await expect(CompletionQueue.pendingCount()).resolves.toBe(0);
+  });
+
+  test('fails a completion whose photo is gone from the phone and sends it without the photo on request', async () => {
+    const fetch = global.fetch;
+    global.fetch = jest.fn(() => Promise.reject(new TypeError('Network request failed')));
+    PhotoUpload.prepare.mockRestore();
+    online = true;
+    const failures = [];
+    const unsubscribe = CompletionQueue.onFailure(items => failures.push(...items));
+    try {
+      await CompletionQueue.enqueue(7, 1, { weight: 3, image: { uri: 'file:///cache/photo_1.jpg' } });
+      await CompletionQueue.enqueue(7, 2, { weight: 4 });
+      await settle();
+
+      // Stop 2 does not wait behind a photo that no retry can bring back
+      expect(failures.map(item => [item.sequence, item.failed.photoMissing])).toEqual([[1, true]]);
+      expect(requests).toEqual([[2]]);
+
+      await CompletionQueue.retryFailed({ withoutPhoto: true });
+      await settle();
+      expect(requests).toEqual([[2], [1]]);
+      expect(ApiService.completeAssignmentStopWithPhoto.mock.calls[1][2].image).toBeNull();
+      await expect(CompletionQueue.failed()).resolves.toEqual([]);
+    } finally {
+      unsubscribe();
+      global.fetch = fetch;
+    }
+  });
+});
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Parallel verification of every attached Android test device
+
+Enumerates `adb devices` and, for each device in a worker pool
+(`adb -s <serial>` per command):
+
+  1. sets up the reverse forward of the backend port and checks it is listed
+  2. checks the Vehicle_App package is installed
+  3. times a v2 login made by the app on the device through the reverse
+     forward: `am start` opens a vehicleapp://device-check link, the app
+     posts the login and logs the status and time, read back from logcat
+     (stock Android has no curl; see src/utils/deviceCheck.js)
+
+and prints one row per device with each step's result and latency.
+Devices that are offline or unauthorized are listed and skipped. The
+target must be served on this machine (a reverse forward only reaches
+local ports); its scheme and path prefix are kept on the device.
+
+    python adb_fleet.py --workers 16
+    python adb_fleet.py --adb "python3 fake_adb.py"      # no phones needed
+
+fake_adb.py stands in for adb with a configurable number of simulated
+devices. verify_vehicle_app_connection.py and test_adb_connection.py run
+the same fleet check with --fleet.
+"""
+
+import argparse
+import os
+import re
+import shlex
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+from vehicle_client import TEST_CREDENTIALS, add_target_argument, resolve_target
+
+APP_PACKAGE = "com.vehicle_app"
+
+ADB_ENV_VAR = "ADB"
+
+# In-app login probe (src/utils/deviceCheck.js) and the logcat line it answers with
+DEVICE_CHECK_URI = "vehicleapp://device-check"
+DEVICE_CHECK_LOG = re.compile(r"VehicleAppCheck id=(?P<id>\S+) status=(?P<status>\d+) ms=(?P<ms>[\d.]+)")
+LOGCAT_TAG = "ReactNativeJS"
+
+# App start plus the app's 30 s login timeout
+DEVICE_CHECK_TIMEOUT_S = 45.0
+DEVICE_CHECK_POLL_S = 0.5
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+def add_fleet_arguments(parser):
+    """Add the shared --adb / --workers / --adb-timeout options to an argparse parser"""
+    parser.add_argument("--adb", default=None,
+                        help=f"adb command, e.g. a shim like 'python3 fake_adb.py' (default: ${ADB_ENV_VAR} or adb)")
+    parser.add_argument("--workers", type=int, default=8, help="devices verified at once")
+    parser.add_argument("--adb-timeout", type=float, default=30.0, help="seconds before one adb command is abandoned")
+
+
+class Adb:
+    """Runs adb commands, optionally against one device, and times them"""
+
+    def __init__(self, command=None, timeout_s=30.0):
+        self.command = shlex.split(command or os.environ.get(ADB_ENV_VAR) or "adb")
+        self.timeout_s = timeout_s
+
+    def run(self, *args, serial=None):
+        """(CompletedProcess or None on timeout/missing adb, elapsed ms)"""
+        argv = self.command + (["-s", serial] if serial else []) + list(args)
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(argv, capture_output=True, text=True, timeout=self.timeout_s)
+        except (OSError, subprocess.TimeoutExpired):
+            result = None
+        return result, (time.perf_counter() - start) * 1000.0
+
+    def devices(self):
+        """[(serial, state)] from `adb devices`; state is 'device' when usable"""
+        result, _ = self.run("devices")
+        if result is None or result.returncode != 0:
+            raise RuntimeError(f"'{' '.join(self.command)} devices' failed"
+                               + (f": {result.stderr.strip()}" if result is not None else ""))
+        devices = []
+        for line in result.stdout.splitlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 2:
+                devices.append((parts[0], parts[1]))
+        return devices
+
+
+def _step(ok, ms, detail=""):
+    return {"ok": ok, "ms": ms, "detail": detail}
+
+
+def verify_device(adb, serial, device_url, credentials=None):
+    """Reverse forward, package check and in-device login timing for one device"""
+    credentials = credentials or TEST_CREDENTIALS
+    port = urlparse(device_url).port
+    started = time.perf_counter()
+    row = {"serial": serial}
+
+    result, _ = adb.run("shell", "getprop", "ro.product.model", serial=serial)
+    row["model"] = result.stdout.strip() if result is not None and result.returncode == 0 else ""
+
+    forward = f"tcp:{port}"
+    result, ms = adb.run("reverse", forward, forward, serial=serial)
+    if result is not None and result.returncode == 0:
+        listed, list_ms = adb.run("reverse", "--list", serial=serial)
+        ok = listed is not None and f"{forward} {forward}" in listed.stdout
+        row["reverse"] = _step(ok, ms + list_ms, "" if ok else "not listed after setup")
+    else:
+        row["reverse"] = _step(False, ms, result.stderr.strip() if result is not None else "adb timed out")
+
+    result, ms = adb.run("shell", "pm", "list", "packages", APP_PACKAGE, serial=serial)
+    installed = result is not None and f"package:{APP_PACKAGE}" in result.stdout.split()
+    row["package"] = _step(installed, ms, "" if installed else "not installed")
+
+    if not row["reverse"]["ok"]:
+        row["login"] = _step(False, None, "skipped: no reverse forward")
+    elif not installed:
+        row["login"] = _step(False, None, "skipped: app not installed")
+    else:
+        row["login"] = _device_login(adb, serial, device_url, credentials)
+
+    row["total_ms"] = (time.perf_counter() - started) * 1000.0
+    row["ok"] = all(row[step]["ok"] for step in ("reverse", "package", "login"))
+    return row
+
+
+def _device_login(adb, serial, device_url, credentials):
+    """Login timing as measured by the app on the device; adb's own overhead is left out"""
+    check_id = uuid.uuid4().hex[:12]
+    link = f"{DEVICE_CHECK_URI}?" + urlencode({
+        "id": check_id,
+        "backend": device_url,
+        "vehicle": credentials["vehicle_number"],
+        "dl": credentials["driving_license"],
+    })
+    started = time.perf_counter()
+    result, ms = adb.run("shell", "am", "start", "-W", "-a", "android.intent.action.VIEW",
+                         "-d", shlex.quote(link), APP_PACKAGE, serial=serial)
+    if result is None:
+        return _step(False, ms, "adb timed out")
+    if result.returncode != 0 or "Error" in result.stdout + result.stderr:
+        detail = (result.stderr or result.stdout).strip().splitlines()
+        return _step(False, ms, detail[-1] if detail else "am start failed")
+
+    while time.perf_counter() - started < DEVICE_CHECK_TIMEOUT_S:
+        logcat, _ = adb.run("logcat", "-t", "500", "-s", f"{LOGCAT_TAG}:I", serial=serial)
+        for match in DEVICE_CHECK_LOG.finditer(logcat.stdout if logcat is not None else ""):
+            if match["id"] == check_id:
+                status, device_ms = int(match["status"]), float(match["ms"])
+                if status == 0:
+                    return _step(False, device_ms, "connection failed")
+                # 401 means the backend answered; the fleet's test phones need not hold the test credentials
+                return _step(status < 500, device_ms, f"HTTP {status}")
+        time.sleep(DEVICE_CHECK_POLL_S)
+    return _step(False, (time.perf_counter() - started) * 1000.0, "no answer from the app in logcat")
+
+
+def verify_fleet(adb, device_url, workers=8):
+    """
+    Verify every attached device in parallel against `device_url` (see device_backend_url)
+
+    Returns (rows for usable devices in serial order, [(serial, state)] skipped)
+    """
+    devices = adb.devices()
+    ready = sorted(serial for serial, state in devices if state == "device")
+    skipped = [(serial, state) for serial, state in devices if state != "device"]
+    if not ready:
+        return [], skipped
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ready)))) as pool:
+        rows = list(pool.map(lambda serial: verify_device(adb, serial, device_url), ready))
+    return rows, skipped
+
+
+def device_backend_url(base_url):
+    """
+    The backend as the devices reach it through `adb reverse`: same scheme,
+    port and path prefix, on the device's own localhost
+
+    Raises ValueError for a target not served on this machine; a reverse
+    forward cannot reach it (the devices talk to a remote backend directly).
+    """
+    parsed = urlparse(base_url)
+    if parsed.hostname not in LOCAL_HOSTS:
+        raise ValueError(f"{base_url} is not served on this machine; adb reverse only forwards local ports "
+                         f"(use --target local or a localhost URL)")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return f"{parsed.scheme}://localhost:{port}{parsed.path.rstrip('/')}"
+
+
+def _cell(step):
+    if step["ms"] is None:
+        return f"{'—':>10}"
+    return f"{'✅' if step['ok'] else '❌'}{step['ms']:>7.0f}ms"
+
+
+def print_fleet_report(rows, skipped, elapsed_s, workers):
+    print("\n" + "=" * 60)
+    print(f"📱 Device Fleet ({len(rows)} devices, {workers} workers, {elapsed_s:.1f}s)")
+    print("=" * 60)
+    print(f"{'Serial':<22} {'Model':<16} {'reverse':>10} {'package':>10} {'login':>10} {'total':>9}")
+    for row in rows:
+        print(f"{row['serial']:<22} {row['model'][:16]:<16} {_cell(row['reverse'])} {_cell(row['package'])} "
+              f"{_cell(row['login'])} {row['total_ms']:>7.0f}ms")
+        problems = [f"{step}: {row[step]['detail']}" for step in ("reverse", "package", "login")
+                    if not row[step]["ok"] and row[step]["detail"]]
+        if problems:
+            print(f"   {'; '.join(problems)}")
+    for serial, state in skipped:
+        print(f"{serial:<22} ⚠️ skipped ({state})")
+
+    ready = sum(row["ok"] for row in rows)
+    login_ms = sorted(row["login"]["ms"] for row in rows if row["login"]["ok"])
+    print(f"\n📈 {ready}/{len(rows)} devices ready")
+    if login_ms:
+        print(f"⏱️ In-device login: median {login_ms[len(login_ms) // 2]:.0f} ms, slowest {login_ms[-1]:.0f} ms")
+    serial_s = sum(row["total_ms"] for row in rows) / 1000.0
+    if rows:
+        print(f"⚡ One device at a time would have taken {serial_s:.1f}s")
+
+
+def run_fleet_check(base_url, adb_command=None, workers=8, adb_timeout=30.0):
+    """Verify the fleet and print the report; returns True when every device is ready"""
+    adb = Adb(adb_command, adb_timeout)
+    try:
+        device_url = device_backend_url(base_url)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    print(f"\n📱 Verifying all attached devices (reverse tcp:{urlparse(device_url).port}, {APP_PACKAGE}, "
+          f"login at {device_url})")
+    start = time.perf_counter()
+    try:
+        rows, skipped = verify_fleet(adb, device_url, workers)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return False
+    if not rows and not skipped:
+        print("❌ No devices attached")
+        return False
+    print_fleet_report(rows, skipped, time.perf_counter() - start, workers)
+    return bool(rows) and all(row["ok"] for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify every attached test device in parallel")
+    add_target_argument(parser, default="local")
+    add_fleet_arguments(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    print("📱 Vehicle_App Device Fleet Verification")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    if not run_fleet_check(base_url, args.adb, args.workers, args.adb_timeout):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Multi-area login contention benchmark
+
+Many drivers from different areas authenticate at the same time, in
+three ways:
+
+  switch   - POST /api/areas/switch, then authenticate (today's contract).
+             The area is global server state, so drivers of different
+             areas overwrite each other's setting between the two calls.
+  locked   - the same, but a client-side lock keeps switch + authenticate
+             atomic: correct, but every login in the fleet is serialized.
+  scoped   - the area travels with the authenticate request (X-Area header).
+
+A login is correct when the answered assignment belongs to the driver's
+area (backends that do not echo "area" cannot be checked). Reports
+logins/s, latency and wrong-area logins per mode:
+
+    python standin_backend.py --port 5000 --latency-ms 30 &
+    python area_contention_benchmark.py --drivers 40 --logins 10
+
+Each mode is saved as its own run in the results store (tool
+"area_contention_benchmark <mode>"); a wrong-area login is stored with
+the error class "wrong_area".
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from results_store import ResultsStore, add_results_argument, open_run, resolve_results_db
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+from vehicle_load import classify_exception, percentile
+
+MODES = ("switch", "locked", "scoped")
+
+
+def credentials_for(area, driver_index):
+    prefix = area.upper()[:2]
+    return {
+        "vehicle_number": f"{prefix}01AB{driver_index:04d}",
+        "driving_license": f"{prefix}{driver_index:013d}",
+    }
+
+
+def login(client, mode, area, credentials, switch_lock):
+    """One login; returns the area the backend answered for"""
+    if mode == "scoped":
+        response = client.post("/api/driver/authenticate/v2", json=credentials, area=area)
+    elif mode == "locked":
+        with switch_lock:
+            client.post("/api/areas/switch", json={"area": area}).raise_for_status()
+            response = client.post("/api/driver/authenticate/v2", json=credentials)
+    else:
+        client.post("/api/areas/switch", json={"area": area}).raise_for_status()
+        response = client.post("/api/driver/authenticate/v2", json=credentials)
+    response.raise_for_status()
+    return response.json().get("area")
+
+
+def run_driver(base_url, mode, area, driver_index, logins, switch_lock, start_barrier, sink=None):
+    credentials = credentials_for(area, driver_index)
+    latencies, wrong_area, unverified, errors = [], 0, 0, 0
+    with VehicleClient(base_url, pool_size=1) as client:
+        start_barrier.wait()
+        for _ in range(logins):
+            start = time.perf_counter()
+            try:
+                answered = login(client, mode, area, credentials, switch_lock)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                errors += 1
+                if sink is not None:
+                    error_class = (classify_exception(e) if isinstance(e, requests.exceptions.RequestException)
+                                   else "bad_response")
+                    sink.record("login", (time.perf_counter() - start) * 1000.0, error_class)
+                continue
+            latency_ms = (time.perf_counter() - start) * 1000.0
+            latencies.append(latency_ms)
+            if answered is None:
+                unverified += 1
+            elif answered != area:
+                wrong_area += 1
+            if sink is not None:
+                sink.record("login", latency_ms, "wrong_area" if answered not in (None, area) else "ok")
+    return latencies, wrong_area, unverified, errors
+
+
+def run_mode(base_url, mode, areas, drivers, logins, sink=None):
+    switch_lock = threading.Lock()
+    start_barrier = threading.Barrier(drivers + 1)
+    with ThreadPoolExecutor(max_workers=drivers) as pool:
+        futures = [
+            pool.submit(run_driver, base_url, mode, areas[i % len(areas)], i, logins, switch_lock,
+                        start_barrier, sink)
+            for i in range(drivers)
+        ]
+        start_barrier.wait()
+        start = time.perf_counter()
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms for result in results for ms in result[0])
+    return {
+        "mode": mode,
+        "logins": len(latencies),
+        "wrong_area": sum(result[1] for result in results),
+        "unverified": sum(result[2] for result in results),
+        "errors": sum(result[3] for result in results),
+        "logins_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "elapsed_s": elapsed,
+    }
+
+
+def print_contention_report(results, areas, drivers):
+    print("\n" + "=" * 60)
+    print(f"🌍 Concurrent Logins Across {', '.join(areas)} ({drivers} drivers)")
+    print("=" * 60)
+    print(f"{'mode':<8} {'logins':>7} {'logins/s':>9} {'p50':>9} {'p95':>9} {'wrong area':>11} {'errors':>7}")
+    for r in results:
+        p50 = f"{r['p50_ms']:.0f}ms" if r["p50_ms"] is not None else "n/a"
+        p95 = f"{r['p95_ms']:.0f}ms" if r["p95_ms"] is not None else "n/a"
+        print(f"{r['mode']:<8} {r['logins']:>7} {r['logins_per_s']:>9.1f} {p50:>9} {p95:>9} "
+              f"{r['wrong_area']:>11} {r['errors']:>7}")
+
+    for r in results:
+        if r["wrong_area"]:
+            print(f"\n❌ {r['mode']}: {r['wrong_area']} of {r['logins']} logins "
+                  f"({r['wrong_area'] / r['logins']:.1%}) got another area's assignment")
+    if any(r["unverified"] for r in results):
+        print("\n⚠️ The backend does not echo the area, so some logins could not be checked")
+    scoped = next((r for r in results if r["mode"] == "scoped"), None)
+    if scoped and scoped["logins"] and not scoped["wrong_area"] and not scoped["errors"]:
+        print("\n✅ Area-scoped logins were all correct")
+    elif scoped and scoped["wrong_area"]:
+        print("\n⚠️ The backend ignores the area parameter; scoped logins fell back to the global area")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-area login benchmark")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--areas", default="delhi,gurugram", help="comma-separated areas to mix")
+    parser.add_argument("--drivers", type=int, default=40, help="concurrent drivers, spread over the areas")
+    parser.add_argument("--logins", type=int, default=10, help="logins per driver per mode")
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    areas = args.areas.split(",")
+    print("🌍 Vehicle App Area Contention Benchmark")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{args.drivers} drivers x {args.logins} logins per mode")
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    results = []
+    # One results file connection for every mode's run
+    store = None if args.no_results else ResultsStore(resolve_results_db(args.results_db))
+    try:
+        for mode in modes:
+            print(f"🔐 Running {mode} logins...")
+            stored = open_run(args, f"area_contention_benchmark {mode}", base_url, store)
+            results.append(run_mode(base_url, mode, areas, args.drivers, args.logins, stored))
+            if stored:
+                stored.finish()
+    finally:
+        if store is not None:
+            store.close()
+    print_contention_report(results, areas, args.drivers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+One entry point for the Vehicle App verification checks, run as a DAG
+
+The verification scripts (verify_vehicle_app_connection.py,
+test_vehicle_app_connection.py, test_mobile_connection.py,
+test_vehicle_app_login.py, test_vehicle_app_live.py, test_adb_connection.py)
+repeat the same handful of checks one after another. Here each check is
+run once, as soon as the checks it needs have passed, with independent
+checks in parallel:
+
+    backend_status   pickup_areas   current_area   authenticate_v1   invalid_credentials
+    authenticate_v2 ──┬── assignment_stop        (the driver's current stop)
+                      ├── assignment_stops
+                      └── assignment_progress
+    devices          (with --devices: adb_fleet.py over every attached phone)
+
+authenticate_v2 hands the assignment ID and current sequence of the test
+driver to the checks after it. A check whose dependency failed is
+skipped, so a verification takes about as long as its slowest chain.
+
+    python check_runner.py --target lan
+    python check_runner.py --target local --json > checks.json
+    python check_runner.py --only assignment_stop      # and what it needs
+
+Exits 1 when any check fails.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from adb_fleet import Adb, add_fleet_arguments, device_backend_url, verify_fleet
+from vehicle_client import TEST_CREDENTIALS, VehicleClient, add_target_argument, resolve_target
+
+# Fields the app reads from the v2 login response (see test_mobile_connection.py)
+LOGIN_FIELDS = ("assignment_id", "driver_dl", "vehicle_no", "total_stops", "driver_name", "route_date",
+                "current_stop")
+
+INVALID_CREDENTIALS = {"vehicle_number": "INVALID123", "driving_license": "INVALID456"}
+
+
+class CheckResult:
+    """Outcome of one check: status is pass, warn or fail; outputs feed the checks that need it"""
+
+    def __init__(self, status, detail="", **outputs):
+        self.status = status
+        self.detail = detail
+        self.outputs = outputs
+
+
+class Check:
+    """A named check, the checks whose outputs it needs and the function that runs it"""
+
+    def __init__(self, name, run, needs=(), description=""):
+        self.name = name
+        self.run = run
+        self.needs = tuple(needs)
+        self.description = description
+
+
+def _status_result(response, expected=(200,)):
+    if response.status_code in expected:
+        return None
+    return CheckResult("fail", f"HTTP {response.status_code}: {response.text[:100]}")
+
+
+def check_backend_status(client, inputs, args):
+    response = client.get("/")
+    return _status_result(response) or CheckResult("pass", response.json().get("message", "backend answered"))
+
+
+def check_pickup_areas(client, inputs, args):
+    response = client.get("/api/pickup/areas")
+    failed = _status_result(response)
+    if failed:
+        return failed
+    areas = response.json().get("areas", [])
+    return CheckResult("pass" if areas else "warn", f"{len(areas)} areas: {', '.join(map(str, areas))}",
+                       areas=areas)
+
+
+def check_current_area(client, inputs, args):
+    response = client.get("/api/areas/current")
+    failed = _status_result(response)
+    if failed:
+        return failed
+    data = response.json()
+    if not data.get("success"):
+        return CheckResult("fail", data.get("error", "Unknown error"))
+    return CheckResult("pass", f"{data['current_area']} ({data.get('config', {}).get('city', 'n/a')})",
+                       area=data["current_area"])
+
+
+def check_authenticate_v2(client, inputs, args):
+    response = client.post("/api/driver/authenticate/v2", json=args.credentials)
+    failed = _status_result(response)
+    if failed:
+        return failed
+    data = response.json()
+    missing = [field for field in LOGIN_FIELDS if not data.get(field)]
+    sequence = data.get("current_sequence") or (data.get("current_stop") or {}).get("sequence") or 1
+    outputs = {"assignment_id": data.get("assignment_id"), "sequence": sequence,
+               "total_stops": data.get("total_stops")}
+    if outputs["assignment_id"] is None:
+        return CheckResult("fail", "no assignment_id in the login response")
+    detail = f"assignment {outputs['assignment_id']}, stop {sequence}/{outputs['total_stops']}"
+    if missing:
+        return CheckResult("warn", f"{detail}; missing fields {', '.join(missing)}", **outputs)
+    return CheckResult("pass", detail, **outputs)
+
+
+def check_authenticate_v1(client, inputs, args):
+    credentials = {"vehicle_number": args.credentials["vehicle_number"],
+                   "dl_number": args.credentials["driving_license"]}
+    response = client.post("/api/driver/authenticate", json=credentials)
+    if response.status_code == 404:
+        try:
+            # The backend's own 404 (no assignment for these credentials) is JSON
+            return CheckResult("fail", response.json().get("error", "HTTP 404"))
+        except ValueError:
+            return CheckResult("warn", "legacy endpoint not found (the app uses v2)")
+    return _status_result(response) or CheckResult("pass", "legacy login answered")
+
+
+def check_invalid_credentials(client, inputs, args):
+    response = client.post("/api/driver/authenticate/v2", json=INVALID_CREDENTIALS)
+    if response.status_code in (400, 404):
+        return CheckResult("pass", f"rejected with HTTP {response.status_code}")
+    return CheckResult("fail", f"expected 400/404 for unknown credentials, got HTTP {response.status_code}")
+
+
+def check_assignment_stop(client, inputs, args):
+    login = inputs["authenticate_v2"]
+    response = client.get(f"/api/assignments/{login['assignment_id']}/stops/{login['sequence']}")
+    failed = _status_result(response)
+    if failed:
+        return failed
+    stop = response.json().get("stop", {})
+    return CheckResult("pass", f"stop {login['sequence']}: {stop.get('name_snapshot', 'N/A')}")
+
+
+def check_assignment_stops(client, inputs, args):
+    login = inputs["authenticate_v2"]
+    response = client.get(f"/api/assignments/{login['assignment_id']}/stops")
+    failed = _status_result(response)
+    if failed:
+        return failed
+    stops = response.json().get("stops", [])
+    if login["total_stops"] and len(stops) != login["total_stops"]:
+        return CheckResult("warn", f"{len(stops)} stops listed, login said {login['total_stops']}")
+    return CheckResult("pass", f"{len(stops)} stops")
+
+
+def check_assignment_progress(client, inputs, args):
+    login = inputs["authenticate_v2"]
+    response = client.get(f"/api/assignments/{login['assignment_id']}/progress")
+    failed = _status_result(response)
+    if failed:
+        return failed
+    data = response.json()
+    return CheckResult("pass", f"{data.get('completed_stops', 'n/a')}/{data.get('total_stops', 'n/a')} completed, "
+                               f"next {data.get('next_sequence', 'n/a')}")
+
+
+def check_devices(client, inputs, args):
+    adb = Adb(args.adb, args.adb_timeout)
+    try:
+        rows, skipped = verify_fleet(adb, device_backend_url(client.base_url), args.workers)
+    except (RuntimeError, ValueError) as e:
+        return CheckResult("fail", str(e))
+    if not rows:
+        return CheckResult("fail", "no devices attached")
+    failed = [row["serial"] for row in rows if not row["ok"]]
+    devices = [{"serial": row["serial"], "ok": row["ok"], "login_ms": row["login"]["ms"]} for row in rows]
+    detail = f"{len(rows) - len(failed)}/{len(rows)} devices ready"
+    if skipped:
+        detail += f", {len(skipped)} skipped ({', '.join(state for _, state in skipped)})"
+    if failed:
+        return CheckResult("fail", f"{detail}; not ready: {', '.join(failed)}", devices=devices)
+    return CheckResult("warn" if skipped else "pass", detail, devices=devices)
+
+
+CHECKS = [
+    Check("backend_status", check_backend_status, description="GET /"),
+    Check("pickup_areas", check_pickup_areas, description="GET /api/pickup/areas"),
+    Check("current_area", check_current_area, description="GET /api/areas/current"),
+    Check("authenticate_v2", check_authenticate_v2, description="POST /api/driver/authenticate/v2"),
+    Check("authenticate_v1", check_authenticate_v1, description="POST /api/driver/authenticate (legacy)"),
+    Check("invalid_credentials", check_invalid_credentials, description="v2 login with unknown credentials"),
+    Check("assignment_stop", check_assignment_stop, needs=["authenticate_v2"],
+          description="GET /api/assignments/{id}/stops/{sequence}"),
+    Check("assignment_stops", check_assignment_stops, needs=["authenticate_v2"],
+          description="GET /api/assignments/{id}/stops"),
+    Check("assignment_progress", check_assignment_progress, needs=["authenticate_v2"],
+          description="GET /api/assignments/{id}/progress"),
+]
+
+DEVICE_CHECK = Check("devices", check_devices, description="adb reverse, package and login on every device")
+
+
+def select_checks(checks, only=None):
+    """`checks` limited to the names in `only` plus everything they need, in table order"""
+    by_name = {check.name: check for check in checks}
+    for check in checks:
+        unknown = [need for need in check.needs if need not in by_name]
+        if unknown:
+            raise ValueError(f"Check '{check.name}' needs unknown check(s): {', '.join(unknown)}")
+    if not only:
+        return list(checks)
+    wanted, pending = set(), list(only)
+    while pending:
+        name = pending.pop()
+        if name not in by_name:
+            raise ValueError(f"Unknown check '{name}' (expected one of {', '.join(by_name)})")
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].needs)
+    return [check for check in checks if check.name in wanted]
+
+
+def _run_one(check, client, inputs, args, started):
+    start = time.perf_counter()
+    try:
+        result = check.run(client, inputs, args)
+    except requests.exceptions.RequestException as e:
+        result = CheckResult("fail", f"request failed: {e}")
+    except (ValueError, KeyError) as e:
+        result = CheckResult("fail", f"unexpected response: {e}")
+    except Exception as e:
+        # A bug in one check fails that check; an escaping exception would abort the whole run
+        result = CheckResult("fail", f"check raised {type(e).__name__}: {e}")
+    end = time.perf_counter()
+    return {
+        "name": check.name,
+        "description": check.description,
+        "needs": list(check.needs),
+        "status": result.status,
+        "detail": result.detail,
+        "outputs": result.outputs,
+        "started_ms": round((start - started) * 1000.0, 1),
+        "duration_ms": round((end - start) * 1000.0, 1),
+    }
+
+
+def _skipped(check, detail):
+    return {"name": check.name, "description": check.description, "needs": list(check.needs),
+            "status": "skipped", "detail": detail, "outputs": {}, "started_ms": None, "duration_ms": None}
+
+
+def run_checks(checks, client, args, concurrency=8, on_result=None):
+    """
+    Run `checks` as a DAG: each starts once all its needs passed (or warned)
+
+    A check with a failed or skipped need is skipped. Returns the results
+    in table order and the wall-clock time in ms.
+    """
+    results = {}
+    pending = list(checks)
+    running = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while pending or running:
+            released = True
+            while released:
+                # A skipped check can release its own dependents, so repeat until nothing changes
+                released = False
+                for check in list(pending):
+                    needs = [results.get(need) for need in check.needs]
+                    if any(need is None for need in needs):
+                        continue
+                    pending.remove(check)
+                    released = True
+                    blocked = [need["name"] for need in needs if need["status"] in ("fail", "skipped")]
+                    if blocked:
+                        results[check.name] = _skipped(check, f"needs {', '.join(blocked)}")
+                        if on_result:
+                            on_result(results[check.name])
+                        continue
+                    inputs = {need["name"]: need["outputs"] for need in needs}
+                    running[pool.submit(_run_one, check, client, inputs, args, started)] = check
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[running.pop(future).name] = result
+                if on_result:
+                    on_result(result)
+    for check in pending:
+        results[check.name] = _skipped(check, "dependency cycle")
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    return [results[check.name] for check in checks], elapsed_ms
+
+
+def slowest_chain(results):
+    """(ms, [names]) of the dependency chain with the largest summed duration"""
+    by_name = {result["name"]: result for result in results}
+    memo = {}
+
+    def chain(name):
+        if name not in memo:
+            result = by_name[name]
+            best = max((chain(need) for need in result["needs"]), default=(0.0, []))
+            memo[name] = (best[0] + (result["duration_ms"] or 0.0), best[1] + [name])
+        return memo[name]
+
+    return max((chain(result["name"]) for result in results), default=(0.0, []))
+
+
+STATUS_ICONS = {"pass": "✅", "warn": "⚠️", "fail": "❌", "skipped": "⏭️"}
+
+
+def print_result(result):
+    duration = f"{result['duration_ms']:>7.0f}ms" if result["duration_ms"] is not None else f"{'—':>9}"
+    print(f"{STATUS_ICONS[result['status']]} {result['name']:<22} {duration}  {result['detail']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Vehicle App verification checks as a dependency graph")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--only", action="append", metavar="CHECK",
+                        help="run only this check and what it needs (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=8, help="checks in flight at once")
+    parser.add_argument("--vehicle-number", default=TEST_CREDENTIALS["vehicle_number"])
+    parser.add_argument("--driving-license", default=TEST_CREDENTIALS["driving_license"])
+    parser.add_argument("--devices", action="store_true", help="also verify every attached device over adb")
+    add_fleet_arguments(parser)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON instead of a table")
+    args = parser.parse_args()
+    args.credentials = {"vehicle_number": args.vehicle_number, "driving_license": args.driving_license}
+
+    base_url = resolve_target(args.target, default="local")
+    try:
+        checks = select_checks(CHECKS + ([DEVICE_CHECK] if args.devices else []), args.only)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not args.json:
+        print("🧭 Vehicle App Check Runner")
+        print("=" * 60)
+        print(f"Target: {base_url}")
+        print(f"{len(checks)} checks, up to {args.concurrency} at once\n")
+
+    with VehicleClient(base_url, pool_size=args.concurrency) as client:
+        results, elapsed_ms = run_checks(checks, client, args, args.concurrency,
+                                         on_result=None if args.json else print_result)
+    chain_ms, chain = slowest_chain(results)
+    passed = all(result["status"] in ("pass", "warn") for result in results)
+
+    if args.json:
+        json.dump({
+            "target": base_url,
+            "passed": passed,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "slowest_chain": {"checks": chain, "duration_ms": round(chain_ms, 1)},
+            "checks": results,
+        }, sys.stdout, indent=2)
+        print()
+    else:
+        counts = {status: sum(r["status"] == status for r in results) for status in STATUS_ICONS}
+        print("\n" + "=" * 60)
+        print(f"📊 {counts['pass']} passed, {counts['warn']} warnings, {counts['fail']} failed, "
+              f"{counts['skipped']} skipped in {elapsed_ms:.0f} ms")
+        print(f"⛓️ Slowest chain: {' → '.join(chain)} ({chain_ms:.0f} ms); "
+              f"run one by one: {sum(r['duration_ms'] or 0.0 for r in results):.0f} ms")
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the adb binary, for running adb_fleet.py without phones
+
+Answers the commands the fleet check uses for a rack of simulated devices:
+
+    devices
+    -s SERIAL reverse tcp:P tcp:P | reverse --list
+    -s SERIAL shell getprop ro.product.model
+    -s SERIAL shell pm list packages PACKAGE
+    -s SERIAL shell am start ... -d vehicleapp://device-check?... PACKAGE
+                                        (the app's login probe, run on this
+                                         machine when the reverse forward
+                                         for its port is set up)
+    -s SERIAL logcat -t N -s TAG:I      (the probe's answers)
+
+Configured through the environment, since callers pass adb's own argv:
+
+    FAKE_ADB_DEVICES      simulated devices (default 4)
+    FAKE_ADB_OFFLINE      extra devices listed as offline (default 0)
+    FAKE_ADB_MISSING_APP  comma-separated serials without the app installed
+    FAKE_ADB_DELAY_MS     mean delay added to every command (default 150)
+    FAKE_ADB_STATE        directory for reverse-forward and logcat state (default: temp dir)
+
+    FAKE_ADB_DEVICES=24 python adb_fleet.py --adb "python3 fake_adb.py"
+"""
+
+import json
+import os
+import random
+import shlex
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qs, urlparse
+
+APP_PACKAGE = "com.vehicle_app"
+
+DEVICE_CHECK_URI = "vehicleapp://device-check"
+
+LOGIN_PATH = "/api/driver/authenticate/v2"
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def serials():
+    online = [f"fake-{i:03d}" for i in range(1, env_int("FAKE_ADB_DEVICES", 4) + 1)]
+    offline = [f"fake-offline-{i:03d}" for i in range(1, env_int("FAKE_ADB_OFFLINE", 0) + 1)]
+    return online, offline
+
+
+def state_file(serial, kind):
+    state = os.environ.get("FAKE_ADB_STATE") or os.path.join(tempfile.gettempdir(), "fake_adb")
+    os.makedirs(state, exist_ok=True)
+    return os.path.join(state, f"{serial}.{kind}")
+
+
+def app_installed(serial):
+    return serial not in os.environ.get("FAKE_ADB_MISSING_APP", "").split(",")
+
+
+def forwarded(serial, port):
+    path = state_file(serial, "reverse")
+    if not os.path.exists(path):
+        return False
+    with open(path) as f:
+        return f"tcp:{port} tcp:{port}" in f.read().split("\n")
+
+
+def device_check(serial, link):
+    """What the app does for a device-check link: post the login, log the result (see deviceCheck.js)"""
+    params = {key: values[0] for key, values in parse_qs(urlparse(link).query).items()}
+    backend = urlparse(params.get("backend", ""))
+    status = 0
+    start = time.perf_counter()
+    # localhost on the device only reaches this machine through a reverse forward
+    if backend.hostname == "localhost" and forwarded(serial, backend.port):
+        body = json.dumps({"vehicle_number": params.get("vehicle"), "driving_license": params.get("dl")})
+        request = urllib.request.Request(f"{params['backend'].rstrip('/')}{LOGIN_PATH}", body.encode(),
+                                         {"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as r:
+                r.read()
+                status = r.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except OSError:
+            pass
+    ms = (time.perf_counter() - start) * 1000.0
+    with open(state_file(serial, "logcat"), "a") as f:
+        f.write(f"{time.strftime('%m-%d %H:%M:%S')}.000  4242  4270 I ReactNativeJS: "
+                f"VehicleAppCheck id={params.get('id', '-')} status={status} ms={ms:.0f}\n")
+
+
+def am_start(serial, args):
+    link = args[args.index("-d") + 1] if "-d" in args else ""
+    if not app_installed(serial) or not link.startswith(DEVICE_CHECK_URI):
+        print("Error: Activity not started, unable to resolve Intent")
+        return 0
+    print(f"Starting: Intent {{ act=android.intent.action.VIEW dat={link.split('?')[0]}... pkg={APP_PACKAGE} }}")
+    device_check(serial, link)
+    print("Status: ok")
+    return 0
+
+
+def logcat(serial, args):
+    """logcat -t N [-s TAG:LEVEL]: the last N lines the app logged"""
+    count = int(args[args.index("-t") + 1]) if "-t" in args else None
+    path = state_file(serial, "logcat")
+    lines = []
+    if os.path.exists(path):
+        with open(path) as f:
+            lines = f.read().splitlines()
+    for line in lines[-count:] if count else lines:
+        print(line)
+    return 0
+
+
+def shell(serial, index, args):
+    # adb joins the arguments and the device shell splits them again
+    argv = shlex.split(" ".join(args))
+    if argv[:2] == ["getprop", "ro.product.model"]:
+        print(f"Fake Pixel {index}")
+        return 0
+    if argv[:3] == ["pm", "list", "packages"]:
+        if app_installed(serial) and (len(argv) < 4 or argv[3] in APP_PACKAGE):
+            print(f"package:{APP_PACKAGE}")
+        return 0
+    if argv[:2] == ["am", "start"]:
+        return am_start(serial, argv[2:])
+    print(f"/system/bin/sh: {argv[0]}: not found", file=sys.stderr)
+    return 127
+
+
+def reverse(serial, args):
+    path = state_file(serial, "reverse")
+    if args == ["--list"]:
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in sorted(set(f.read().split("\n")) - {""}):
+                    print(f"UsbFfs {line}")
+        return 0
+    if len(args) == 2:
+        with open(path, "a") as f:
+            f.write(f"{args[0]} {args[1]}\n")
+        print(args[0].split(":")[-1])
+        return 0
+    print("error: unsupported reverse arguments", file=sys.stderr)
+    return 1
+
+
+def main(argv):
+    delay_ms = env_int("FAKE_ADB_DELAY_MS", 150)
+    time.sleep(random.expovariate(1000.0 / delay_ms) if delay_ms > 0 else 0)
+    online, offline = serials()
+
+    if argv[:1] == ["devices"]:
+        print("List of devices attached")
+        for serial in online:
+            print(f"{serial}\tdevice")
+        for serial in offline:
+            print(f"{serial}\toffline")
+        return 0
+
+    serial = None
+    if argv[:1] == ["-s"]:
+        serial, argv = argv[1], argv[2:]
+    elif len(online) == 1:
+        serial = online[0]
+    else:
+        print("adb: more than one device/emulator", file=sys.stderr)
+        return 1
+    if serial not in online:
+        print(f"adb: device '{serial}' not found", file=sys.stderr)
+        return 1
+
+    if argv[:1] == ["shell"]:
+        return shell(serial, online.index(serial) + 1, argv[1:])
+    if argv[:1] == ["reverse"]:
+        return reverse(serial, argv[1:])
+    if argv[:1] == ["logcat"]:
+        return logcat(serial, argv[1:])
+    print(f"adb: unknown command {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,132 @@
+// Benchmark: login latency and JS cost with ApiService logging on vs off
+//
+// Runs the app's own ApiService.authenticateDriver / authenticateDriverV2
+// against a backend (the stand-in by default) with the logger at 'debug'
+// (development builds: headers, raw text and pretty-printed payloads) and
+// at 'warn' (release builds), and reports latency and the CPU time each
+// login costs on the JS thread. Log output goes to a byte-counting sink
+// instead of the terminal.
+//
+//   python standin_backend.py --port 5000 --stops 300 &
+//   node login_logging_benchmark.mjs [logins] [base url]
+
+import { register } from 'node:module';
+import { Console } from 'node:console';
+import { Writable } from 'node:stream';
+
+// The app imports modules without extensions (Metro resolves them); do the same here
+register(
+  'data:text/javascript,' +
+    encodeURIComponent(`
+export async function resolve(specifier, context, next) {
+  try {
+    return await next(specifier, context);
+  } catch (error) {
+    if (specifier.startsWith('.') && !/\\.[mc]?js$/.test(specifier)) {
+      return next(specifier + '.js', context);
+    }
+    throw error;
+  }
+}`),
+  import.meta.url,
+);
+
+const { logger } = await import('./src/utils/logger.js');
+const { default: ApiService } = await import('./src/services/api.js');
+
+const LOGINS = Number(process.argv[2] || 200);
+const TARGET = (process.argv[3] || 'http://127.0.0.1:5000').replace(/\/$/, '');
+const APP_BASE_URL = 'http://192.168.4.243:5000';
+const WARMUP = 10;
+
+const VEHICLE_NUMBER = 'DL1LAN3660';
+const DRIVING_LICENSE = 'BR5020230001371';
+
+// Point the app's hard-coded backend address at the benchmark target
+const nodeFetch = globalThis.fetch;
+globalThis.fetch = (url, options) => nodeFetch(String(url).replace(APP_BASE_URL, TARGET), options);
+
+// Counts what a Console would print (arguments formatted as on the device), then drops it
+class CountingSink extends Writable {
+  constructor() {
+    super();
+    this.bytes = 0;
+  }
+
+  _write(chunk, encoding, callback) {
+    this.bytes += chunk.length;
+    callback();
+  }
+}
+
+const percentile = (sorted, p) => sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+
+const CASES = [
+  { name: 'logging on (debug)', level: 'debug', timingSampleRate: 0 },
+  { name: 'logging off (warn)', level: 'warn', timingSampleRate: 0 },
+  { name: 'off + 10% timing', level: 'warn', timingSampleRate: 0.1 },
+];
+
+const LOGINS_BY_VERSION = {
+  V1: () => ApiService.authenticateDriver(VEHICLE_NUMBER, DRIVING_LICENSE),
+  V2: () => ApiService.authenticateDriverV2(VEHICLE_NUMBER, DRIVING_LICENSE),
+};
+
+const run = async (testCase, login) => {
+  const stream = new CountingSink();
+  logger.configure({
+    level: testCase.level,
+    timingSampleRate: testCase.timingSampleRate,
+    sink: new Console({ stdout: stream, stderr: stream }),
+  });
+
+  for (let i = 0; i < WARMUP; i++) {
+    await login();
+  }
+  stream.bytes = 0;
+
+  const latencies = [];
+  const cpuStart = process.cpuUsage();
+  for (let i = 0; i < LOGINS; i++) {
+    const start = process.hrtime.bigint();
+    await login();
+    latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  const cpu = process.cpuUsage(cpuStart);
+
+  latencies.sort((a, b) => a - b);
+  return {
+    p50: percentile(latencies, 50),
+    p95: percentile(latencies, 95),
+    cpuMsPerLogin: (cpu.user + cpu.system) / 1000 / LOGINS,
+    logKbPerLogin: stream.bytes / 1024 / LOGINS,
+  };
+};
+
+console.log('📝 Login Logging Benchmark');
+console.log('='.repeat(60));
+console.log(`Target: ${TARGET}`);
+console.log(`${LOGINS} logins per case after ${WARMUP} warm-up logins`);
+
+try {
+  const probe = await ApiService.authenticateDriver(VEHICLE_NUMBER, DRIVING_LICENSE);
+  console.log(`Route size: ${probe.total_pickups} pickups`);
+} catch (error) {
+  console.log(`❌ Cannot log in at ${TARGET}: ${error.message}`);
+  process.exit(1);
+}
+
+for (const [version, login] of Object.entries(LOGINS_BY_VERSION)) {
+  console.log(`\n🔐 ${version} login:`);
+  const results = [];
+  for (const testCase of CASES) {
+    const result = await run(testCase, login);
+    results.push(result);
+    console.log(
+      `   ${testCase.name.padEnd(20)} p50 ${result.p50.toFixed(1).padStart(6)}ms  p95 ${result.p95.toFixed(1).padStart(6)}ms  ` +
+        `JS ${result.cpuMsPerLogin.toFixed(2).padStart(6)}ms/login  logged ${result.logKbPerLogin.toFixed(1).padStart(6)} KB/login`,
+    );
+  }
+  const [on, off] = results;
+  console.log(`   ✅ Logging off saves ${(on.cpuMsPerLogin - off.cpuMsPerLogin).toFixed(2)}ms of JS time per login (${(on.cpuMsPerLogin / off.cpuMsPerLogin).toFixed(1)}x)`);
+}
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Mobile-network emulating TCP proxy for the Vehicle App backend
+
+Sits between any HTTP client (the app through `adb reverse`, or the
+Python tools) and the backend, and shapes the traffic like a 2G, 3G or
+flaky 4G link: bandwidth caps per direction, added round-trip time with
+jitter, retransmission delays for lost segments and link stalls during
+which nothing gets through.
+
+Proxy mode - point a client at the listen port:
+
+    python standin_backend.py --port 5000 &
+    python network_emulator.py --profile 3g --listen-port 5100
+    adb reverse tcp:5000 tcp:5100          # the phone's backend now runs over "3G"
+
+Report mode - completion rate and latency per profile for each endpoint,
+judged against the app's AbortController deadlines (30 s login, 60 s
+photo upload):
+
+    python network_emulator.py --report --profiles 2g,3g,flaky-4g --requests 5
+
+Loss is emulated at the segment level: TCP hides lost packets from both
+ends, so a lost segment costs a retransmission timeout instead of data.
+Only plain-HTTP targets can be proxied.
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from photo_upload_benchmark import StreamingMultipartBody
+from sync_lag_harness import ConnectivitySchedule
+from vehicle_client import TEST_CREDENTIALS, VehicleClient, add_target_argument, resolve_target, timeout_for
+from vehicle_load import classify_exception, classify_response, percentile
+
+# Bytes per emulated segment (a typical TCP MSS)
+SEGMENT_BYTES = 1460
+# Segments buffered per direction before the proxy stops reading (radio buffer)
+BUFFERED_SEGMENTS = 64
+# Minimum retransmission timeout (Linux default)
+MIN_RTO_S = 0.2
+
+
+class NetworkProfile:
+    """Link characteristics of one network type"""
+
+    def __init__(self, name, down_kbps, up_kbps, rtt_ms, jitter_ms=0.0, loss=0.0,
+                 mean_stall_gap_s=0.0, mean_stall_s=0.0):
+        self.name = name
+        self.down_kbps = down_kbps
+        self.up_kbps = up_kbps
+        self.rtt_ms = rtt_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        # Stalls: link-wide outages; mean time between them and mean length
+        self.mean_stall_gap_s = mean_stall_gap_s
+        self.mean_stall_s = mean_stall_s
+
+    def describe(self):
+        text = (f"{self.down_kbps:g}/{self.up_kbps:g} kbit/s down/up, RTT {self.rtt_ms:g}±{self.jitter_ms:g} ms, "
+                f"loss {self.loss:.1%}")
+        if self.mean_stall_s:
+            text += f", ~{self.mean_stall_s:g} s stalls every ~{self.mean_stall_gap_s:g} s"
+        return text
+
+
+PROFILES = {profile.name: profile for profile in (
+    NetworkProfile("wifi", down_kbps=20000, up_kbps=10000, rtt_ms=10, jitter_ms=2),
+    NetworkProfile("4g", down_kbps=12000, up_kbps=4000, rtt_ms=60, jitter_ms=15, loss=0.002),
+    NetworkProfile("flaky-4g", down_kbps=4000, up_kbps=1000, rtt_ms=90, jitter_ms=60, loss=0.02,
+                   mean_stall_gap_s=25, mean_stall_s=5),
+    NetworkProfile("3g", down_kbps=750, up_kbps=250, rtt_ms=300, jitter_ms=80, loss=0.01,
+                   mean_stall_gap_s=60, mean_stall_s=2),
+    NetworkProfile("2g", down_kbps=80, up_kbps=40, rtt_ms=700, jitter_ms=200, loss=0.03,
+                   mean_stall_gap_s=45, mean_stall_s=4),
+)}
+
+
+class LinkShaper:
+    """
+    One direction of the emulated link
+
+    Segments leave at the bandwidth cap, one after another, then take half
+    the RTT (plus jitter) to arrive; lost ones arrive a retransmission
+    timeout later. Arrivals stay in order, as TCP delivers them.
+    """
+
+    def __init__(self, kbps, profile, stalls, rng):
+        self.bytes_per_s = kbps * 1000 / 8
+        self.one_way_s = profile.rtt_ms / 2000.0
+        self.jitter_s = profile.jitter_ms / 2000.0
+        self.loss = profile.loss
+        self.rto_s = max(MIN_RTO_S, 2 * profile.rtt_ms / 1000.0)
+        self.stalls = stalls
+        self.rng = rng
+        self.free_at = 0.0
+        self.last_arrival = 0.0
+
+    def arrival_time(self, size, now):
+        start = max(now, self.free_at)
+        if self.stalls is not None:
+            start = self.stalls.resumes_at(start)
+        self.free_at = start + size / self.bytes_per_s
+        delay = self.one_way_s + abs(self.rng.gauss(0.0, self.jitter_s))
+        if self.rng.random() < self.loss:
+            delay += self.rto_s
+        self.last_arrival = max(self.free_at + delay, self.last_arrival)
+        return self.last_arrival
+
+
+class EmulatedLinkProxy:
+    """asyncio TCP proxy that shapes every connection through one emulated link (one phone)"""
+
+    def __init__(self, profile, upstream_host, upstream_port, listen_host="127.0.0.1", listen_port=0, seed=0):
+        self.profile = profile
+        self.upstream = (upstream_host, upstream_port)
+        self.listen = (listen_host, listen_port)
+        self.rng = random.Random(seed)
+        # Stall periods are the offline periods of a connectivity schedule (time.monotonic, like the loop clock)
+        self.stalls = (ConnectivitySchedule(profile.mean_stall_gap_s, profile.mean_stall_s, seed)
+                       if profile.mean_stall_s else None)
+        # Connections share the link, so a photo upload slows everything else down
+        self.uplink = LinkShaper(profile.up_kbps, profile, self.stalls, self.rng)
+        self.downlink = LinkShaper(profile.down_kbps, profile, self.stalls, self.rng)
+        self.server = None
+        self.connections = 0
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, *self.listen)
+        return self
+
+    async def _handle(self, client_reader, client_writer):
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        upstream_writer = None
+        try:
+            # TCP handshake over the emulated link
+            await asyncio.sleep(self.uplink.arrival_time(0, loop.time()) - loop.time()
+                                + self.downlink.one_way_s)
+            upstream_reader, upstream_writer = await asyncio.open_connection(*self.upstream)
+            await asyncio.gather(
+                self._pipe(client_reader, upstream_writer, self.uplink),
+                self._pipe(upstream_reader, client_writer, self.downlink),
+            )
+        except (ConnectionError, OSError):
+            pass
+        except asyncio.CancelledError:
+            # Proxy shutting down; asyncio reports a connection handler that ends
+            # cancelled as "Exception in callback" on stderr, so end normally
+            pass
+        finally:
+            for writer in (client_writer, upstream_writer):
+                if writer is not None:
+                    writer.close()
+
+    async def _pipe(self, reader, writer, link):
+        """Forward one direction, releasing each segment at its emulated arrival time"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=BUFFERED_SEGMENTS)
+
+        async def deliver():
+            while True:
+                arrival, segment = await queue.get()
+                wait = arrival - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if segment is None:
+                    break
+                writer.write(segment)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+
+        delivery = asyncio.ensure_future(deliver())
+        try:
+            while True:
+                data = await reader.read(64 * 1024)
+                if not data:
+                    break
+                for offset in range(0, len(data), SEGMENT_BYTES):
+                    segment = data[offset:offset + SEGMENT_BYTES]
+                    await queue.put((link.arrival_time(len(segment), loop.time()), segment))
+            await queue.put((link.last_arrival, None))
+            await delivery
+        finally:
+            delivery.cancel()
+
+
+class ProxyThread:
+    """Run an EmulatedLinkProxy on its own event loop thread (for in-process use)"""
+
+    def __init__(self, profile, upstream_host, upstream_port, seed=0):
+        self.loop = asyncio.new_event_loop()
+        self.proxy = EmulatedLinkProxy(profile, upstream_host, upstream_port, seed=seed)
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.proxy.port}"
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.proxy.start(), self.loop).result()
+        return self
+
+    async def _shutdown(self):
+        self.proxy.server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def upstream_address(base_url):
+    parts = urlsplit(base_url)
+    if parts.scheme != "http":
+        raise ValueError(f"Only http:// targets can be proxied (got {base_url})")
+    return parts.hostname, parts.port or 80
+
+
+# ------------------------------------------------------------------ report
+
+# (name, method, path, body) - the requests a driver's phone makes most
+REPORT_ENDPOINTS = [
+    ("login", "POST", "/api/driver/authenticate/v2", "credentials"),
+    ("route", "GET", "/api/assignments/{assignment_id}/stops", None),
+    ("next stop", "GET", "/api/assignments/{assignment_id}/stops/{sequence}", None),
+    ("photo upload", "POST", "/api/assignments/{assignment_id}/stops/{sequence}/complete", "photo"),
+]
+
+COMPLETED_CLASSES = ("ok", "not_modified")
+
+
+def timed_attempt(client, method, path, body, photo_bytes):
+    """(outcome, seconds) of one request, judged against the app's deadline for the endpoint"""
+    deadline = timeout_for(path)[1]
+    kwargs = {"timeout": (deadline, deadline)}
+    if body == "credentials":
+        kwargs["json"] = TEST_CREDENTIALS
+    elif body == "photo":
+        multipart = StreamingMultipartBody(photo_bytes, fields={"weight": "12.5", "notes": ""})
+        kwargs["data"] = multipart
+        kwargs["headers"] = {"Content-Type": multipart.content_type, "Content-Length": str(len(multipart))}
+
+    start = time.perf_counter()
+    try:
+        response = client.request(method, path, **kwargs)
+        response.content
+    except requests.exceptions.RequestException as e:
+        return classify_exception(e), time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    if elapsed > deadline:
+        # The app would already have aborted this request
+        return "timeout", elapsed
+    return classify_response(response.status_code), elapsed
+
+
+def run_profile(base_url, profile, attempts, photo_bytes, seed):
+    """One phone on `profile`: every endpoint `attempts` times, one request at a time"""
+    results = {name: [] for name, *_ in REPORT_ENDPOINTS}
+    with ProxyThread(profile, *upstream_address(base_url), seed=seed) as proxy, \
+            VehicleClient(proxy.base_url, pool_size=1) as client:
+        assignment_id = 1
+        try:
+            login = client.post("/api/driver/authenticate/v2", json=TEST_CREDENTIALS, timeout=(60, 60))
+            assignment_id = login.json().get("assignment_id", assignment_id)
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+
+        for name, method, path, body in REPORT_ENDPOINTS:
+            for i in range(attempts):
+                concrete = path.format(assignment_id=assignment_id, sequence=i + 1)
+                results[name].append(timed_attempt(client, method, concrete, body, photo_bytes))
+    return results
+
+
+def print_network_report(results_by_profile, attempts):
+    print("\n" + "=" * 60)
+    print(f"📶 Completion and Latency per Network Profile ({attempts} requests per endpoint)")
+    print("=" * 60)
+    print(f"{'profile':<9} {'endpoint':<13} {'deadline':>8} {'done':>6} {'p50':>8} {'p95':>8} {'max':>8}  failures")
+    for profile_name, results in results_by_profile.items():
+        for name, method, path, _ in REPORT_ENDPOINTS:
+            attempts_made = results[name]
+            done = sorted(s for outcome, s in attempts_made if outcome in COMPLETED_CLASSES)
+            failures = {}
+            for outcome, _ in attempts_made:
+                if outcome not in COMPLETED_CLASSES:
+                    failures[outcome] = failures.get(outcome, 0) + 1
+
+            def fmt(value):
+                return f"{value:>7.1f}s" if value is not None else f"{'n/a':>8}"
+
+            rate = len(done) / len(attempts_made) if attempts_made else 0.0
+            print(f"{profile_name:<9} {name:<13} {timeout_for(path)[1]:>7}s {rate:>6.0%} "
+                  f"{fmt(percentile(done, 50))} {fmt(percentile(done, 95))} {fmt(done[-1] if done else None)}  "
+                  f"{', '.join(f'{k}={v}' for k, v in sorted(failures.items())) or '-'}")
+        print()
+
+    for profile_name, results in results_by_profile.items():
+        for name, _, path, _ in REPORT_ENDPOINTS:
+            timeouts = sum(1 for outcome, _ in results[name] if outcome == "timeout")
+            if timeouts:
+                print(f"⚠️ {profile_name}: {timeouts} {name} requests would hit the app's "
+                      f"{timeout_for(path)[1]} s timeout")
+
+
+async def serve(profile, base_url, listen_host, listen_port, seed):
+    proxy = await EmulatedLinkProxy(profile, *upstream_address(base_url), listen_host, listen_port, seed).start()
+    print(f"📶 Emulating {profile.name} ({profile.describe()})")
+    print(f"   {listen_host}:{proxy.port} -> {base_url}")
+    print(f"   Phone over USB: adb reverse tcp:5000 tcp:{proxy.port}")
+    async with proxy.server:
+        await proxy.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mobile-network emulating proxy for the Vehicle App backend")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="3g", help="proxy mode: link to emulate")
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--listen-port", type=int, default=5100)
+    parser.add_argument("--report", action="store_true",
+                        help="measure completion and latency per profile instead of running a proxy")
+    parser.add_argument("--profiles", default="3g,2g,flaky-4g", help="report mode: comma-separated profiles")
+    parser.add_argument("--requests", type=int, default=5, help="report mode: requests per endpoint per profile")
+    parser.add_argument("--photo-kb", type=int, default=200,
+                        help="report mode: photo size (the app compresses to about 200 KB)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    if not args.report:
+        try:
+            asyncio.run(serve(PROFILES[args.profile], base_url, args.listen_host, args.listen_port, args.seed))
+        except KeyboardInterrupt:
+            print("\n🛑 Stopped")
+        return
+
+    profiles = [PROFILES[name] for name in args.profiles.split(",")]
+    print("📶 Vehicle App Network Profile Report")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    for profile in profiles:
+        print(f"   {profile.name:<9} {profile.describe()}")
+    print(f"🚚 Running {len(profiles)} emulated phones in parallel...")
+
+    # Profiles are independent phones on their own proxies, so they run side by side
+    with ThreadPoolExecutor(max_workers=len(profiles)) as pool:
+        futures = {profile.name: pool.submit(run_profile, base_url, profile, args.requests,
+                                             args.photo_kb * 1024, args.seed)
+                   for profile in profiles}
+        results_by_profile = {name: future.result() for name, future in futures.items()}
+    print_network_report(results_by_profile, args.requests)
+
+
+if __name__ == "__main__":
+    main()
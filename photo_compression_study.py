@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline size/quality study for stop-photo compression
+
+Re-encodes sample photos at every combination of max edge, quality and
+format (baseline JPEG, progressive JPEG, WebP) and reports bytes, the
+reduction against the original file and PSNR against the original
+pixels. Use it to pick APP_CONFIG.CAMERA.UPLOAD settings:
+
+    python photo_compression_study.py photos/*.jpg --budget-kb 200
+
+Requires Pillow (pip install Pillow). Without sample photos a synthetic
+2000x2000 capture is used, which is only a rough stand-in for real scenes.
+"""
+
+import argparse
+import io
+import math
+import os
+import sys
+
+try:
+    from PIL import Image, ImageChops, ImageFilter, ImageStat
+except ImportError:
+    print("❌ Pillow is required: pip install Pillow")
+    sys.exit(1)
+
+FORMATS = {
+    "jpeg": {"format": "JPEG", "optimize": True},
+    "jpeg-progressive": {"format": "JPEG", "optimize": True, "progressive": True},
+    "webp": {"format": "WEBP", "method": 4},
+}
+
+
+def synthetic_capture(size=2000, seed=7):
+    """Noisy gradient with soft blobs, roughly as compressible as a street photo"""
+    noise = Image.effect_noise((size, size), 48).convert("L")
+    gradient = Image.linear_gradient("L").resize((size, size))
+    blobs = Image.radial_gradient("L").resize((size // 3, size // 3)).resize((size, size))
+    image = Image.merge("RGB", (gradient, ImageChops.multiply(noise, blobs), ImageChops.add(gradient, noise, 2.0)))
+    return image.filter(ImageFilter.GaussianBlur(1.2)).rotate(seed, expand=False)
+
+
+def load_original(path):
+    """(image, original_bytes) for a sample photo, or a synthetic 2000x2000 JPEG capture"""
+    if path is None:
+        buffer = io.BytesIO()
+        synthetic_capture().save(buffer, "JPEG", quality=80)
+        buffer.seek(0)
+        return Image.open(buffer).convert("RGB"), buffer.getbuffer().nbytes
+    with Image.open(path) as image:
+        return image.convert("RGB"), os.path.getsize(path)
+
+
+def downscale(image, max_edge):
+    """Fit within max_edge x max_edge, like the picker's maxWidth/maxHeight"""
+    scale = min(1.0, max_edge / max(image.size))
+    if scale >= 1.0:
+        return image
+    return image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+
+
+def psnr(original, candidate):
+    """PSNR in dB after scaling the candidate back up to the original size"""
+    if candidate.size != original.size:
+        candidate = candidate.resize(original.size, Image.BICUBIC)
+    stats = ImageStat.Stat(ImageChops.difference(original, candidate))
+    mse = sum(stats.sum2) / (original.width * original.height * len(stats.sum2))
+    return float("inf") if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def encode(image, fmt, quality):
+    buffer = io.BytesIO()
+    options = dict(FORMATS[fmt])
+    image.save(buffer, options.pop("format"), quality=quality, **options)
+    return buffer.getvalue()
+
+
+def study(original, original_bytes, edges, qualities, formats):
+    """One result row per (edge, quality, format) combination"""
+    rows = []
+    for edge in edges:
+        resized = downscale(original, edge)
+        for fmt in formats:
+            for quality in qualities:
+                data = encode(resized, fmt, quality)
+                decoded = Image.open(io.BytesIO(data)).convert("RGB")
+                rows.append({
+                    "edge": edge,
+                    "format": fmt,
+                    "quality": quality,
+                    "bytes": len(data),
+                    "reduction": original_bytes / len(data),
+                    "psnr_db": psnr(original, decoded),
+                    "bytes_per_pixel": len(data) / (resized.width * resized.height),
+                })
+    return rows
+
+
+def average_rows(per_photo_rows):
+    """Average the per-photo rows of each setting across all sample photos"""
+    combined = {}
+    for rows in per_photo_rows:
+        for row in rows:
+            key = (row["edge"], row["format"], row["quality"])
+            combined.setdefault(key, []).append(row)
+    averaged = []
+    for (edge, fmt, quality), rows in combined.items():
+        averaged.append({
+            "edge": edge,
+            "format": fmt,
+            "quality": quality,
+            "bytes": sum(r["bytes"] for r in rows) / len(rows),
+            "reduction": sum(r["reduction"] for r in rows) / len(rows),
+            "psnr_db": min(r["psnr_db"] for r in rows),
+            "bytes_per_pixel": sum(r["bytes_per_pixel"] for r in rows) / len(rows),
+        })
+    return averaged
+
+
+def print_study(rows, budget_bytes, min_psnr):
+    print(f"\n{'edge':>6} {'format':<17} {'q':>4} {'KB':>8} {'x smaller':>10} {'PSNR dB':>8} {'B/px':>6}")
+    for row in sorted(rows, key=lambda r: (r["format"], -r["edge"], -r["quality"])):
+        marker = "✅" if row["bytes"] <= budget_bytes and row["psnr_db"] >= min_psnr else "  "
+        print(f"{row['edge']:>6} {row['format']:<17} {row['quality']:>4} {row['bytes'] / 1024:>8.1f} "
+              f"{row['reduction']:>10.1f} {row['psnr_db']:>8.1f} {row['bytes_per_pixel']:>6.3f} {marker}")
+
+    candidates = [r for r in rows if r["bytes"] <= budget_bytes and r["psnr_db"] >= min_psnr]
+    print("\n" + "=" * 60)
+    if not candidates:
+        print(f"❌ No setting fits {budget_bytes // 1024} KB at PSNR >= {min_psnr} dB")
+        return
+
+    def describe(row):
+        return (f"{row['format']} edge {row['edge']} quality {row['quality']} -> {row['bytes'] / 1024:.0f} KB, "
+                f"{row['reduction']:.1f}x smaller, {row['psnr_db']:.1f} dB")
+
+    def best_of(rows):
+        return max(rows, key=lambda r: (r["psnr_db"], -r["bytes"]))
+
+    print(f"🎯 Best within {budget_bytes // 1024} KB: {describe(best_of(candidates))}")
+
+    # The app's picker only produces baseline JPEG
+    jpeg_candidates = [r for r in candidates if r["format"] == "jpeg"]
+    if not jpeg_candidates:
+        return
+    best_jpeg = best_of(jpeg_candidates)
+    print(f"📱 Best baseline JPEG (what the app captures): {describe(best_jpeg)}")
+    print(f"\n📋 Suggested APP_CONFIG.CAMERA.UPLOAD.MAX_EDGE: {best_jpeg['edge']}, BYTES_PER_PIXEL:")
+    for row in sorted((r for r in rows if r["format"] == "jpeg" and r["edge"] == best_jpeg["edge"]),
+                      key=lambda r: -r["quality"]):
+        print(f"   {row['quality'] / 100:.1f}: {row['bytes_per_pixel']:.3f},")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size/quality trade-off study for stop photos")
+    parser.add_argument("photos", nargs="*", help="sample photos (default: one synthetic capture)")
+    parser.add_argument("--edges", default="2000,1600,1280,1024,800", help="max edges to try")
+    parser.add_argument("--qualities", default="80,70,60,50,40", help="encoder qualities to try (1-100)")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="formats to try")
+    parser.add_argument("--budget-kb", type=int, default=200, help="upload byte budget per photo")
+    parser.add_argument("--min-psnr", type=float, default=32.0, help="minimum acceptable PSNR in dB")
+    args = parser.parse_args()
+
+    edges = [int(edge) for edge in args.edges.split(",")]
+    qualities = [int(quality) for quality in args.qualities.split(",")]
+    formats = args.formats.split(",")
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+
+    print("📸 Stop Photo Compression Study")
+    print("=" * 60)
+    per_photo_rows = []
+    total_original = 0
+    for path in args.photos or [None]:
+        original, original_bytes = load_original(path)
+        total_original += original_bytes
+        print(f"   {path or 'synthetic capture'}: {original.width}x{original.height}, {original_bytes / 1024:.0f} KB")
+        per_photo_rows.append(study(original, original_bytes, edges, qualities, formats))
+
+    print(f"\nAverage original: {total_original / len(per_photo_rows) / 1024:.0f} KB "
+          f"(PSNR column is the worst photo)")
+    print_study(average_rows(per_photo_rows), args.budget_kb * 1024, args.min_psnr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Photo-upload benchmark for the stop-completion endpoint
+
+Streams synthetic JPEGs of configurable size through multipart bodies
+that are generated on the fly (never buffered whole in memory), the same
+shape as ApiService.completeAssignmentStopWithPhoto sends, and reports
+upload throughput, server-side completion latency and the timeout rate
+per payload size. Every upload is also saved to the results store (see
+results_store.py), one endpoint per payload size.
+"""
+
+import argparse
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from results_store import add_results_argument, open_run
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+from vehicle_load import classify_exception, classify_response, percentile
+
+CHUNK_SIZE = 64 * 1024
+# Matches the app's AbortController timeout for photo uploads
+APP_UPLOAD_DEADLINE_S = 60.0
+
+
+def parse_size(text):
+    """'250k', '2m', '1500000' -> bytes"""
+    text = text.strip().lower()
+    multiplier = {"k": 1024, "m": 1024 * 1024}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+class StreamingMultipartBody:
+    """
+    File-like multipart/form-data body with a synthetic JPEG photo part
+
+    The photo is produced CHUNK_SIZE bytes at a time from one random block,
+    so memory use does not grow with the payload size. `sent_at` records
+    when the last byte was handed to the socket.
+    """
+
+    _block = os.urandom(CHUNK_SIZE)
+
+    def __init__(self, photo_size, fields=None, filename="photo.jpg"):
+        self.boundary = f"----VehicleBench{uuid.uuid4().hex}"
+        self.photo_size = photo_size
+        self.sent_at = None
+        head = "".join(
+            f"--{self.boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n"
+            for name, value in (fields or {}).items()
+        )
+        head += (f"--{self.boundary}\r\nContent-Disposition: form-data; name=\"photo\"; "
+                 f"filename=\"{filename}\"\r\nContent-Type: image/jpeg\r\n\r\n")
+        self._head = head.encode()
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self._parts = self._generate()
+        self._pending = b""
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self._head) + self.photo_size + len(self._tail)
+
+    def _photo_chunks(self):
+        if self.photo_size < 4:
+            yield b"\xff" * self.photo_size
+            return
+        yield b"\xff\xd8"
+        remaining = self.photo_size - 4
+        while remaining > 0:
+            chunk = self._block[:min(remaining, CHUNK_SIZE)]
+            remaining -= len(chunk)
+            yield chunk
+        yield b"\xff\xd9"
+
+    def _generate(self):
+        yield self._head
+        yield from self._photo_chunks()
+        yield self._tail
+        self.sent_at = time.perf_counter()
+
+    def __iter__(self):
+        """Chunked transfer-encoding: requests iterates the body"""
+        return self._parts
+
+    def read(self, size=-1):
+        """Content-Length framing: requests/http.client read() the body"""
+        while size < 0 or len(self._pending) < size:
+            chunk = next(self._parts, None)
+            if chunk is None:
+                break
+            self._pending += chunk
+        if size < 0:
+            data, self._pending = self._pending, b""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+class UploadResults:
+    """Per-payload-size upload outcomes, also passed to `sink` (e.g. a results_store.StoredRun)"""
+
+    def __init__(self, sink=None):
+        self._lock = threading.Lock()
+        self.by_size = {}
+        self.sink = sink
+
+    def record(self, size, outcome, total_ms, throughput_mbps=None, completion_ms=None, error_class=None):
+        with self._lock:
+            bucket = self.by_size.setdefault(size, {
+                "outcomes": {}, "throughput_mbps": [], "completion_ms": [], "total_ms": []})
+            bucket["outcomes"][outcome] = bucket["outcomes"].get(outcome, 0) + 1
+            if throughput_mbps is not None:
+                bucket["throughput_mbps"].append(throughput_mbps)
+                bucket["completion_ms"].append(completion_ms)
+                bucket["total_ms"].append(total_ms)
+        if self.sink is not None:
+            self.sink.record(f"complete {size // 1024}k", total_ms, error_class or outcome)
+
+
+def upload_once(client, results, assignment_id, sequence, photo_size, chunked):
+    """Send one streamed stop completion and record its outcome"""
+    body = StreamingMultipartBody(photo_size, fields={"weight": "12.5", "notes": ""},
+                                  filename=f"photo_{assignment_id}_{sequence}.jpg")
+    headers = {"Content-Type": body.content_type}
+    if not chunked:
+        headers["Content-Length"] = str(len(body))
+    path = f"/api/assignments/{assignment_id}/stops/{sequence}/complete"
+
+    start = time.perf_counter()
+    try:
+        response = client.post(path, data=iter(body) if chunked else body, headers=headers)
+        response.content
+    except requests.exceptions.RequestException as e:
+        results.record(photo_size, classify_exception(e), (time.perf_counter() - start) * 1000.0)
+        return
+    done = time.perf_counter()
+
+    total_s = done - start
+    if total_s > APP_UPLOAD_DEADLINE_S:
+        # The app would already have aborted this request
+        results.record(photo_size, "timeout", total_s * 1000.0)
+        return
+    if not response.ok:
+        results.record(photo_size, f"http_{response.status_code}", total_s * 1000.0,
+                       error_class=classify_response(response.status_code))
+        return
+
+    sent_at = body.sent_at or done
+    send_s = max(sent_at - start, 1e-6)
+    results.record(photo_size, "ok", total_s * 1000.0,
+                   throughput_mbps=len(body) / send_s / (1024 * 1024),
+                   completion_ms=(done - sent_at) * 1000.0)
+
+
+def run_benchmark(base_url, sizes, uploads_per_size, concurrency, first_assignment=1,
+                  assignments=50, stops=79, chunked=True, sink=None):
+    """
+    Upload `uploads_per_size` photos of each size with `concurrency` parallel drivers
+
+    Uploads are spread over `assignments` consecutive assignments and their stops.
+    """
+    results = UploadResults(sink)
+    local = threading.local()
+    clients = []
+    clients_lock = threading.Lock()
+
+    def client_for_thread():
+        if not hasattr(local, "client"):
+            local.client = VehicleClient(base_url, pool_size=1)
+            with clients_lock:
+                clients.append(local.client)
+        return local.client
+
+    def task(size, i):
+        assignment_id = first_assignment + i % assignments
+        sequence = i // assignments % stops + 1
+        upload_once(client_for_thread(), results, assignment_id, sequence, size, chunked)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for size in sizes:
+                for future in [pool.submit(task, size, i) for i in range(uploads_per_size)]:
+                    future.result()
+    finally:
+        for client in clients:
+            client.close()
+    return results
+
+
+def print_upload_report(results):
+    print("\n" + "=" * 60)
+    print("📸 Photo Upload Results by Payload Size")
+    print("=" * 60)
+    print(f"{'size':>8} {'uploads':>8} {'MB/s p50':>9} {'MB/s p5':>8} {'done p50':>9} "
+          f"{'done p95':>9} {'total p95':>10} {'timeout%':>9}")
+    for size in sorted(results.by_size):
+        bucket = results.by_size[size]
+        attempts = sum(bucket["outcomes"].values())
+        throughput = sorted(bucket["throughput_mbps"])
+        completion = sorted(bucket["completion_ms"])
+        total = sorted(bucket["total_ms"])
+        timeouts = bucket["outcomes"].get("timeout", 0)
+
+        def fmt(value, width=9):
+            return f"{value:>{width}.1f}" if value is not None else f"{'n/a':>{width}}"
+
+        print(f"{size // 1024:>7}k {attempts:>8} {fmt(percentile(throughput, 50))} "
+              f"{fmt(percentile(throughput, 5), 8)} {fmt(percentile(completion, 50))} "
+              f"{fmt(percentile(completion, 95))} {fmt(percentile(total, 95), 10)} "
+              f"{timeouts / attempts * 100 if attempts else 0:>8.1f}%")
+        failures = {k: v for k, v in bucket["outcomes"].items() if k != "ok"}
+        if failures:
+            print(f"          failures: {', '.join(f'{k}={v}' for k, v in sorted(failures.items()))}")
+    print("\n   MB/s = request body send rate, done = server completion latency after the last byte")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming photo-upload benchmark for stop completion")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--sizes", default="250k,1m,2m,4m", help="comma-separated photo sizes")
+    parser.add_argument("--uploads", type=int, default=20, help="uploads per size")
+    parser.add_argument("--concurrency", type=int, default=10, help="parallel uploads")
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--assignments", type=int, default=50, help="assignments to spread uploads over")
+    parser.add_argument("--stops", type=int, default=79, help="stops per assignment")
+    parser.add_argument("--content-length", action="store_true",
+                        help="send a Content-Length body instead of chunked transfer-encoding")
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+
+    print("📸 Vehicle App Photo Upload Benchmark")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"Sizes: {args.sizes}, {args.uploads} uploads each, concurrency {args.concurrency}, "
+          f"{'Content-Length' if args.content_length else 'chunked'} framing")
+
+    stored = open_run(args, "photo_upload_benchmark", base_url)
+    try:
+        results = run_benchmark(base_url, sizes, args.uploads, args.concurrency,
+                                args.first_assignment, args.assignments, args.stops,
+                                chunked=not args.content_length, sink=stored)
+    finally:
+        if stored:
+            stored.finish()
+    print_upload_report(results)
+
+
+if __name__ == "__main__":
+    main()
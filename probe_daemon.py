@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Synthetic-monitoring daemon for the Vehicle App backend
+
+Runs the verify_vehicle_app_connection.py HTTP checks and the read-only
+test_vehicle_app_live.py endpoints on a schedule, with bounded
+concurrency, and keeps per-check latency histograms with fixed buckets:
+a cumulative one since start and a rolling one over --window-s.
+
+Metrics are served on --metrics-port:
+
+    /metrics       Prometheus text exposition
+    /metrics.json  the same numbers as JSON
+    /alerts        currently firing alerts
+
+An alert fires when a check's rolling p95 or error rate crosses
+--p95-ms / --error-rate, and resolves when it drops back. Transitions
+are printed and, with --alert-webhook, POSTed as JSON. Every check
+result is also saved to the results store (see results_store.py).
+
+    python probe_daemon.py --target live --interval 30 --metrics-port 9109
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from results_store import add_results_argument, open_run
+from test_vehicle_app_live import VEHICLE_ENDPOINTS
+from verify_vehicle_app_connection import HTTP_CHECKS
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+from vehicle_load import (HEALTHY_CLASSES, LatencyHistogram, RollingHistogram, classify_exception,
+                          classify_response)
+
+METRIC_PREFIX = "vehicle_probe"
+
+
+def build_checks(assignment_id=1, sequence=1):
+    """Probe table: the verify checks plus the GET endpoints of the live test"""
+    checks = list(HTTP_CHECKS)
+    for endpoint, method, description in VEHICLE_ENDPOINTS:
+        if method != "GET":
+            # Never complete real stops from a monitor
+            continue
+        path = endpoint.replace("{id}", str(assignment_id)).replace("{sequence}", str(sequence))
+        checks.append((description.lower().replace(" ", "_"), method, path, None))
+    return checks
+
+
+class CheckMetrics:
+    """Histograms, error classes and alert state for one check"""
+
+    def __init__(self, name, window_s):
+        self.name = name
+        self.total = LatencyHistogram()
+        self.window = RollingHistogram(window_s)
+        self.error_classes = {}
+        self.last_error_class = None
+        self.last_run_at = None
+        self.alert = None
+
+    def observe(self, latency_ms, error_class):
+        error = error_class not in HEALTHY_CLASSES
+        self.total.observe(latency_ms, error)
+        self.window.observe(latency_ms, error)
+        self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+        self.last_error_class = error_class
+        self.last_run_at = time.time()
+
+
+class ProbeDaemon:
+    """Schedules checks, records results and evaluates alert thresholds"""
+
+    def __init__(self, base_url, checks, interval_s=30.0, concurrency=4, window_s=300.0,
+                 p95_ms=2000.0, error_rate=0.05, min_samples=5, alert_webhook=None, results=None):
+        self.base_url = base_url
+        self.checks = checks
+        self.interval_s = interval_s
+        self.p95_ms = p95_ms
+        self.error_rate = error_rate
+        self.min_samples = min_samples
+        self.alert_webhook = alert_webhook
+        self.results = results
+        self.lock = threading.Lock()
+        self.metrics = {name: CheckMetrics(name, window_s) for name, _, _, _ in checks}
+        self.in_flight = set()
+        self.pool = ThreadPoolExecutor(max_workers=concurrency)
+        self.client = VehicleClient(base_url, pool_size=concurrency)
+        self.stop_event = threading.Event()
+
+    def run_check(self, name, method, path, body):
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, path, json=body)
+            response.content
+            error_class = classify_response(response.status_code)
+        except requests.exceptions.RequestException as e:
+            error_class = classify_exception(e)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        with self.lock:
+            self.metrics[name].observe(latency_ms, error_class)
+            self.in_flight.discard(name)
+        if self.results is not None:
+            self.results.record(name, latency_ms, error_class)
+
+    def tick(self):
+        """Start every check that is not still running from the previous tick"""
+        for name, method, path, body in self.checks:
+            with self.lock:
+                if name in self.in_flight:
+                    # A hung check must not pile up copies of itself
+                    continue
+                self.in_flight.add(name)
+            self.pool.submit(self.run_check, name, method, path, body)
+
+    def evaluate_alerts(self):
+        transitions = []
+        with self.lock:
+            for metrics in self.metrics.values():
+                window = metrics.window.snapshot()
+                reasons = []
+                if window.count >= self.min_samples:
+                    p95 = window.quantile(0.95)
+                    if p95 > self.p95_ms:
+                        reasons.append(f"p95 {p95:.0f} ms > {self.p95_ms:.0f} ms")
+                    if window.error_rate > self.error_rate:
+                        reasons.append(f"error rate {window.error_rate:.1%} > {self.error_rate:.1%}")
+                if reasons and metrics.alert is None:
+                    metrics.alert = {"check": metrics.name, "since": time.time(), "reasons": reasons}
+                    transitions.append(("firing", dict(metrics.alert)))
+                elif reasons:
+                    metrics.alert["reasons"] = reasons
+                elif metrics.alert is not None:
+                    transitions.append(("resolved", dict(metrics.alert)))
+                    metrics.alert = None
+        for status, alert in transitions:
+            self.notify(status, alert)
+
+    def notify(self, status, alert):
+        if status == "firing":
+            print(f"🚨 ALERT {alert['check']}: {'; '.join(alert['reasons'])}")
+        else:
+            print(f"✅ RESOLVED {alert['check']}")
+        if not self.alert_webhook:
+            return
+        try:
+            requests.post(self.alert_webhook, json={"status": status, "target": self.base_url, **alert},
+                          timeout=10)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Alert webhook failed: {e}")
+
+    def run(self, duration_s=0):
+        deadline = time.monotonic() + duration_s if duration_s else None
+        next_tick = time.monotonic()
+        while not self.stop_event.is_set():
+            self.tick()
+            self.evaluate_alerts()
+            next_tick += self.interval_s
+            if deadline and next_tick > deadline:
+                break
+            self.stop_event.wait(max(0.0, next_tick - time.monotonic()))
+        self.pool.shutdown(wait=True)
+        self.evaluate_alerts()
+        self.client.close()
+
+    # ------------------------------------------------------------ exposition
+
+    def snapshot(self):
+        with self.lock:
+            checks = []
+            for metrics in self.metrics.values():
+                window = metrics.window.snapshot()
+                checks.append({
+                    "check": metrics.name,
+                    "requests": metrics.total.count,
+                    "errors": metrics.total.errors,
+                    "error_classes": dict(metrics.error_classes),
+                    "last_error_class": metrics.last_error_class,
+                    "last_run_at": metrics.last_run_at,
+                    "buckets_ms": list(metrics.total.buckets_ms),
+                    "bucket_counts": list(metrics.total.counts),
+                    "sum_ms": metrics.total.sum_ms,
+                    "window": {
+                        "requests": window.count,
+                        "p50_ms": window.quantile(0.5),
+                        "p95_ms": window.quantile(0.95),
+                        "p99_ms": window.quantile(0.99),
+                        "error_rate": window.error_rate,
+                    },
+                    "alert": dict(metrics.alert) if metrics.alert else None,
+                })
+        return {"target": self.base_url, "generated_at": time.time(), "checks": checks}
+
+    def prometheus_text(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        snapshot = self.snapshot()
+        with self.lock:
+            totals = {name: metrics.total for name, metrics in self.metrics.items()}
+
+        family("duration_seconds", "histogram", "Probe latency since the daemon started")
+        for check in snapshot["checks"]:
+            labels = f'check="{check["check"]}"'
+            for bound, count in totals[check["check"]].cumulative():
+                le = "+Inf" if bound is None else f"{bound / 1000:g}"
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_sum{{{labels}}} {check['sum_ms'] / 1000:.6f}")
+            lines.append(f"{METRIC_PREFIX}_duration_seconds_count{{{labels}}} {check['requests']}")
+
+        family("results_total", "counter", "Probe results by error class")
+        for check in snapshot["checks"]:
+            for error_class, count in sorted(check["error_classes"].items()):
+                lines.append(f'{METRIC_PREFIX}_results_total{{check="{check["check"]}",'
+                             f'class="{error_class}"}} {count}')
+
+        family("window_p95_seconds", "gauge", "Rolling-window p95 latency")
+        for check in snapshot["checks"]:
+            p95 = check["window"]["p95_ms"]
+            value = "NaN" if p95 is None else f"{p95 / 1000:.6f}"
+            lines.append(f'{METRIC_PREFIX}_window_p95_seconds{{check="{check["check"]}"}} {value}')
+
+        family("window_error_ratio", "gauge", "Rolling-window error rate")
+        for check in snapshot["checks"]:
+            lines.append(f'{METRIC_PREFIX}_window_error_ratio{{check="{check["check"]}"}} '
+                         f'{check["window"]["error_rate"]:.6f}')
+
+        family("alert_firing", "gauge", "1 while the check's alert is firing")
+        for check in snapshot["checks"]:
+            lines.append(f'{METRIC_PREFIX}_alert_firing{{check="{check["check"]}"}} {int(bool(check["alert"]))}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the daemon's metrics"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        daemon = self.server.probe
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send(200, "text/plain; version=0.0.4", daemon.prometheus_text())
+        elif path == "/metrics.json":
+            self._send(200, "application/json", json.dumps(daemon.snapshot(), indent=2))
+        elif path == "/alerts":
+            alerts = [c["alert"] for c in daemon.snapshot()["checks"] if c["alert"]]
+            self._send(200, "application/json", json.dumps(alerts, indent=2))
+        else:
+            self._send(404, "application/json", json.dumps({"error": "Not found"}))
+
+    def _send(self, status, content_type, text):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def print_summary(snapshot):
+    print("\n" + "=" * 60)
+    print("📊 Probe Summary")
+    print("=" * 60)
+    print(f"{'check':<32} {'reqs':>5} {'p50':>8} {'p95':>8} {'err%':>6}")
+    for check in snapshot["checks"]:
+        window = check["window"]
+        p50 = f"{window['p50_ms']:.0f}ms" if window["p50_ms"] is not None else "n/a"
+        p95 = f"{window['p95_ms']:.0f}ms" if window["p95_ms"] is not None else "n/a"
+        flag = "🚨" if check["alert"] else "✅"
+        print(f"{check['check']:<32} {check['requests']:>5} {p50:>8} {p95:>8} "
+              f"{window['error_rate']:>6.1%} {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-monitoring probe daemon")
+    add_target_argument(parser, default="live")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between probe rounds")
+    parser.add_argument("--concurrency", type=int, default=4, help="checks in flight at once")
+    parser.add_argument("--window-s", type=float, default=300.0, help="rolling window for alerts")
+    parser.add_argument("--p95-ms", type=float, default=2000.0, help="alert when the window p95 exceeds this")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="alert when the window error rate exceeds this")
+    parser.add_argument("--min-samples", type=int, default=5, help="samples needed before alerting")
+    parser.add_argument("--assignment-id", type=int, default=1)
+    parser.add_argument("--sequence", type=int, default=1)
+    parser.add_argument("--metrics-host", default="127.0.0.1")
+    parser.add_argument("--metrics-port", type=int, default=9109, help="0 disables the metrics endpoint")
+    parser.add_argument("--alert-webhook", help="URL that receives alert transitions as JSON")
+    parser.add_argument("--duration", type=float, default=0, help="stop after this many seconds (0 = run forever)")
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="live")
+    results = open_run(args, "probe_daemon", base_url)
+    daemon = ProbeDaemon(base_url, build_checks(args.assignment_id, args.sequence), args.interval,
+                         args.concurrency, args.window_s, args.p95_ms, args.error_rate, args.min_samples,
+                         args.alert_webhook, results)
+
+    print("🛰️ Vehicle App Probe Daemon")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{len(daemon.checks)} checks every {args.interval:g}s, alert on p95 > {args.p95_ms:g} ms "
+          f"or errors > {args.error_rate:.0%} over {args.window_s:g}s")
+
+    server = None
+    if args.metrics_port:
+        server = ThreadingHTTPServer((args.metrics_host, args.metrics_port), MetricsHandler)
+        server.daemon_threads = True
+        server.probe = daemon
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Metrics: http://{args.metrics_host}:{server.server_address[1]}/metrics")
+
+    try:
+        daemon.run(args.duration)
+    except KeyboardInterrupt:
+        daemon.stop_event.set()
+        print("\n🛑 Stopped")
+    finally:
+        if server:
+            server.shutdown()
+        print_summary(daemon.snapshot())
+        if results:
+            results.finish()
+
+
+if __name__ == "__main__":
+    main()
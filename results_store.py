@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Persistent store of load and probe results, with cross-run regression checks
+
+Every load and probe run writes one row per request to a local SQLite
+file, so results outlive the terminal they were printed in:
+test_vehicle_app_live.py --load, route_simulator.py, probe_daemon.py,
+soak_harness.py, photo_upload_benchmark.py, route_prefetch_benchmark.py,
+area_contention_benchmark.py and straggler_harness.py.
+
+    runs     id, tool, target, label, started_at, finished_at, args
+    samples  run_id, endpoint, ts, latency_ms, error_class
+
+Samples are indexed by run and endpoint, by endpoint and time, and runs
+by target and time. The file defaults to vehicle_results.db in the
+working directory ($VEHICLE_RESULTS_DB or --results-db to change it,
+--no-results to skip recording).
+
+    python results_store.py runs
+    python results_store.py compare                  # latest run vs the one before it
+    python results_store.py compare 41 42 --min-change 0.1 --min-delta-ms 20
+
+compare flags an endpoint when its p95, p99 or throughput got worse and
+the bootstrap confidence interval of the difference excludes zero; it
+exits 1 when anything regressed, so a deploy check can gate on it.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from vehicle_load import HEALTHY_CLASSES, percentile
+
+DEFAULT_RESULTS_DB = "vehicle_results.db"
+
+RESULTS_DB_ENV_VAR = "VEHICLE_RESULTS_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool TEXT NOT NULL,
+    target TEXT NOT NULL,
+    label TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    args TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    endpoint TEXT NOT NULL,
+    ts REAL NOT NULL,
+    latency_ms REAL NOT NULL,
+    error_class TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_run_endpoint ON samples (run_id, endpoint);
+CREATE INDEX IF NOT EXISTS samples_endpoint_ts ON samples (endpoint, ts);
+CREATE INDEX IF NOT EXISTS runs_target_started ON runs (target, started_at);
+CREATE INDEX IF NOT EXISTS runs_tool_started ON runs (tool, started_at);
+"""
+
+# Samples buffered per executemany(); probe runs also flush on FLUSH_INTERVAL_S
+FLUSH_BATCH = 1000
+FLUSH_INTERVAL_S = 5.0
+
+# Bootstrapping resamples at most this many latencies per endpoint and run
+BOOTSTRAP_SAMPLE_CAP = 2000
+
+# Throughput is only compared when both runs span at least this many one-second buckets
+MIN_RATE_BUCKETS = 5
+
+
+def add_results_argument(parser):
+    """Add the shared --results-db / --no-results options to an argparse parser"""
+    parser.add_argument(
+        "--results-db", default=None,
+        help=f"SQLite file for per-request results (default: ${RESULTS_DB_ENV_VAR} or {DEFAULT_RESULTS_DB})")
+    parser.add_argument("--results-label", help="free-text label stored with the run, e.g. a deploy tag")
+    parser.add_argument("--no-results", action="store_true", help="do not record results")
+
+
+def resolve_results_db(path=None):
+    return path or os.environ.get(RESULTS_DB_ENV_VAR) or DEFAULT_RESULTS_DB
+
+
+def open_run(args, tool, target, store=None):
+    """
+    StoredRun for a script's parsed args, or None with --no-results
+
+    The run is added to `store` when given; otherwise it opens the results
+    file itself and closes it on finish().
+    """
+    if args.no_results:
+        return None
+    owns_store = store is None
+    if owns_store:
+        store = ResultsStore(resolve_results_db(args.results_db))
+    settings = {k: v for k, v in vars(args).items() if k not in ("results_db", "results_label", "no_results")}
+    run = store.start_run(tool, target, settings, args.results_label)
+    run.owns_store = owns_store
+    return run
+
+
+class ResultsStore:
+    """One SQLite results file; safe to share between threads"""
+
+    def __init__(self, path=DEFAULT_RESULTS_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def start_run(self, tool, target, args=None, label=None):
+        with self._lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (tool, target, label, started_at, args) VALUES (?, ?, ?, ?, ?)",
+                (tool, target, label, time.time(), json.dumps(args or {}, default=str)))
+        return StoredRun(self, cursor.lastrowid)
+
+    def _write_samples(self, rows):
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT INTO samples (run_id, endpoint, ts, latency_ms, error_class) VALUES (?, ?, ?, ?, ?)",
+                rows)
+
+    def _finish_run(self, run_id):
+        with self._lock, self.db:
+            self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def runs(self, limit=20, tool=None, target=None):
+        query = "SELECT runs.*, (SELECT COUNT(*) FROM samples WHERE run_id = runs.id) AS samples FROM runs"
+        clauses, params = [], []
+        if tool:
+            clauses.append("tool = ?")
+            params.append(tool)
+        if target:
+            clauses.append("target = ?")
+            params.append(target)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self.db.execute(query + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+
+    def run(self, run_id):
+        with self._lock:
+            return self.db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+    def previous_run(self, run):
+        """The latest run before `run` by the same tool against the same target"""
+        with self._lock:
+            return self.db.execute(
+                "SELECT * FROM runs WHERE tool = ? AND target = ? AND id < ? ORDER BY id DESC LIMIT 1",
+                (run["tool"], run["target"], run["id"])).fetchone()
+
+    def samples(self, run_id):
+        """endpoint -> list of (ts, latency_ms, error_class) for one run"""
+        by_endpoint = {}
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT endpoint, ts, latency_ms, error_class FROM samples WHERE run_id = ? ORDER BY ts",
+                (run_id,)).fetchall()
+        for endpoint, ts, latency_ms, error_class in rows:
+            by_endpoint.setdefault(endpoint, []).append((ts, latency_ms, error_class))
+        return by_endpoint
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StoredRun:
+    """
+    Sample sink for one run: has the LoadRecorder record() signature, so it
+    can be passed wherever a recorder or sink is taken. Writes are batched.
+    """
+
+    def __init__(self, store, run_id, owns_store=False):
+        self.store = store
+        self.id = run_id
+        self.owns_store = owns_store
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flushed_at = time.monotonic()
+
+    def record(self, endpoint, latency_ms, error_class, ts=None):
+        ts = ts if ts is not None else time.time()
+        with self._lock:
+            self._pending.append((self.id, endpoint, ts, latency_ms, error_class))
+            due = (len(self._pending) >= FLUSH_BATCH
+                   or time.monotonic() - self._flushed_at >= FLUSH_INTERVAL_S)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._flushed_at = time.monotonic()
+        if rows:
+            self.store._write_samples(rows)
+
+    def finish(self):
+        self.flush()
+        self.store._finish_run(self.id)
+        print(f"🗄️ Results saved as run {self.id} in {os.path.abspath(self.store.path)}")
+        if self.owns_store:
+            self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+
+
+def _quantile(values, pct):
+    return percentile(sorted(values), pct)
+
+
+def _bootstrap_delta(baseline, candidate, statistic, resamples, rng):
+    """95% bootstrap interval of statistic(candidate) - statistic(baseline)"""
+    deltas = sorted(
+        statistic(rng.choices(candidate, k=len(candidate))) - statistic(rng.choices(baseline, k=len(baseline)))
+        for _ in range(resamples))
+    return percentile(deltas, 2.5), percentile(deltas, 97.5)
+
+
+def _per_second_rates(samples, started_at, finished_at):
+    """
+    Requests per second in each second of a run
+
+    The trailing partial second is scaled by its real length; under half a
+    second it is folded into the second before it, so a few requests in a
+    sliver of time do not count as a burst.
+    """
+    end = finished_at or (samples[-1][0] if samples else started_at)
+    duration = max(end - started_at, 1e-3)
+    whole = int(duration)
+    counts = [0] * (whole + 1)
+    for ts, _, _ in samples:
+        counts[min(whole, max(0, int(ts - started_at)))] += 1
+    tail_s = duration - whole
+    if whole == 0 or tail_s >= 0.5:
+        return counts[:whole] + [counts[whole] / tail_s]
+    return counts[:whole - 1] + [(counts[whole - 1] + counts[whole]) / (1 + tail_s)]
+
+
+def _duration(run, samples):
+    end = run["finished_at"] or samples[-1][0]
+    return max(end - run["started_at"], 1e-3)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def compare_runs(store, baseline_run, candidate_run, min_change=0.2, min_delta_ms=5.0, resamples=1000, seed=0):
+    """
+    Per-endpoint p95/p99/throughput comparison of two runs
+
+    A metric regresses when it got worse by more than `min_change`
+    (relative; latencies also by more than `min_delta_ms`) and the
+    bootstrap 95% interval of the difference does not include zero.
+    Throughput is bootstrapped over per-second request rates; when either
+    run has fewer than MIN_RATE_BUCKETS of them its interval is None and
+    the endpoint is listed in row["insufficient"] instead of passing.
+    """
+    rng = random.Random(seed)
+    baseline_samples = store.samples(baseline_run["id"])
+    candidate_samples = store.samples(candidate_run["id"])
+    rows = []
+    for endpoint in sorted(set(baseline_samples) & set(candidate_samples)):
+        base, cand = baseline_samples[endpoint], candidate_samples[endpoint]
+        base_ms = [latency for _, latency, _ in base]
+        cand_ms = [latency for _, latency, _ in cand]
+        base_boot = base_ms if len(base_ms) <= BOOTSTRAP_SAMPLE_CAP else rng.sample(base_ms, BOOTSTRAP_SAMPLE_CAP)
+        cand_boot = cand_ms if len(cand_ms) <= BOOTSTRAP_SAMPLE_CAP else rng.sample(cand_ms, BOOTSTRAP_SAMPLE_CAP)
+        row = {"endpoint": endpoint, "baseline_n": len(base), "candidate_n": len(cand), "regressions": [],
+               "insufficient": []}
+
+        for pct in (95, 99):
+            before, after = _quantile(base_ms, pct), _quantile(cand_ms, pct)
+            low, high = _bootstrap_delta(base_boot, cand_boot, lambda v, p=pct: _quantile(v, p), resamples, rng)
+            row[f"p{pct}"] = (before, after, low, high)
+            if after > before * (1 + min_change) and after - before > min_delta_ms and low > 0:
+                row["regressions"].append(f"p{pct}")
+
+        base_rate = _per_second_rates(base, baseline_run["started_at"], baseline_run["finished_at"])
+        cand_rate = _per_second_rates(cand, candidate_run["started_at"], candidate_run["finished_at"])
+        before = len(base) / _duration(baseline_run, base)
+        after = len(cand) / _duration(candidate_run, cand)
+        if min(len(base_rate), len(cand_rate)) < MIN_RATE_BUCKETS:
+            row["rps"] = (before, after, None, None)
+            row["insufficient"].append("rps")
+        else:
+            low, high = _bootstrap_delta(base_rate, cand_rate, _mean, resamples, rng)
+            row["rps"] = (before, after, low, high)
+            if after < before * (1 - min_change) and high < 0:
+                row["regressions"].append("rps")
+
+        row["error_rate"] = (
+            _mean([error_class not in HEALTHY_CLASSES for _, _, error_class in base]),
+            _mean([error_class not in HEALTHY_CLASSES for _, _, error_class in cand]),
+        )
+        rows.append(row)
+    return rows
+
+
+def _describe_run(run):
+    label = f" '{run['label']}'" if run["label"] else ""
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started_at"]))
+    return f"run {run['id']}{label} ({run['tool']} → {run['target']}, {started})"
+
+
+def print_comparison(baseline_run, candidate_run, rows):
+    print("\n" + "=" * 60)
+    print("🔬 Run Comparison")
+    print("=" * 60)
+    print(f"Baseline:  {_describe_run(baseline_run)}")
+    print(f"Candidate: {_describe_run(candidate_run)}")
+    print(f"\n{'Endpoint':<50} {'metric':>6} {'baseline':>10} {'candidate':>10} {'change':>8}  95% CI of diff")
+    for row in rows:
+        for metric in ("p95", "p99", "rps"):
+            before, after, low, high = row[metric]
+            unit = "" if metric == "rps" else "ms"
+            change = (after - before) / before if before else 0.0
+            flag = "  ❌" if metric in row["regressions"] else ""
+            name = row["endpoint"] if metric == "p95" else ""
+            interval = (f"[{low:+.1f}, {high:+.1f}]" if low is not None
+                        else f"insufficient data (< {MIN_RATE_BUCKETS} s per run)  ⚠️")
+            print(f"{name:<50} {metric:>6} {before:>8.1f}{unit:<2} {after:>8.1f}{unit:<2} {change:>+8.1%}  "
+                  f"{interval}{flag}")
+        before, after = row["error_rate"]
+        print(f"{'':<50} {'errors':>6} {before:>10.1%} {after:>10.1%}   "
+              f"({row['baseline_n']} vs {row['candidate_n']} requests)")
+
+    regressed = [row for row in rows if row["regressions"]]
+    unchecked = [row for row in rows if row["insufficient"]]
+    if regressed:
+        print(f"\n❌ {len(regressed)} endpoint(s) regressed:")
+        for row in regressed:
+            print(f"   • {row['endpoint']}: {', '.join(row['regressions'])}")
+    elif unchecked:
+        print("\n✅ No significant p95/p99 regressions")
+    else:
+        print("\n✅ No significant p95/p99/throughput regressions")
+    if unchecked:
+        print(f"⚠️ Throughput not compared for {len(unchecked)} endpoint(s): insufficient data "
+              f"(runs need at least {MIN_RATE_BUCKETS} s of samples)")
+    return bool(regressed)
+
+
+def print_runs(runs):
+    print(f"{'id':>5} {'tool':<24} {'target':<32} {'started':<19} {'secs':>7} {'samples':>8}  label")
+    for run in runs:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started_at"]))
+        duration = f"{run['finished_at'] - run['started_at']:.1f}" if run["finished_at"] else "—"
+        print(f"{run['id']:>5} {run['tool']:<24} {run['target']:<32} {started:<19} {duration:>7} "
+              f"{run['samples']:>8}  {run['label'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse stored load/probe runs and compare them")
+    parser.add_argument("--results-db", default=None,
+                        help=f"SQLite results file (default: ${RESULTS_DB_ENV_VAR} or {DEFAULT_RESULTS_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="list recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    runs_parser.add_argument("--tool")
+    runs_parser.add_argument("--target")
+
+    compare_parser = commands.add_parser("compare", help="flag p95/p99/throughput regressions between two runs")
+    compare_parser.add_argument("run_ids", type=int, nargs="*", metavar="RUN",
+                                help="[BASELINE] CANDIDATE; the candidate defaults to the latest run and the "
+                                     "baseline to the run before it by the same tool against the same target")
+    compare_parser.add_argument("--min-change", type=float, default=0.2,
+                                help="smallest relative change that counts as a regression")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                                help="smallest p95/p99 increase that counts as a regression")
+    compare_parser.add_argument("--resamples", type=int, default=1000, help="bootstrap resamples")
+    compare_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = resolve_results_db(args.results_db)
+    if not os.path.exists(path):
+        print(f"❌ No results file at {path}")
+        sys.exit(1)
+    store = ResultsStore(path)
+
+    if args.command == "runs":
+        print_runs(store.runs(args.limit, args.tool, args.target))
+        return
+
+    if len(args.run_ids) > 2:
+        parser.error("compare takes at most two run IDs")
+    if args.run_ids:
+        candidate = store.run(args.run_ids[-1])
+    else:
+        latest = store.runs(limit=1)
+        candidate = store.run(latest[0]["id"]) if latest else None
+    if candidate is None:
+        print("❌ Candidate run not found")
+        sys.exit(1)
+    baseline = store.run(args.run_ids[0]) if len(args.run_ids) == 2 else store.previous_run(candidate)
+    if baseline is None:
+        print(f"❌ No baseline run to compare {_describe_run(candidate)} against")
+        sys.exit(1)
+
+    rows = compare_runs(store, baseline, candidate, args.min_change, args.min_delta_ms,
+                        args.resamples, args.seed)
+    if not rows:
+        print("⚠️ The two runs have no endpoints in common")
+        sys.exit(1)
+    if print_comparison(baseline, candidate, rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
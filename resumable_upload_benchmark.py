@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Resumable stop-photo uploads vs. restarting multipart uploads
+
+Contains the Python client for the resumable photo protocol (the same
+flow as src/services/photoUpload.js):
+
+  1. POST /api/assignments/<id>/stops/<sequence>/photo-uploads {"size": n}
+  2. POST /api/photo-uploads/<upload_id>?offset=<acknowledged> with the
+     next chunk, until the server acknowledges every byte; after a
+     disconnect, GET /api/photo-uploads/<upload_id> says where to resume
+  3. POST .../stops/<sequence>/complete {"photo_upload_id": ...}; the stop
+     is completed only once the photo is committed
+
+and a benchmark that pushes photos through an emulated phone uplink
+(bandwidth cap, connection drops from a seeded online/offline schedule,
+the app's 60 s / 30 s abort deadlines) in two ways:
+
+  multipart  - today's single multipart request, restarted from byte zero
+  resumable  - chunked, resuming from the server-acknowledged offset
+
+and reports time-to-complete and bytes retransmitted per photo:
+
+    python standin_backend.py --port 5000 &
+    python resumable_upload_benchmark.py --photo-kb 1500 --kbps 1000
+"""
+
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from photo_upload_benchmark import APP_UPLOAD_DEADLINE_S, StreamingMultipartBody
+from sync_lag_harness import ConnectivitySchedule
+from vehicle_client import VehicleClient, add_target_argument, resolve_target, timeout_for
+from vehicle_load import percentile
+
+MODES = ("multipart", "resumable")
+
+# Matches PhotoUpload.CHUNK_SIZE in the app: one chunk fits the 30 s chunk timeout even on 2G
+CHUNK_SIZE = 64 * 1024
+
+
+class LinkDropped(Exception):
+    """The emulated connection went away (or the app's deadline passed) mid-request"""
+
+
+class ResumablePhotoUpload:
+    """Client side of the resumable photo protocol for one stop"""
+
+    def __init__(self, client, assignment_id, sequence, photo, chunk_size=CHUNK_SIZE, wrap_body=None):
+        self.client = client
+        self.assignment_id = assignment_id
+        self.sequence = sequence
+        self.photo = photo
+        self.chunk_size = chunk_size
+        # Hook to send chunk bodies through something else (the benchmark's emulated uplink)
+        self.wrap_body = wrap_body or (lambda body, length, path: body)
+        self.upload_id = None
+        self.offset = 0
+        self.requests = 0
+
+    @property
+    def stop_path(self):
+        return f"/api/assignments/{self.assignment_id}/stops/{self.sequence}"
+
+    @property
+    def complete(self):
+        return self.upload_id is not None and self.offset >= len(self.photo)
+
+    def open(self):
+        """Start the upload, or pick up the acknowledged offset of the one already open"""
+        self.requests += 1
+        if self.upload_id is None:
+            response = self.client.post(f"{self.stop_path}/photo-uploads", json={"size": len(self.photo)})
+        else:
+            response = self.client.get(f"/api/photo-uploads/{self.upload_id}")
+        response.raise_for_status()
+        status = response.json()
+        self.upload_id, self.offset = status["upload_id"], status["offset"]
+
+    def send_next_chunk(self):
+        """Send the chunk at the acknowledged offset; the server's answer moves the offset"""
+        chunk = self.photo[self.offset:self.offset + self.chunk_size]
+        path = f"/api/photo-uploads/{self.upload_id}?offset={self.offset}"
+        self.requests += 1
+        response = self.client.post(path, data=self.wrap_body(io.BytesIO(chunk), len(chunk), path),
+                                    headers={"Content-Type": "application/offset+octet-stream",
+                                             "Content-Length": str(len(chunk))})
+        if response.status_code != 409:
+            response.raise_for_status()
+        # 409: part of an earlier attempt already arrived; the body says from where to go on
+        self.offset = response.json()["offset"]
+
+    def upload(self):
+        """Send every remaining chunk (raises on a dropped connection; call open() to resume)"""
+        if self.upload_id is None:
+            self.open()
+        while not self.complete:
+            self.send_next_chunk()
+
+    def commit(self, weight="12.5", notes=""):
+        """Complete the stop with the uploaded photo"""
+        self.requests += 1
+        response = self.client.post(f"{self.stop_path}/complete",
+                                    json={"weight": weight, "notes": notes, "photo_upload_id": self.upload_id})
+        response.raise_for_status()
+        return response.json()
+
+
+class EmulatedUplink:
+    """A phone's uplink: a bandwidth cap, plus drops whenever the schedule goes offline"""
+
+    def __init__(self, kbps, schedule):
+        self.bytes_per_s = kbps * 1000 / 8
+        self.schedule = schedule
+        self.bytes_sent = 0
+        self.drops = 0
+
+    def body(self, source, length, deadline_s):
+        return ThrottledBody(self, source, length, deadline_s)
+
+    def wait_until_online(self):
+        time.sleep(max(0.0, self.schedule.resumes_at() - time.monotonic()))
+
+
+class ThrottledBody:
+    """File-like request body (Content-Length framing) read at the uplink's pace"""
+
+    def __init__(self, link, source, length, deadline_s):
+        self.link = link
+        self.source = source
+        self.length = length
+        self.deadline = time.monotonic() + deadline_s
+
+    def __len__(self):
+        return self.length
+
+    def read(self, size=-1):
+        if time.monotonic() > self.deadline:
+            raise LinkDropped("aborted at the app's deadline")
+        if not self.link.schedule.is_online():
+            self.link.drops += 1
+            raise LinkDropped("connection dropped")
+        data = self.source.read(8192 if size < 0 else min(size, 8192))
+        time.sleep(len(data) / self.link.bytes_per_s)
+        self.link.bytes_sent += len(data)
+        return data
+
+
+def upload_multipart(client, link, assignment_id, sequence, photo_size, retry_s, max_time_s):
+    """Today's flow: one multipart request, retried from byte zero. Returns (done, requests)"""
+    path = f"/api/assignments/{assignment_id}/stops/{sequence}/complete"
+    started = time.monotonic()
+    attempts = 0
+    while time.monotonic() - started < max_time_s:
+        attempts += 1
+        body = StreamingMultipartBody(photo_size, fields={"weight": "12.5", "notes": ""})
+        try:
+            response = client.post(path, data=link.body(body, len(body), APP_UPLOAD_DEADLINE_S),
+                                   headers={"Content-Type": body.content_type, "Content-Length": str(len(body))})
+            if response.ok:
+                return True, attempts
+        except (LinkDropped, requests.exceptions.RequestException):
+            pass
+        link.wait_until_online()
+        time.sleep(retry_s)
+    return False, attempts
+
+
+def upload_resumable(client, link, assignment_id, sequence, photo, retry_s, max_time_s, chunk_size):
+    """Chunked upload resuming from the acknowledged offset. Returns (done, requests)"""
+    upload = ResumablePhotoUpload(
+        client, assignment_id, sequence, photo, chunk_size,
+        wrap_body=lambda body, length, path: link.body(body, length, timeout_for(path)[1]))
+    started = time.monotonic()
+    while time.monotonic() - started < max_time_s:
+        try:
+            upload.open()
+            upload.upload()
+            result = upload.commit()
+            return result.get("photo_bytes") == len(photo), upload.requests
+        except (LinkDropped, requests.exceptions.RequestException):
+            pass
+        link.wait_until_online()
+        time.sleep(retry_s)
+    return False, upload.requests
+
+
+def run_driver(base_url, mode, driver_index, args):
+    """One driver uploading --uploads photos over its own emulated uplink"""
+    photo_size = args.photo_kb * 1024
+    photo = os.urandom(photo_size)
+    # The same seed per driver in both modes: both see the same drops at the same times
+    link = EmulatedUplink(args.kbps, ConnectivitySchedule(args.mean_online_s, args.mean_offline_s,
+                                                          args.seed + driver_index))
+    assignment_id = args.first_assignment + driver_index
+    results = []
+    with VehicleClient(base_url, pool_size=1) as client:
+        for sequence in range(1, args.uploads + 1):
+            sent_before, drops_before = link.bytes_sent, link.drops
+            start = time.monotonic()
+            if mode == "multipart":
+                done, requests_made = upload_multipart(client, link, assignment_id, sequence, photo_size,
+                                                       args.retry_s, args.max_time_s)
+                body_size = len(StreamingMultipartBody(photo_size, fields={"weight": "12.5", "notes": ""}))
+            else:
+                done, requests_made = upload_resumable(client, link, assignment_id, sequence, photo,
+                                                       args.retry_s, args.max_time_s, args.chunk_kb * 1024)
+                body_size = photo_size
+            sent = link.bytes_sent - sent_before
+            results.append({
+                "done": done,
+                "seconds": time.monotonic() - start,
+                "sent": sent,
+                "retransmitted": max(0, sent - body_size) if done else sent,
+                "requests": requests_made,
+                "drops": link.drops - drops_before,
+            })
+    return results
+
+
+def run_mode(base_url, mode, args):
+    with ThreadPoolExecutor(max_workers=args.drivers) as pool:
+        drivers = list(pool.map(lambda i: run_driver(base_url, mode, i, args), range(args.drivers)))
+    uploads = [upload for driver in drivers for upload in driver]
+    done = [u for u in uploads if u["done"]]
+    seconds = sorted(u["seconds"] for u in done)
+    return {
+        "mode": mode,
+        "uploads": len(uploads),
+        "done": len(done),
+        "p50_s": percentile(seconds, 50),
+        "p95_s": percentile(seconds, 95),
+        "sent_kb": sum(u["sent"] for u in uploads) / len(uploads) / 1024,
+        "retransmitted_kb": sum(u["retransmitted"] for u in uploads) / len(uploads) / 1024,
+        "requests": sum(u["requests"] for u in uploads) / len(uploads),
+        "drops": sum(u["drops"] for u in uploads) / len(uploads),
+    }
+
+
+def print_resume_report(results, args):
+    print("\n" + "=" * 60)
+    print(f"📸 {args.photo_kb} KB Photo over a {args.kbps:g} kbit/s Uplink with Drops")
+    print("=" * 60)
+    print(f"{'mode':<10} {'done':>9} {'p50':>8} {'p95':>8} {'sent KB':>9} {'resent KB':>10} {'requests':>9} {'drops':>6}")
+    for r in results:
+        def fmt(value):
+            return f"{value:>7.1f}s" if value is not None else f"{'n/a':>8}"
+
+        print(f"{r['mode']:<10} {r['done']:>4}/{r['uploads']:<4} {fmt(r['p50_s'])} {fmt(r['p95_s'])} "
+              f"{r['sent_kb']:>9.0f} {r['retransmitted_kb']:>10.0f} {r['requests']:>9.1f} {r['drops']:>6.1f}")
+    print("\n   Per photo: sent = bytes pushed through the uplink, resent = sent beyond one copy of the body")
+
+    by_mode = {r["mode"]: r for r in results}
+    if set(by_mode) == set(MODES) and by_mode["resumable"]["done"]:
+        multipart, resumable = by_mode["multipart"], by_mode["resumable"]
+        print(f"\n✅ Resumable uploads resent {multipart['retransmitted_kb'] - resumable['retransmitted_kb']:.0f} KB "
+              f"less per photo and completed {resumable['done']}/{resumable['uploads']} "
+              f"(multipart {multipart['done']}/{multipart['uploads']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable vs. restarting stop-photo uploads under connection drops")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--drivers", type=int, default=4, help="drivers uploading in parallel, each on its own link")
+    parser.add_argument("--uploads", type=int, default=3, help="photos per driver per mode")
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--photo-kb", type=int, default=1500, help="photo size (an uncompressed 2000x2000 capture)")
+    parser.add_argument("--chunk-kb", type=int, default=CHUNK_SIZE // 1024)
+    parser.add_argument("--kbps", type=float, default=1000, help="uplink bandwidth")
+    parser.add_argument("--mean-online-s", type=float, default=8.0, help="mean time between drops")
+    parser.add_argument("--mean-offline-s", type=float, default=2.0, help="mean time until the link is back")
+    parser.add_argument("--retry-s", type=float, default=2.0, help="wait after a failed attempt (the queue's first backoff)")
+    parser.add_argument("--max-time-s", type=float, default=300.0, help="give up on a photo after this long")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    print("📸 Vehicle App Resumable Photo Upload Benchmark")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{args.drivers} drivers x {args.uploads} photos, link online ~{args.mean_online_s:g} s / "
+          f"offline ~{args.mean_offline_s:g} s")
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    results = []
+    for mode in modes:
+        print(f"📤 Uploading with {mode}...")
+        results.append(run_mode(base_url, mode, args))
+    print_resume_report(results, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Per-stop GETs vs. one bulk route prefetch
+
+Drives whole routes the way the app does after login and compares how
+stop details are loaded:
+
+  per-stop  - GET /assignments/<id>/stops/<sequence> after every completion
+  prefetch  - GET /assignments/<id>/stops once at login, then conditional
+              refreshes (If-None-Match + ?since=<version>) every
+              --refresh-every completed stops, as RouteCache.stopCompleted
+              does (API_CONFIG.ROUTE_CACHE.REFRESH_EVERY_STOPS in the app)
+
+Reports requests, bytes and the time a driver spends waiting for stop
+details per route. Completion requests are the same in both modes and are
+not counted. Add latency on the stand-in to see the mobile-network picture:
+
+    python standin_backend.py --port 5000 --latency-ms 150 --jitter-ms 50 &
+    python route_prefetch_benchmark.py --drivers 10 --stops 79
+
+With --trace-file each route is recorded as one trace (render it with
+python vehicle_tracing.py <file>). Each mode is saved as its own run in
+the results store (tool "route_prefetch_benchmark <mode>"), one sample
+per stop-detail request.
+"""
+
+import argparse
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from results_store import ResultsStore, add_results_argument, open_run, resolve_results_db
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+from vehicle_load import classify_exception, classify_response, percentile
+from vehicle_tracing import add_tracing_argument, tracer_from_args
+
+MODES = ("per-stop", "prefetch")
+
+
+class RouteReads:
+    """Stop-detail requests made while driving one route, also passed to `sink` when given"""
+
+    def __init__(self, sink=None):
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes = 0
+        self.wait_ms = 0.0
+        self.errors = 0
+        self.sink = sink
+
+    def get(self, client, endpoint, path, blocking=True, **kwargs):
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            response = client.get(path, **kwargs)
+            error_class = classify_response(response.status_code)
+        except requests.exceptions.RequestException as e:
+            response, error_class = None, classify_exception(e)
+        latency_ms = (time.perf_counter() - start) * 1000.0
+        if blocking:
+            self.wait_ms += latency_ms
+        if self.sink is not None:
+            self.sink.record(endpoint, latency_ms, error_class)
+        if response is None:
+            self.errors += 1
+            return None
+        self.bytes += len(response.content)
+        if response.status_code == 304:
+            self.not_modified += 1
+        elif not response.ok:
+            self.errors += 1
+            return None
+        return response
+
+
+def drive_route(base_url, assignment_id, stops, mode, refresh_every, tracer=None, sink=None):
+    """Complete every stop of one route and load the next stop's details"""
+    reads = RouteReads(sink)
+    route_span = (tracer.span("driver route", **{"assignment.id": assignment_id, "mode": mode})
+                  if tracer else contextlib.nullcontext())
+    with route_span, VehicleClient(base_url, pool_size=1, tracer=tracer) as client:
+        prefix = f"/api/assignments/{assignment_id}/stops"
+        etag, version = None, None
+        if mode == "prefetch":
+            response = reads.get(client, "GET stops", prefix)
+            if response is not None:
+                etag, version = response.headers.get("ETag"), response.json().get("version")
+
+        for sequence in range(1, stops + 1):
+            client.post(f"{prefix}/{sequence}/complete", json={"weight": "5.0", "notes": ""}).content
+            if sequence == stops:
+                break
+            if mode == "per-stop":
+                reads.get(client, "GET stop", f"{prefix}/{sequence + 1}")
+            elif refresh_every and sequence % refresh_every == 0:
+                # The app refreshes in the background; the driver never waits on it
+                headers = {"If-None-Match": etag} if etag else {}
+                response = reads.get(client, "GET stops refresh", prefix, blocking=False, headers=headers,
+                                     params={"since": version} if version is not None else None)
+                if response is not None and response.status_code == 200:
+                    etag, version = response.headers.get("ETag"), response.json().get("version")
+    return reads
+
+
+def run_mode(base_url, mode, drivers, stops, first_assignment, refresh_every, tracer=None, sink=None):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=drivers) as pool:
+        routes = list(pool.map(
+            lambda i: drive_route(base_url, first_assignment + i, stops, mode, refresh_every, tracer, sink),
+            range(drivers)))
+    elapsed = time.perf_counter() - start
+
+    waits = sorted(route.wait_ms for route in routes)
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "requests_per_route": sum(route.requests for route in routes) / drivers,
+        "not_modified": sum(route.not_modified for route in routes),
+        "kb_per_route": sum(route.bytes for route in routes) / drivers / 1024,
+        "wait_p50_ms": percentile(waits, 50),
+        "wait_p95_ms": percentile(waits, 95),
+        "errors": sum(route.errors for route in routes),
+    }
+
+
+def print_comparison(results, stops):
+    print("\n" + "=" * 60)
+    print(f"🗺️ Stop Detail Loading per {stops}-Stop Route")
+    print("=" * 60)
+    print(f"{'mode':<10} {'requests':>9} {'304s':>6} {'KB':>8} {'wait p50':>10} {'wait p95':>10} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['requests_per_route']:>9.1f} {r['not_modified']:>6} {r['kb_per_route']:>8.1f} "
+              f"{r['wait_p50_ms']:>8.0f}ms {r['wait_p95_ms']:>8.0f}ms {r['errors']:>7}")
+
+    by_mode = {r["mode"]: r for r in results}
+    if set(by_mode) == set(MODES) and by_mode["prefetch"]["wait_p50_ms"]:
+        saved = by_mode["per-stop"]["wait_p50_ms"] - by_mode["prefetch"]["wait_p50_ms"]
+        print(f"\n⏱️ Prefetch saves each driver {saved / 1000:.1f}s of waiting per route (p50), "
+              f"{by_mode['per-stop']['requests_per_route'] - by_mode['prefetch']['requests_per_route']:.0f} "
+              f"requests fewer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-stop GETs with a bulk route prefetch")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--drivers", type=int, default=10, help="routes driven in parallel per mode")
+    parser.add_argument("--stops", type=int, default=79, help="stops per route (must match the backend)")
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--refresh-every", type=int, default=10,
+                        help="stops between background route refreshes in prefetch mode, as "
+                             "API_CONFIG.ROUTE_CACHE.REFRESH_EVERY_STOPS in the app (0 = never)")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both")
+    add_tracing_argument(parser)
+    add_results_argument(parser)
+    args = parser.parse_args()
+    tracer = tracer_from_args(args, "route-prefetch-benchmark")
+
+    base_url = resolve_target(args.target, default="local")
+    print("🗺️ Vehicle App Route Prefetch Benchmark")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{args.drivers} drivers x {args.stops} stops per mode")
+
+    modes = MODES if args.mode == "both" else (args.mode,)
+    results = []
+    # One results file connection for every mode's run
+    store = None if args.no_results else ResultsStore(resolve_results_db(args.results_db))
+    try:
+        for index, mode in enumerate(modes):
+            # Each mode drives its own routes, so completions from one do not show up as deltas in the other
+            first = args.first_assignment + index * args.drivers
+            print(f"🚚 Driving {mode} routes (assignments {first}-{first + args.drivers - 1})...")
+            stored = open_run(args, f"route_prefetch_benchmark {mode}", base_url, store)
+            results.append(run_mode(base_url, mode, args.drivers, args.stops, first, args.refresh_every, tracer,
+                                    stored))
+            if stored:
+                stored.finish()
+    finally:
+        if store is not None:
+            store.close()
+    print_comparison(results, args.stops)
+    if tracer:
+        tracer.flush()
+        print(f"\n🧭 Spans written to {args.trace_file} (python vehicle_tracing.py {args.trace_file})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Route sequencing for assignment stops
+
+Orders an assignment's stops by their coordinates to shorten the drive:
+a haversine distance matrix (NumPy, all pairs at once), a nearest-
+neighbour tour from the first stop, then 2-opt (reverse a stretch of the
+route) and Or-opt (move a run of 1-3 stops elsewhere, either way round)
+until neither finds an improvement. Each improvement pass scans all
+candidate moves for one position as a NumPy vector.
+
+Routes are open paths: the driver starts at the first stop of the given
+order and may finish anywhere. A whole fleet is sequenced in a process
+pool, one assignment per task:
+
+    python route_sequencer.py --assignment 12
+    python route_sequencer.py --assignment 12 --target lan --show 20
+
+Requires NumPy (pip install numpy). See route_sequencing_benchmark.py for
+solve times and savings on synthetic Delhi/Gurugram routes.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ NumPy is required: pip install numpy")
+    sys.exit(1)
+
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Ignore "improvements" below a metre; float noise otherwise loops forever
+MIN_GAIN_KM = 1e-3
+
+OR_OPT_SEGMENTS = (1, 2, 3)
+
+
+def haversine_matrix(latitudes, longitudes):
+    """Great-circle distances (km) between every pair of points"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def route_length(order, dist):
+    order = np.asarray(order)
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(dist, start=0):
+    """Greedy route: always drive to the closest stop not yet visited"""
+    n = len(dist)
+    visited = np.zeros(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    order[0] = start
+    visited[start] = True
+    for i in range(1, n):
+        row = np.where(visited, np.inf, dist[order[i - 1]])
+        order[i] = int(np.argmin(row))
+        visited[order[i]] = True
+    return order
+
+
+def _with_free_end(dist):
+    """Append a dummy stop at zero distance from all others, so an open path becomes a tour end"""
+    n = len(dist)
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = dist
+    return padded
+
+
+def two_opt_pass(route, dist):
+    """
+    One sweep of 2-opt over a path with fixed ends; reverses route[i+1..j]
+    in place wherever that shortens it. Returns the total gain (km).
+    """
+    n = len(route)
+    gained = 0.0
+    for i in range(n - 3):
+        a, b = route[i], route[i + 1]
+        c = route[i + 2:n - 1]
+        d = route[i + 3:n]
+        delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+        best = int(np.argmin(delta))
+        if delta[best] < -MIN_GAIN_KM:
+            j = i + 2 + best
+            route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+            gained -= float(delta[best])
+    return gained
+
+
+def or_opt_pass(route, dist):
+    """
+    One sweep of Or-opt over a path with fixed ends: moves runs of 1-3 stops
+    between two other neighbours (either way round) wherever that shortens
+    it. Returns (new route, total gain in km).
+    """
+    gained = 0.0
+    for k in OR_OPT_SEGMENTS:
+        i = 1
+        while i + k < len(route):
+            p, s0, s1, q = route[i - 1], route[i], route[i + k - 1], route[i + k]
+            removal_gain = dist[p, s0] + dist[s1, q] - dist[p, q]
+            rest = np.concatenate([route[:i], route[i + k:]])
+            u, v = rest[:-1], rest[1:]
+            forward = dist[u, s0] + dist[s1, v] - dist[u, v]
+            backward = dist[u, s1] + dist[s0, v] - dist[u, v]
+            insertion = np.minimum(forward, backward)
+            # Putting the run back where it came from is not a move
+            insertion[i - 1] = np.inf
+            best = int(np.argmin(insertion))
+            if removal_gain - insertion[best] > MIN_GAIN_KM:
+                segment = route[i:i + k] if forward[best] <= backward[best] else route[i:i + k][::-1]
+                route = np.concatenate([rest[:best + 1], segment, rest[best + 1:]])
+                gained += float(removal_gain - insertion[best])
+            else:
+                i += 1
+    return route, gained
+
+
+def sequence_route(latitudes, longitudes, start=0, max_rounds=50):
+    """
+    Stop order (indices into the inputs) for an open route starting at `start`
+
+    Returns (order, given_km, sequenced_km) where given_km is the length of
+    the order the stops came in.
+    """
+    n = len(latitudes)
+    dist = haversine_matrix(latitudes, longitudes)
+    given_km = route_length(np.arange(n), dist)
+    if n < 4:
+        return list(range(n)), given_km, given_km
+
+    padded = _with_free_end(dist)
+    route = np.append(nearest_neighbour(dist, start), n)
+    for _ in range(max_rounds):
+        gained = two_opt_pass(route, padded)
+        route, or_gained = or_opt_pass(route, padded)
+        if gained + or_gained <= MIN_GAIN_KM:
+            break
+    order = route[:-1]
+    return order.tolist(), given_km, route_length(order, dist)
+
+
+def _sequence_assignment(task):
+    assignment_id, latitudes, longitudes = task
+    started = time.perf_counter()
+    order, given_km, sequenced_km = sequence_route(latitudes, longitudes)
+    return {
+        "assignment_id": assignment_id,
+        "order": order,
+        "given_km": given_km,
+        "sequenced_km": sequenced_km,
+        "solve_s": time.perf_counter() - started,
+    }
+
+
+def sequence_fleet(assignments, workers=None):
+    """
+    Sequence many assignments in parallel
+
+    `assignments` maps assignment ID -> list of stops with latitude and
+    longitude (in their current order). Returns one result per assignment
+    with the new order as indices into its stop list.
+    """
+    tasks = [(assignment_id, [s["latitude"] for s in stops], [s["longitude"] for s in stops])
+             for assignment_id, stops in assignments.items()]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_sequence_assignment(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_sequence_assignment, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose a shorter stop order for an assignment")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--assignment", type=int, required=True)
+    parser.add_argument("--show", type=int, default=10, help="stops of the proposed order to list")
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    print("🗺️ Vehicle App Route Sequencer")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+
+    with VehicleClient(base_url) as client:
+        response = client.get(f"/api/assignments/{args.assignment}/stops")
+        if not response.ok:
+            print(f"❌ Could not load assignment {args.assignment}: HTTP {response.status_code}")
+            sys.exit(1)
+        stops = sorted(response.json()["stops"], key=lambda s: s["sequence"])
+
+    result = _sequence_assignment((args.assignment, [s["latitude"] for s in stops],
+                                   [s["longitude"] for s in stops]))
+    saved = result["given_km"] - result["sequenced_km"]
+    print(f"\n📍 Assignment {args.assignment}: {len(stops)} stops, solved in {result['solve_s'] * 1000:.0f} ms")
+    print(f"   Given order: {result['given_km']:.1f} km")
+    print(f"   Sequenced:   {result['sequenced_km']:.1f} km ({saved:.1f} km shorter)")
+    print(f"\n   Proposed order (first {min(args.show, len(stops))}):")
+    for position, index in enumerate(result["order"][:args.show], start=1):
+        stop = stops[index]
+        print(f"   {position:>3}. stop {stop['sequence']:>3}  {stop.get('name_snapshot', '')}  "
+              f"({stop['latitude']:.5f}, {stop['longitude']:.5f})")
+
+
+if __name__ == "__main__":
+    main()
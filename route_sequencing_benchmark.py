@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Route sequencing benchmark on synthetic Delhi/Gurugram fleets
+
+Builds a day's fleet of assignments with the stand-in backend's route
+generator (stops scattered around each area centre, 50-500 per route),
+sequences every route with route_sequencer.py and reports:
+
+  - solve time per route, by route size
+  - route length against the given order and against plain nearest-
+    neighbour (what a driver picking the closest next stop would drive)
+  - wall-clock time for the whole fleet with one process and with a pool
+
+    python route_sequencing_benchmark.py --assignments 100 --workers 8
+
+The synthetic given order is random, so savings against it are an upper
+bound; the nearest-neighbour column is the fairer baseline.
+"""
+
+import argparse
+import os
+import random
+import time
+
+from route_sequencer import haversine_matrix, nearest_neighbour, route_length, sequence_fleet
+from standin_backend import AREA_NAMES, SyntheticRoute
+from vehicle_load import percentile
+
+SIZE_BUCKETS = ((50, 100), (101, 200), (201, 350), (351, 500))
+
+
+def synthetic_fleet(assignments_per_area, min_stops, max_stops, seed):
+    """assignment ID -> stops (in their given order) for every area"""
+    rng = random.Random(seed)
+    fleet = {}
+    for area_index, area in enumerate(AREA_NAMES):
+        for i in range(assignments_per_area):
+            assignment_id = area_index * assignments_per_area + i + 1
+            route = SyntheticRoute(assignment_id, rng.randint(min_stops, max_stops), area, seed)
+            fleet[assignment_id] = route.stops
+    return fleet
+
+
+def nearest_neighbour_km(stops):
+    dist = haversine_matrix([s["latitude"] for s in stops], [s["longitude"] for s in stops])
+    return route_length(nearest_neighbour(dist), dist)
+
+
+def timed_fleet(fleet, workers):
+    start = time.perf_counter()
+    results = sequence_fleet(fleet, workers=workers)
+    return results, time.perf_counter() - start
+
+
+def print_sequencing_report(fleet, results, nn_km, serial_s, pool_s, workers):
+    print("\n" + "=" * 60)
+    print("🗺️ Route Sequencing")
+    print("=" * 60)
+    print(f"{'stops':<10} {'routes':>6} {'solve p50':>10} {'solve p95':>10} {'vs given':>9} {'vs NN':>7}")
+    for low, high in SIZE_BUCKETS:
+        bucket = [r for r in results if low <= len(fleet[r["assignment_id"]]) <= high]
+        if not bucket:
+            continue
+        solve_ms = sorted(r["solve_s"] * 1000.0 for r in bucket)
+        given = sum(r["given_km"] for r in bucket)
+        nn = sum(nn_km[r["assignment_id"]] for r in bucket)
+        sequenced = sum(r["sequenced_km"] for r in bucket)
+        print(f"{f'{low}-{high}':<10} {len(bucket):>6} {percentile(solve_ms, 50):>8.0f}ms "
+              f"{percentile(solve_ms, 95):>8.0f}ms {1 - sequenced / given:>8.1%} {1 - sequenced / nn:>6.1%}")
+
+    given = sum(r["given_km"] for r in results)
+    nn = sum(nn_km.values())
+    sequenced = sum(r["sequenced_km"] for r in results)
+    stops = sum(len(stops) for stops in fleet.values())
+    print(f"\n📏 Fleet distance: given {given:,.0f} km, nearest-neighbour {nn:,.0f} km, sequenced {sequenced:,.0f} km")
+    if serial_s is None:
+        print(f"⏱️ {len(fleet)} routes ({stops:,} stops): {pool_s:.1f}s with {workers} worker(s)")
+    else:
+        print(f"⏱️ {len(fleet)} routes ({stops:,} stops): {serial_s:.1f}s in one process, "
+              f"{pool_s:.1f}s with {workers} workers ({serial_s / pool_s:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route sequencing on a synthetic fleet")
+    parser.add_argument("--assignments", type=int, default=100, help="assignments per area")
+    parser.add_argument("--min-stops", type=int, default=50)
+    parser.add_argument("--max-stops", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--skip-serial", action="store_true", help="only time the process pool")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("🗺️ Vehicle App Route Sequencing Benchmark")
+    print("=" * 60)
+    fleet = synthetic_fleet(args.assignments, args.min_stops, args.max_stops, args.seed)
+    print(f"{len(fleet)} assignments across {', '.join(AREA_NAMES)}, "
+          f"{args.min_stops}-{args.max_stops} stops each, {args.workers} workers")
+
+    print(f"🚚 Sequencing the fleet with {args.workers} workers...")
+    results, pool_s = timed_fleet(fleet, args.workers)
+    serial_s = None
+    if not args.skip_serial and args.workers > 1:
+        print("🚚 Sequencing the fleet in one process...")
+        _, serial_s = timed_fleet(fleet, 1)
+
+    nn_km = {assignment_id: nearest_neighbour_km(stops) for assignment_id, stops in fleet.items()}
+    print_sequencing_report(fleet, results, nn_km, serial_s, pool_s, args.workers)
+
+
+if __name__ == "__main__":
+    main()
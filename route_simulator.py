@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Full-route replay simulator for the Vehicle App
+
+Drives whole assignments the way the app does in production:
+
+    POST start-trip
+    for each stop:  POST stops/{seq}/start
+                    POST stops/{seq}/complete   (multipart weight + photo)
+                    GET  stops/{seq + 1}        (PickupController.completeCurrentPickup)
+    POST end-trip
+
+Hundreds of assignments run concurrently. Every step is recorded on a
+timeline so you can see which stage degrades first as the fleet grows.
+Each fleet size is saved as its own run in the results store (tool
+"route_simulator x<fleet>"), so `results_store.py compare` lines up
+like-for-like fleets.
+"""
+
+import argparse
+import csv
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from results_store import ResultsStore, add_results_argument, open_run, resolve_results_db
+from vehicle_client import VehicleClient, add_target_argument, resolve_target
+from vehicle_load import LoadRecorder, timed_request, print_load_report
+
+ROUTE_STEPS = ["start-trip", "stop-start", "stop-complete", "next-stop", "end-trip"]
+
+
+def synthetic_jpeg(size_bytes, rng=None):
+    """Random bytes framed as a JPEG (SOI ... EOI) of the requested size"""
+    rng = rng or random
+    body_size = max(0, size_bytes - 4)
+    return b"\xff\xd8" + rng.randbytes(body_size) + b"\xff\xd9"
+
+
+class RouteTimeline:
+    """Per-step latency timeline shared by all simulated assignments"""
+
+    def __init__(self, sink=None):
+        self._lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.rows = []
+        self.recorder = LoadRecorder(sink)
+
+    def add(self, fleet_size, assignment_id, step, sequence, latency_ms, error_class):
+        started_at = time.perf_counter() - self.start - latency_ms / 1000.0
+        with self._lock:
+            self.rows.append((fleet_size, assignment_id, step, sequence,
+                              round(started_at, 4), round(latency_ms, 2), error_class))
+        self.recorder.record(step, latency_ms, error_class)
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fleet_size", "assignment_id", "step", "sequence",
+                             "started_at_s", "latency_ms", "result"])
+            writer.writerows(self.rows)
+
+
+class _AssignmentRecorder:
+    """Adapter giving timed_request the assignment/sequence context of a step"""
+
+    def __init__(self, timeline, fleet_size, assignment_id):
+        self.timeline = timeline
+        self.fleet_size = fleet_size
+        self.assignment_id = assignment_id
+        self.sequence = None
+
+    def record(self, step, latency_ms, error_class):
+        self.timeline.add(self.fleet_size, self.assignment_id, step, self.sequence,
+                          latency_ms, error_class)
+
+
+def _think(think_ms, rng):
+    """Exponentially distributed driver think-time around `think_ms`"""
+    if think_ms > 0:
+        time.sleep(rng.expovariate(1000.0 / think_ms))
+
+
+def simulate_assignment(base_url, assignment_id, total_stops, timeline, fleet_size,
+                        think_ms=0, photo_bytes=300 * 1024, seed=None):
+    """Replay one complete route; failed steps are recorded and the route continues"""
+    rng = random.Random(seed)
+    recorder = _AssignmentRecorder(timeline, fleet_size, assignment_id)
+    photo = synthetic_jpeg(photo_bytes, rng)
+    prefix = f"/api/assignments/{assignment_id}"
+
+    with VehicleClient(base_url, pool_size=1) as client:
+        timed_request(client, recorder, "start-trip", "POST", f"{prefix}/start-trip")
+
+        for sequence in range(1, total_stops + 1):
+            recorder.sequence = sequence
+            _think(think_ms, rng)
+            timed_request(client, recorder, "stop-start", "POST", f"{prefix}/stops/{sequence}/start")
+            _think(think_ms, rng)
+            timed_request(
+                client, recorder, "stop-complete", "POST", f"{prefix}/stops/{sequence}/complete",
+                data={"weight": f"{rng.uniform(0.5, 25.0):.1f}", "notes": ""},
+                files={"photo": (f"photo_{assignment_id}_{sequence}.jpg", photo, "image/jpeg")},
+            )
+            if sequence < total_stops:
+                recorder.sequence = sequence + 1
+                timed_request(client, recorder, "next-stop", "GET", f"{prefix}/stops/{sequence + 1}")
+
+        recorder.sequence = None
+        timed_request(client, recorder, "end-trip", "POST", f"{prefix}/end-trip")
+
+
+def run_fleet(base_url, fleet_size, first_assignment_id, total_stops, timeline,
+              think_ms=0, photo_bytes=300 * 1024):
+    """Run `fleet_size` assignments concurrently; returns elapsed seconds"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=fleet_size) as pool:
+        futures = [
+            pool.submit(simulate_assignment, base_url, first_assignment_id + i, total_stops,
+                        timeline, fleet_size, think_ms, photo_bytes, seed=first_assignment_id + i)
+            for i in range(fleet_size)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - start
+
+
+def print_degradation_report(stage_summaries):
+    """Per-step p95 at each fleet size, relative to the smallest fleet"""
+    print("\n" + "=" * 60)
+    print("📉 Step p95 by Fleet Size (ratio vs smallest fleet)")
+    print("=" * 60)
+    fleet_sizes = [fleet for fleet, _ in stage_summaries]
+    print(f"{'Step':<15}" + "".join(f"{fleet:>16}" for fleet in fleet_sizes))
+
+    degraded = []
+    for step_index, step in enumerate(ROUTE_STEPS):
+        cells = []
+        baseline = None
+        for fleet_index, (fleet, summaries) in enumerate(stage_summaries):
+            p95 = next((s["p95_ms"] for s in summaries if s["endpoint"] == step), None)
+            if p95 is None:
+                cells.append(f"{'n/a':>16}")
+                continue
+            baseline = baseline or p95
+            ratio = p95 / baseline if baseline else 1.0
+            cells.append(f"{p95:>9.1f} x{ratio:<5.2f}")
+            if ratio >= 2.0:
+                degraded.append((fleet_index, step_index, step, fleet))
+        print(f"{step:<15}" + "".join(cells))
+
+    if degraded:
+        _, _, step, fleet = min(degraded)
+        print(f"\n⚠️ First stage to degrade (p95 doubled): {step} at {fleet} assignments")
+    else:
+        print("\n✅ No stage doubled its p95 across the tested fleet sizes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay full assignment routes at fleet scale")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--fleet", default="10",
+                        help="comma-separated fleet sizes to run in turn, e.g. 50,100,200")
+    parser.add_argument("--first-assignment", type=int, default=1, help="first assignment ID to drive")
+    parser.add_argument("--stops", type=int, default=79, help="stops per assignment")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean driver think-time between steps")
+    parser.add_argument("--photo-kb", type=int, default=300, help="synthetic photo size per completion")
+    parser.add_argument("--timeline", help="write the per-step timeline to this CSV file")
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    fleet_sizes = [int(size) for size in args.fleet.split(",")]
+
+    print("🚛 Vehicle App Route Simulator")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"Fleet sizes: {fleet_sizes}, {args.stops} stops each, think-time {args.think_ms} ms")
+
+    timelines = []
+    stage_summaries = []
+    # One results file connection for every fleet size's run
+    store = None if args.no_results else ResultsStore(resolve_results_db(args.results_db))
+    try:
+        for fleet_size in fleet_sizes:
+            results = open_run(args, f"route_simulator x{fleet_size}", base_url, store)
+            timeline = RouteTimeline(results)
+            elapsed = run_fleet(base_url, fleet_size, args.first_assignment, args.stops, timeline,
+                                think_ms=args.think_ms, photo_bytes=args.photo_kb * 1024)
+            if results:
+                results.finish()
+            summaries = timeline.recorder.summaries(elapsed)
+            print_load_report(summaries, elapsed, fleet_size)
+            stage_summaries.append((fleet_size, summaries))
+            timelines.append(timeline)
+    finally:
+        if store is not None:
+            store.close()
+
+    if len(stage_summaries) > 1:
+        print_degradation_report(stage_summaries)
+
+    if args.timeline:
+        combined = RouteTimeline()
+        for timeline in timelines:
+            combined.rows.extend(timeline.rows)
+        combined.write_csv(args.timeline)
+        print(f"\n📝 Timeline written to {os.path.abspath(args.timeline)}")
+
+
+if __name__ == "__main__":
+    main()
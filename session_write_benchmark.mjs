@@ -0,0 +1,158 @@
+// Micro-benchmark: session write cost per stop, whole-blob rewrite vs cursor-only
+//
+// Replays a full route of stop advances against an in-memory stand-in for
+// AsyncStorage and reports bytes written and JS time (parse + stringify +
+// storage call) per stop, for the V1 driver session (with its pickups
+// array) and the V2 assignment session.
+//
+// Usage: node session_write_benchmark.mjs [stops] [routes]
+
+import { SESSION_LAYOUTS, mergeSession, splitSession } from './src/utils/sessionLayout.js';
+
+const STOPS = Number(process.argv[2] || 79);
+const ROUTES = Number(process.argv[3] || 200);
+
+// Counts what would cross the bridge into native storage
+class MeasuredStorage {
+  constructor() {
+    this.items = new Map();
+    this.bytesWritten = 0;
+    this.writes = 0;
+  }
+
+  getItem(key) {
+    return this.items.has(key) ? this.items.get(key) : null;
+  }
+
+  setItem(key, value) {
+    this.items.set(key, value);
+    this.bytesWritten += Buffer.byteLength(key) + Buffer.byteLength(value);
+    this.writes += 1;
+  }
+}
+
+const syntheticStop = sequence => ({
+  sequence,
+  customer_id_snapshot: `CUST00042${String(sequence).padStart(3, '0')}`,
+  name_snapshot: `Customer 42-${sequence}`,
+  address_snapshot: `H no ${100 + sequence}, Sector ${sequence % 110}, Delhi`,
+  contact_no: `98${String(10000000 + sequence * 7919).slice(0, 8)}`,
+  latitude: 28.6139 + sequence / 1000,
+  longitude: 77.209 + sequence / 1000,
+  status: 'pending',
+});
+
+const sessions = {
+  driver: () => ({
+    driverId: 42,
+    vehicleNumber: 'DL1LAN3660',
+    driverName: 'Driver 42',
+    currentPickupIndex: 0,
+    totalPickups: STOPS,
+    pickups: Array.from({ length: STOPS }, (_, i) => {
+      const stop = syntheticStop(i + 1);
+      return {
+        customer_name: stop.name_snapshot,
+        address: stop.address_snapshot,
+        latitude: stop.latitude,
+        longitude: stop.longitude,
+        next_pickup_date: null,
+      };
+    }),
+    loginTime: new Date().toISOString(),
+  }),
+  assignment: () => ({
+    assignmentId: 42,
+    vehicleNumber: 'DL1LAN3660',
+    driverName: 'Driver 42',
+    routeDate: '2026-10-17',
+    totalStops: STOPS,
+    currentSequence: 1,
+    currentStop: syntheticStop(1),
+    loginTime: new Date().toISOString(),
+    isV2: true,
+  }),
+};
+
+// The change each stop advance makes, per session kind
+const advance = {
+  driver: index => ({ currentPickupIndex: index }),
+  assignment: index => ({ currentSequence: index + 1, currentStop: syntheticStop(index + 1) }),
+};
+
+// Before: read, parse and rewrite the whole session blob
+const blobStrategy = {
+  login(storage, layout, session) {
+    storage.setItem(layout.key, JSON.stringify(session));
+  },
+  step(storage, layout, changes) {
+    const session = JSON.parse(storage.getItem(layout.key));
+    Object.assign(session, changes, { updatedAt: new Date().toISOString() });
+    storage.setItem(layout.key, JSON.stringify(session));
+  },
+};
+
+// After: SessionStore.updateCursor rewrites only the cursor key
+const splitStrategy = {
+  login(storage, layout, session) {
+    const { route, cursor } = splitSession(layout, session);
+    storage.setItem(layout.key, JSON.stringify(route));
+    storage.setItem(layout.cursorKey, JSON.stringify(cursor));
+  },
+  step(storage, layout, changes) {
+    const stored = storage.getItem(layout.cursorKey);
+    const cursor = { ...(stored ? JSON.parse(stored) : {}), ...changes, updatedAt: new Date().toISOString() };
+    storage.setItem(layout.cursorKey, JSON.stringify(cursor));
+  },
+};
+
+const run = (kind, strategy) => {
+  const layout = SESSION_LAYOUTS[kind];
+  let stepNs = 0n;
+  let stepBytes = 0;
+  let finalSession = null;
+
+  for (let route = 0; route < ROUTES; route++) {
+    const storage = new MeasuredStorage();
+    strategy.login(storage, layout, sessions[kind]());
+    const loginBytes = storage.bytesWritten;
+
+    const start = process.hrtime.bigint();
+    for (let index = 1; index < STOPS; index++) {
+      strategy.step(storage, layout, advance[kind](index));
+    }
+    stepNs += process.hrtime.bigint() - start;
+    stepBytes += storage.bytesWritten - loginBytes;
+
+    const cursor = storage.getItem(layout.cursorKey);
+    finalSession = mergeSession(JSON.parse(storage.getItem(layout.key)), cursor ? JSON.parse(cursor) : null);
+  }
+
+  const steps = ROUTES * (STOPS - 1);
+  return {
+    usPerStop: Number(stepNs) / steps / 1000,
+    bytesPerStop: stepBytes / steps,
+    finalSession,
+  };
+};
+
+console.log('💾 Session Write Benchmark');
+console.log('='.repeat(60));
+console.log(`${STOPS}-stop route, ${ROUTES} routes per case (JS cost only; native storage I/O scales with bytes)`);
+
+for (const kind of Object.keys(SESSION_LAYOUTS)) {
+  // Warm up the JIT so the first case is not penalized
+  run(kind, blobStrategy);
+  run(kind, splitStrategy);
+
+  const blob = run(kind, blobStrategy);
+  const split = run(kind, splitStrategy);
+  const position = kind === 'driver' ? 'currentPickupIndex' : 'currentSequence';
+  const consistent = blob.finalSession[position] === split.finalSession[position];
+
+  console.log(`\n📋 ${kind} session (${SESSION_LAYOUTS[kind].key}):`);
+  console.log(`   whole blob : ${blob.bytesPerStop.toFixed(0).padStart(7)} bytes/stop, ${blob.usPerStop.toFixed(1).padStart(7)} µs/stop`);
+  console.log(`   cursor only: ${split.bytesPerStop.toFixed(0).padStart(7)} bytes/stop, ${split.usPerStop.toFixed(1).padStart(7)} µs/stop`);
+  console.log(`   ${(blob.bytesPerStop / split.bytesPerStop).toFixed(1)}x fewer bytes, ${(blob.usPerStop / split.usPerStop).toFixed(1)}x less JS time per stop`);
+  console.log(`   ${consistent ? '✅' : '❌'} Both layouts end the route at ${position} ${split.finalSession[position]}`);
+}
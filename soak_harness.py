@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+Soak / endurance test of the assignment lifecycle
+
+Holds a fixed request rate against the backend for hours, the way a full
+shift of drivers does: each simulated driver walks its route
+
+    POST start-trip
+    for each stop:  POST stops/{seq}/start
+                    POST stops/{seq}/complete   (multipart weight + photo, Idempotency-Key)
+                    GET  progress
+    POST end-trip
+
+and moves on to its next assignment. Requests are paced on a schedule
+(--rate across all --drivers), so a slow backend shows up as missed
+slots rather than quietly lowering the load.
+
+Memory stays flat however long it runs: every sample goes into fixed-
+bucket LatencyHistograms for the current time bucket, the whole run and
+the first and last drift windows, and nothing per-sample is kept. Each
+closed bucket is printed and appended to --series as CSV rows (one per
+step plus "all") with latency percentiles, error rate, new client
+connections and, with --server-pid, the server's RSS, open file
+descriptors and threads (Linux /proc):
+
+    python standin_backend.py --port 5000 --latency-ms 20 &
+    python soak_harness.py --duration 8h --rate 40 --drivers 50 --server-pid $! --series soak.csv
+
+At the end the first and last windows are compared to flag latency
+drift, error growth, connection churn and server memory/descriptor growth.
+"""
+
+import argparse
+import csv
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from results_store import add_results_argument, open_run
+from route_simulator import synthetic_jpeg
+from vehicle_client import IDEMPOTENCY_HEADER, VehicleClient, add_target_argument, resolve_target
+from vehicle_load import HEALTHY_CLASSES, LatencyHistogram, timed_request
+
+SOAK_STEPS = ("start-trip", "stop-start", "stop-complete", "progress", "end-trip")
+
+SERIES_COLUMNS = ["elapsed_s", "endpoint", "requests", "rps", "p50_ms", "p95_ms", "p99_ms", "mean_ms",
+                  "error_rate", "errors", "missed_slots", "new_connections", "client_rss_mb",
+                  "client_sockets", "server_rss_mb", "server_fds", "server_threads"]
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(text):
+    """'8h', '90m', '45s' or plain seconds -> seconds"""
+    text = text.strip().lower()
+    if text and text[-1] in DURATION_UNITS:
+        return float(text[:-1]) * DURATION_UNITS[text[-1]]
+    return float(text)
+
+
+def process_stats(pid):
+    """RSS (MB), open descriptors, sockets and threads of a local process, from /proc (None elsewhere)"""
+    stats = {"rss_mb": None, "fds": None, "sockets": None, "threads": None}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    stats["rss_mb"] = int(line.split()[1]) / 1024.0
+                elif line.startswith("Threads:"):
+                    stats["threads"] = int(line.split()[1])
+        links = []
+        for fd in os.listdir(f"/proc/{pid}/fd"):
+            try:
+                links.append(os.readlink(f"/proc/{pid}/fd/{fd}"))
+            except OSError:
+                # Closed between listdir and readlink
+                pass
+        stats["fds"] = len(links)
+        stats["sockets"] = sum(link.startswith("socket:") for link in links)
+    except OSError:
+        pass
+    return stats
+
+
+def connections_opened(clients):
+    """TCP connections the clients' pools have opened so far (keep-alive reuse does not count)"""
+    opened = 0
+    for client in list(clients):
+        pools = client.session.get_adapter(client.base_url).poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+    return opened
+
+
+class Trend:
+    """Least-squares slope of y over x, kept as running sums"""
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x, y):
+        if y is None:
+            return
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def slope(self):
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or denominator == 0:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / denominator
+
+
+class SoakAggregator:
+    """
+    Streaming per-step aggregation for a soak run
+
+    record() has the LoadRecorder signature. Samples land in the current
+    bucket, the run totals and the first drift window (buckets after
+    warm-up); close_bucket() turns the current bucket into series rows and
+    keeps it among the last window_buckets closed buckets, which make up
+    the last drift window.
+    """
+
+    def __init__(self, bucket_s, window_buckets, warmup_buckets, sink=None, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self.bucket_s = bucket_s
+        self.sink = sink
+        self.clock = clock
+        self.started = clock()
+        self.first_window_start = warmup_buckets * bucket_s
+        self.first_window_end = (warmup_buckets + window_buckets) * bucket_s
+        self.current = {}
+        # endpoint -> histogram of each of the last window_buckets closed buckets
+        self.closed = deque(maxlen=window_buckets)
+        self.missed_slots = 0
+        self.total = {}
+        self.error_classes = {}
+        self.first_window = {}
+        self.p95_trend = {}
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def record(self, endpoint, latency_ms, error_class):
+        error = error_class not in HEALTHY_CLASSES
+        elapsed = self.elapsed()
+        with self._lock:
+            for histograms in (self.current, self.total):
+                histogram = histograms.get(endpoint)
+                if histogram is None:
+                    histogram = histograms[endpoint] = LatencyHistogram()
+                histogram.observe(latency_ms, error)
+            if self.first_window_start <= elapsed < self.first_window_end:
+                self.first_window.setdefault(endpoint, LatencyHistogram()).observe(latency_ms, error)
+            counts = self.error_classes.setdefault(endpoint, {})
+            counts[error_class] = counts.get(error_class, 0) + 1
+        if self.sink is not None:
+            self.sink.record(endpoint, latency_ms, error_class)
+
+    def missed(self, slots):
+        with self._lock:
+            self.missed_slots += slots
+
+    def close_bucket(self, elapsed_s, bucket_s):
+        """Series rows for the bucket ending at `elapsed_s` ("all" first), then reset it"""
+        with self._lock:
+            current, self.current = self.current, {}
+            self.closed.append(current)
+            missed, self.missed_slots = self.missed_slots, 0
+        combined = LatencyHistogram()
+        rows = []
+        for endpoint in [step for step in SOAK_STEPS if step in current] + sorted(set(current) - set(SOAK_STEPS)):
+            combined.merge(current[endpoint])
+            rows.append(self._row(elapsed_s, endpoint, current[endpoint], bucket_s))
+        rows.insert(0, self._row(elapsed_s, "all", combined, bucket_s))
+        for row in rows:
+            self.p95_trend.setdefault(row["endpoint"], Trend()).add(elapsed_s / 3600.0, row["p95_ms"])
+        rows[0]["missed_slots"] = missed
+        return rows
+
+    @staticmethod
+    def _row(elapsed_s, endpoint, histogram, bucket_s):
+        return {
+            "elapsed_s": round(elapsed_s, 1),
+            "endpoint": endpoint,
+            "requests": histogram.count,
+            "rps": round(histogram.count / bucket_s, 2) if bucket_s > 0 else 0.0,
+            "p50_ms": _round(histogram.quantile(0.50)),
+            "p95_ms": _round(histogram.quantile(0.95)),
+            "p99_ms": _round(histogram.quantile(0.99)),
+            "mean_ms": _round(histogram.sum_ms / histogram.count if histogram.count else None),
+            "error_rate": round(histogram.error_rate, 4),
+            "errors": histogram.errors,
+        }
+
+    def windows(self):
+        """endpoint -> (first window, last window) histograms, with an "all" entry"""
+        with self._lock:
+            closed = list(self.closed)
+            first_window = dict(self.first_window)
+        pairs = {}
+        for endpoint in set(first_window).union(*closed):
+            last = LatencyHistogram()
+            for bucket in closed:
+                if endpoint in bucket:
+                    last.merge(bucket[endpoint])
+            pairs[endpoint] = (first_window.get(endpoint, LatencyHistogram()), last)
+        first_all, last_all = LatencyHistogram(), LatencyHistogram()
+        for first, last in pairs.values():
+            first_all.merge(first)
+            last_all.merge(last)
+        pairs["all"] = (first_all, last_all)
+        return pairs
+
+
+def _round(value):
+    return round(value, 1) if value is not None else None
+
+
+def route_requests(assignment_id, total_stops, photo, rng):
+    """(step, method, path, request kwargs) for one whole route"""
+    prefix = f"/api/assignments/{assignment_id}"
+    yield "start-trip", "POST", f"{prefix}/start-trip", {}
+    for sequence in range(1, total_stops + 1):
+        yield "stop-start", "POST", f"{prefix}/stops/{sequence}/start", {}
+        yield "stop-complete", "POST", f"{prefix}/stops/{sequence}/complete", {
+            "data": {"weight": f"{rng.uniform(0.5, 25.0):.1f}", "notes": ""},
+            "files": {"photo": (f"photo_{assignment_id}_{sequence}.jpg", photo, "image/jpeg")},
+            "headers": {IDEMPOTENCY_HEADER: uuid.uuid4().hex},
+        }
+        yield "progress", "GET", f"{prefix}/progress", {}
+    yield "end-trip", "POST", f"{prefix}/end-trip", {}
+
+
+def soak_driver(base_url, driver_index, args, aggregator, clients, stop_event):
+    """
+    One paced driver: a request every drivers/rate seconds, routes back to back
+
+    A driver that falls more than one slot behind skips the slots it missed
+    instead of bursting to catch up, and reports them to the aggregator.
+    """
+    rng = random.Random(args.seed + driver_index)
+    photo = synthetic_jpeg(args.photo_kb * 1024, rng)
+    interval = args.drivers / args.rate
+    # Spread the drivers over one interval so they do not fire in lockstep
+    next_at = time.monotonic() + rng.uniform(0, interval)
+    cycle = 0
+    with VehicleClient(base_url, pool_size=1) as client:
+        clients.append(client)
+        while not stop_event.is_set():
+            assignment_id = args.first_assignment + (driver_index + cycle * args.drivers) % args.assignments
+            for step, method, path, kwargs in route_requests(assignment_id, args.stops, photo, rng):
+                now = time.monotonic()
+                if now > next_at + interval:
+                    aggregator.missed(int((now - next_at) / interval))
+                    next_at = now
+                elif stop_event.wait(max(0.0, next_at - now)):
+                    return
+                next_at += interval
+                timed_request(client, aggregator, step, method, path, **kwargs)
+                if stop_event.is_set():
+                    return
+            cycle += 1
+
+
+def _fmt(value, unit=""):
+    return f"{value:.0f}{unit}" if value is not None else "n/a"
+
+
+def print_bucket(rows, process):
+    all_row = rows[0]
+    complete = next((row for row in rows if row["endpoint"] == "stop-complete"), None)
+    line = (f"[{time.strftime('%H:%M:%S', time.gmtime(all_row['elapsed_s']))}] {all_row['rps']:>6.1f} rps  "
+            f"p95 {_fmt(all_row['p95_ms'], ' ms'):>7}  p99 {_fmt(all_row['p99_ms'], ' ms'):>7}  "
+            f"errors {all_row['error_rate']:>5.1%}")
+    if complete:
+        line += f"  complete p95 {_fmt(complete['p95_ms'], ' ms')}"
+    if all_row["missed_slots"]:
+        line += f"  ⚠️ {all_row['missed_slots']} missed slots"
+    line += f"  conns +{process['new_connections']}"
+    if process["server_rss_mb"] is not None:
+        line += f"  server {process['server_rss_mb']:.0f} MB / {process['server_fds']} fds"
+    print(line)
+
+
+def print_soak_report(aggregator, elapsed_s, first_process, last_process, rss_trend, fds_trend,
+                      window_connections, drivers, drift):
+    print("\n" + "=" * 60)
+    print(f"⏳ Soak Results ({elapsed_s / 3600.0:.2f} h)")
+    print("=" * 60)
+    print(f"{'Step':<15} {'reqs':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7} "
+          f"{'first p95':>10} {'last p95':>9} {'drift':>7} {'ms/h':>7}")
+    flags = []
+    windows = aggregator.windows()
+    for endpoint in ("all",) + tuple(step for step in SOAK_STEPS if step in aggregator.total):
+        if endpoint == "all":
+            total = LatencyHistogram()
+            for histogram in aggregator.total.values():
+                total.merge(histogram)
+        else:
+            total = aggregator.total[endpoint]
+        first, last = windows.get(endpoint, (LatencyHistogram(), LatencyHistogram()))
+        first_p95, last_p95 = first.quantile(0.95), last.quantile(0.95)
+        change = (last_p95 - first_p95) / first_p95 if first_p95 and last_p95 is not None else None
+        slope = aggregator.p95_trend.get(endpoint, Trend()).slope()
+        print(f"{endpoint:<15} {total.count:>9} {_fmt(total.quantile(0.50), 'ms'):>8} "
+              f"{_fmt(total.quantile(0.95), 'ms'):>8} {_fmt(total.quantile(0.99), 'ms'):>8} "
+              f"{total.error_rate:>7.2%} {_fmt(first_p95, 'ms'):>10} {_fmt(last_p95, 'ms'):>9} "
+              f"{f'{change:+.0%}' if change is not None else 'n/a':>7} "
+              f"{f'{slope:+.1f}' if slope is not None else 'n/a':>7}")
+        if change is not None and change > drift:
+            flags.append(f"{endpoint} p95 drifted {change:+.0%} ({first_p95:.0f} → {last_p95:.0f} ms)")
+        elif endpoint == "all" and not (first.count and last.count):
+            flags.append(f"no samples in the {'last' if first.count else 'first'} drift window, "
+                         f"so latency drift could not be judged")
+        elif first.count and not last.count:
+            flags.append(f"{endpoint} had samples in the first window but none in the last")
+        if first.count and last.count and last.error_rate > max(2 * first.error_rate, 0.01):
+            flags.append(f"{endpoint} error rate rose from {first.error_rate:.1%} to {last.error_rate:.1%}")
+        if endpoint == "all":
+            errors = {}
+            for counts in aggregator.error_classes.values():
+                for error_class, count in counts.items():
+                    errors[error_class] = errors.get(error_class, 0) + count
+            print(f"   {', '.join(f'{k}={v}' for k, v in sorted(errors.items()))}")
+
+    if window_connections is not None:
+        print(f"\n🔌 Connections opened in the last window: {window_connections} ({drivers} drivers)")
+    if window_connections is not None and window_connections > drivers:
+        flags.append(f"{window_connections} new connections in the last window; keep-alive connections are "
+                     f"being dropped")
+    if first_process["client_sockets"] is not None:
+        print(f"🧵 Client: {first_process['client_rss_mb']:.0f} → {last_process['client_rss_mb']:.0f} MB RSS, "
+              f"{first_process['client_sockets']} → {last_process['client_sockets']} sockets")
+    if first_process["server_rss_mb"] is not None and last_process["server_rss_mb"] is not None:
+        rss_slope, fds_slope = rss_trend.slope(), fds_trend.slope()
+        print(f"🖥️ Server: {first_process['server_rss_mb']:.0f} → {last_process['server_rss_mb']:.0f} MB RSS "
+              f"({f'{rss_slope:+.1f}' if rss_slope is not None else 'n/a'} MB/h), "
+              f"{first_process['server_fds']} → {last_process['server_fds']} fds "
+              f"({f'{fds_slope:+.1f}' if fds_slope is not None else 'n/a'}/h), "
+              f"{first_process['server_threads']} → {last_process['server_threads']} threads")
+        growth = last_process["server_rss_mb"] - first_process["server_rss_mb"]
+        if growth > max(50.0, 0.5 * first_process["server_rss_mb"]):
+            flags.append(f"server RSS grew {growth:.0f} MB")
+        if last_process["server_fds"] - first_process["server_fds"] > drivers:
+            flags.append(f"server holds {last_process['server_fds'] - first_process['server_fds']} more "
+                         f"descriptors than at the start")
+
+    if flags:
+        print("\n⚠️ Degradation over the run:")
+        for flag in flags:
+            print(f"   • {flag}")
+    else:
+        print("\n✅ No latency drift, error growth, connection churn or server growth detected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sustain the assignment lifecycle load for hours")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--duration", default="1h", help="how long to run: 8h, 90m, 300s (Ctrl-C stops early)")
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second across all drivers")
+    parser.add_argument("--drivers", type=int, default=20, help="concurrent simulated drivers")
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--assignments", type=int, default=500, help="assignment IDs to cycle through")
+    parser.add_argument("--stops", type=int, default=79, help="stops per route")
+    parser.add_argument("--photo-kb", type=int, default=50, help="synthetic photo size per completion")
+    parser.add_argument("--bucket-s", type=float, default=60.0, help="length of one series bucket")
+    parser.add_argument("--window-buckets", type=int, default=5, help="buckets in the first/last drift windows")
+    parser.add_argument("--warmup-buckets", type=int, default=1, help="buckets left out of the first window")
+    parser.add_argument("--drift", type=float, default=0.25, help="flag a p95 rise above this fraction")
+    parser.add_argument("--series", help="append the bucketed series to this CSV file")
+    parser.add_argument("--server-pid", type=int, help="local server process to sample RSS/descriptors from")
+    parser.add_argument("--seed", type=int, default=0)
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    duration_s = parse_duration(args.duration)
+    print("⏳ Vehicle App Soak Test")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{args.rate:g} req/s from {args.drivers} drivers for {duration_s / 3600.0:.2f} h, "
+          f"{args.bucket_s:g}s buckets")
+
+    results = open_run(args, "soak_harness", base_url)
+    aggregator = SoakAggregator(args.bucket_s, args.window_buckets, args.warmup_buckets, sink=results)
+    clients = []
+    stop_event = threading.Event()
+    series_file = open(args.series, "a", newline="") if args.series else None
+    writer = None
+    if series_file:
+        writer = csv.DictWriter(series_file, fieldnames=SERIES_COLUMNS)
+        if series_file.tell() == 0:
+            writer.writeheader()
+
+    def sample_process(previous_connections):
+        client = process_stats("self")
+        server = process_stats(args.server_pid) if args.server_pid else {}
+        opened = connections_opened(clients)
+        return {
+            "new_connections": opened - previous_connections,
+            "client_rss_mb": client["rss_mb"],
+            "client_sockets": client["sockets"],
+            "server_rss_mb": server.get("rss_mb"),
+            "server_fds": server.get("fds"),
+            "server_threads": server.get("threads"),
+        }, opened
+
+    first_process, last_process = None, None
+    opened = 0
+    rss_trend, fds_trend = Trend(), Trend()
+    recent_connections = []
+    buckets = 0
+    pool = ThreadPoolExecutor(max_workers=args.drivers)
+    drivers = [pool.submit(soak_driver, base_url, i, args, aggregator, clients, stop_event)
+               for i in range(args.drivers)]
+    bucket_end = args.bucket_s
+    try:
+        while True:
+            stop_event.wait(max(0.0, min(bucket_end, duration_s) - aggregator.elapsed()))
+            elapsed = aggregator.elapsed()
+            bucket_s = elapsed - (bucket_end - args.bucket_s)
+            rows = aggregator.close_bucket(elapsed, bucket_s)
+            last_process, opened = sample_process(opened)
+            # Growth is judged from the end of the first bucket, once every driver is connected
+            first_process = first_process or last_process
+            rss_trend.add(elapsed / 3600.0, last_process["server_rss_mb"])
+            fds_trend.add(elapsed / 3600.0, last_process["server_fds"])
+            buckets += 1
+            recent_connections = (recent_connections + [last_process["new_connections"]])[-args.window_buckets:]
+            print_bucket(rows, last_process)
+            if writer:
+                writer.writerows({**row, **last_process} for row in rows)
+                series_file.flush()
+            bucket_end += args.bucket_s
+            if elapsed >= duration_s:
+                break
+            for future in drivers:
+                if future.done() and future.exception():
+                    raise future.exception()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping")
+    finally:
+        stop_event.set()
+        pool.shutdown(wait=True)
+        if series_file:
+            series_file.close()
+        if results:
+            results.finish()
+
+    if first_process is None:
+        return
+    # The first bucket opens every driver's connection; only judge churn once it is out of the window
+    window_connections = sum(recent_connections) if buckets > args.window_buckets else None
+    print_soak_report(aggregator, aggregator.elapsed(), first_process, last_process, rss_trend, fds_trend,
+                      window_connections, args.drivers, args.drift)
+    if args.series:
+        print(f"\n📝 Series written to {os.path.abspath(args.series)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@
 
 import AsyncStorage from '@react-native-async-storage/async-storage';
 import ApiService from '../services/api';
+import CompletionQueue from '../services/completionQueue';
+import RouteCache from '../services/routeCache';
+import SessionStore from '../services/sessionStore';
+import { logger } from '../utils/logger';
+import { tracer } from '../utils/tracing';
 
 class AuthController {
   /**
@@ -15,9 +20,9 @@ class AuthController {
    */
   static async login(vehicleNumber, drivingLicense) {
     try {
-      console.log('🚀 ===== AUTHCONTROLLER LOGIN START =====');
-      console.log('🚀 Vehicle:', vehicleNumber, 'DL:', drivingLicense);
-      
+      logger.debug(() => ['🚀 ===== AUTHCONTROLLER LOGIN START =====']);
+      logger.debug(() => ['🚀 Vehicle:', vehicleNumber, 'DL:', drivingLicense]);
+
       // Validate input format
       if (vehicleNumber.length < 8 || vehicleNumber.length > 15) {
         throw new Error('Vehicle number must be 8-15 characters');
@@ -27,19 +32,18 @@ class AuthController {
         throw new Error('Driving license number must be 10-20 characters');
       }
 
+      // Every request until logout is recorded in this route's trace
+      tracer.startRoute({ 'login.version': 'v1', 'vehicle.number': vehicleNumber });
+
       // Authenticate with backend
-      console.log('🔍 AuthController: About to call ApiService.authenticateDriver...');
-      console.log('🔍 AuthController: Vehicle:', vehicleNumber, 'DL:', drivingLicense);
+      logger.debug(() => ['🔍 AuthController: About to call ApiService.authenticateDriver...']);
       
       const driverData = await ApiService.authenticateDriver(vehicleNumber, drivingLicense);
-      console.log('🔍 AuthController: ApiService.authenticateDriver completed successfully');
+      logger.debug(() => ['🔍 AuthController: ApiService.authenticateDriver completed successfully']);
       
-      console.log('🔍 AuthController: Backend response:', JSON.stringify(driverData, null, 2));
-      console.log('🔍 AuthController: Pickups array:', driverData.pickups);
-      console.log('🔍 AuthController: Pickups type:', typeof driverData.pickups);
-      console.log('🔍 AuthController: Pickups is array:', Array.isArray(driverData.pickups));
-      console.log('🔍 AuthController: Pickups length:', driverData.pickups ? driverData.pickups.length : 'undefined');
-      console.log('🔍 AuthController: Total pickups:', driverData.total_pickups);
+      logger.debug(() => ['🔍 AuthController: Backend response:', JSON.stringify(driverData, null, 2)]);
+      logger.debug(() => ['🔍 AuthController: Pickups length:', driverData.pickups ? driverData.pickups.length : 'undefined']);
+      logger.debug(() => ['🔍 AuthController: Total pickups:', driverData.total_pickups]);
 
       // Temporarily remove validation to see what data we actually get
       // if (!driverData.pickups || driverData.pickups.length === 0) {
@@ -49,8 +53,9 @@ class AuthController {
       // Store driver session data
       await this.storeDriverSession(driverData);
 
-      // Start trip timing (if assignment_id is available)
-      if (driverData.assignment_id) {
+      // Start trip timing (if assignment_id is available and the backend
+      // did not already start it during authentication)
+      if (driverData.assignment_id && !driverData.trip_started_at) {
         console.log('🚀 AuthController: Starting trip timing...');
         await ApiService.startTrip(driverData.assignment_id);
         console.log('✅ AuthController: Trip timing started successfully');
@@ -87,7 +92,7 @@ class AuthController {
         loginTime: new Date().toISOString(),
       };
 
-      await AsyncStorage.setItem('driverSession', JSON.stringify(sessionData));
+      await SessionStore.save('driver', sessionData);
       await AsyncStorage.setItem('isLoggedIn', 'true');
 
     } catch (error) {
@@ -102,8 +107,7 @@ class AuthController {
    */
   static async getDriverSession() {
     try {
-      const sessionData = await AsyncStorage.getItem('driverSession');
-      return sessionData ? JSON.parse(sessionData) : null;
+      return await SessionStore.get('driver');
     } catch (error) {
       console.error('Error getting driver session:', error);
       return null;
@@ -111,16 +115,12 @@ class AuthController {
   }
 
   /**
-   * Update current pickup index
+   * Update current pickup index (rewrites only the session cursor, not the pickups)
    * @param {number} pickupIndex - New pickup index
    */
   static async updateCurrentPickupIndex(pickupIndex) {
     try {
-      const sessionData = await this.getDriverSession();
-      if (sessionData) {
-        sessionData.currentPickupIndex = pickupIndex;
-        await AsyncStorage.setItem('driverSession', JSON.stringify(sessionData));
-      }
+      await SessionStore.updateCursor('driver', { currentPickupIndex: pickupIndex });
     } catch (error) {
       console.error('Error updating pickup index:', error);
     }
@@ -145,7 +145,8 @@ class AuthController {
    */
   static async logout() {
     try {
-      await AsyncStorage.removeItem('driverSession');
+      tracer.endRoute();
+      await SessionStore.clear('driver');
       await AsyncStorage.removeItem('isLoggedIn');
     } catch (error) {
       console.error('Error during logout:', error);
@@ -226,19 +227,31 @@ class AuthController {
         throw new Error('Driving license number must be 10-20 characters');
       }
 
+      // Every request until logout is recorded in this route's trace
+      const routeSpan = tracer.startRoute({ 'login.version': 'v2', 'vehicle.number': vehicleNumber });
+
       // Authenticate with backend V2
-      console.log('🔐 AuthController: About to call ApiService.authenticateDriverV2...');
+      logger.debug(() => ['🔐 AuthController: About to call ApiService.authenticateDriverV2...']);
       const assignmentData = await ApiService.authenticateDriverV2(vehicleNumber, drivingLicense);
-      console.log('🔐 AuthController: ApiService.authenticateDriverV2 completed:', assignmentData);
+      routeSpan.attributes['assignment.id'] = assignmentData.assignment_id;
+      logger.debug(() => ['🔐 AuthController: ApiService.authenticateDriverV2 completed:', assignmentData]);
 
-      // Start trip timing
-      console.log('🚀 AuthController: Starting trip timing...');
-      await ApiService.startTrip(assignmentData.assignment_id);
-      console.log('✅ AuthController: Trip timing started successfully');
+      // Start trip timing, unless the backend already did it during authentication
+      if (assignmentData.trip_started_at) {
+        console.log('✅ AuthController: Trip timing started with authentication');
+      } else {
+        console.log('🚀 AuthController: Starting trip timing...');
+        await ApiService.startTrip(assignmentData.assignment_id);
+        console.log('✅ AuthController: Trip timing started successfully');
+      }
 
       // Store assignment session data
       await this.storeAssignmentSession(assignmentData);
 
+      // Load every stop of the route in the background, so moving to the
+      // next stop does not need a request
+      RouteCache.refresh(assignmentData.assignment_id);
+
       return {
         success: true,
         assignment: assignmentData,
@@ -272,7 +285,7 @@ class AuthController {
         isV2: true // Flag to identify V2 session
       };
 
-      await AsyncStorage.setItem('assignmentSession', JSON.stringify(sessionData));
+      await SessionStore.save('assignment', sessionData);
       await AsyncStorage.setItem('isLoggedIn', 'true');
 
     } catch (error) {
@@ -287,8 +300,7 @@ class AuthController {
    */
   static async getAssignmentSession() {
     try {
-      const sessionData = await AsyncStorage.getItem('assignmentSession');
-      return sessionData ? JSON.parse(sessionData) : null;
+      return await SessionStore.get('assignment');
     } catch (error) {
       console.error('Error getting assignment session:', error);
       return null;
@@ -306,8 +318,8 @@ class AuthController {
         return null;
       }
 
-      // Get fresh stop data from backend
-      const stopData = await ApiService.getAssignmentStop(
+      // Get stop data from the cached route, or the backend if it is not cached
+      const stopData = await RouteCache.getAssignmentStop(
         sessionData.assignmentId, 
         sessionData.currentSequence
       );
@@ -335,12 +347,14 @@ class AuthController {
         return null;
       }
 
-      // Mark current stop as completed
-      await ApiService.completeAssignmentStop(
+      // Queue the completion and sync it in the background, like PickupController,
+      // so it survives a dead zone and carries an idempotency key
+      await CompletionQueue.enqueue(
         sessionData.assignmentId,
         sessionData.currentSequence,
         completionData
       );
+      RouteCache.stopCompleted(sessionData.assignmentId);
 
       const nextSequence = sessionData.currentSequence + 1;
       
@@ -349,14 +363,14 @@ class AuthController {
       }
 
       // Update session with next sequence
-      sessionData.currentSequence = nextSequence;
-      await AsyncStorage.setItem('assignmentSession', JSON.stringify(sessionData));
+      await SessionStore.updateCursor('assignment', { currentSequence: nextSequence, currentStop: null });
 
       // Get next stop data
-      const nextStopData = await ApiService.getAssignmentStop(
+      const nextStopData = await RouteCache.getAssignmentStop(
         sessionData.assignmentId,
         nextSequence
       );
+      await SessionStore.updateCursor('assignment', { currentStop: nextStopData.stop });
 
       return {
         stop: nextStopData.stop,
@@ -393,8 +407,10 @@ class AuthController {
    */
   static async logoutV2() {
     try {
-      await AsyncStorage.removeItem('assignmentSession');
+      tracer.endRoute();
+      await SessionStore.clear('assignment');
       await AsyncStorage.removeItem('isLoggedIn');
+      await RouteCache.clear();
     } catch (error) {
       console.error('Error during V2 logout:', error);
     }
@@ -4,8 +4,10 @@
  */
 
 import ApiService from '../services/api';
+import CompletionQueue from '../services/completionQueue';
+import RouteCache from '../services/routeCache';
+import SessionStore from '../services/sessionStore';
 import AuthController from './AuthController';
-import AsyncStorage from '@react-native-async-storage/async-storage';
 
 class PickupController {
   /**
@@ -195,16 +197,18 @@ class PickupController {
       if (assignmentSession && assignmentSession.isV2) {
         console.log('🔍 Using V2 system for completing pickup');
         
-        // Use the new photo upload API method (this handles everything)
-        const completionResult = await ApiService.completeAssignmentStopWithPhoto(
+        // Queue the completion (photo upload included) and sync it in the background,
+        // so a dead zone at the pickup does not block the driver
+        await CompletionQueue.enqueue(
           assignmentSession.assignmentId,
           assignmentSession.currentSequence,
           completionData
         );
         
-        console.log('✅ Pickup completed with photo upload:', completionResult);
+        console.log('✅ Pickup completion queued for sync');
+        RouteCache.stopCompleted(assignmentSession.assignmentId);
         
-        // Manually move to next stop in session (since we already completed via API)
+        // Move to next stop in session without waiting for the upload
         const nextSequence = assignmentSession.currentSequence + 1;
         
         if (nextSequence > assignmentSession.totalStops) {
@@ -216,15 +220,28 @@ class PickupController {
           };
         }
         
-        // Update session with next sequence
-        assignmentSession.currentSequence = nextSequence;
-        await AsyncStorage.setItem('assignmentSession', JSON.stringify(assignmentSession));
+        // Update session with next sequence; the stop details are fetched below
+        await SessionStore.updateCursor('assignment', { currentSequence: nextSequence, currentStop: null });
         
-        // Get next stop data
-        const nextStopData = await ApiService.getAssignmentStop(
-          assignmentSession.assignmentId,
-          nextSequence
-        );
+        // Get next stop data (from the route cached at login when available)
+        let nextStopData;
+        try {
+          nextStopData = await RouteCache.getAssignmentStop(
+            assignmentSession.assignmentId,
+            nextSequence
+          );
+        } catch (fetchError) {
+          // Offline: the completion is safe in the queue, the next stop loads on retry
+          console.warn('⚠️ Next stop not available yet:', fetchError.message);
+          return {
+            success: true,
+            hasNext: true,
+            nextPickup: {
+              pickupIndex: nextSequence,
+              isLast: nextSequence >= assignmentSession.totalStops
+            }
+          };
+        }
         
         if (!nextStopData) {
           // No more stops - all completed, end trip timing
@@ -244,6 +261,8 @@ class PickupController {
         }
 
         const stop = nextStopData.stop;
+        await SessionStore.updateCursor('assignment', { currentStop: stop });
+        
         return {
           success: true,
           hasNext: true,
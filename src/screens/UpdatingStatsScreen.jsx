@@ -14,6 +14,7 @@ import {
 } from 'react-native';
 import { launchCamera } from 'react-native-image-picker';
 import PickupController from '../controllers/PickupController';
+import { getCaptureOptions, recordCapture } from '../utils/imageCompression';
 
 const { width, height } = Dimensions.get('window');
 
@@ -57,18 +58,13 @@ const UpdatingStatsScreen = ({ navigation, route }) => {
         return;
       }
 
-      // Launch camera with specific options
-      const result = await launchCamera({
-        mediaType: 'photo',
-        includeBase64: false,
-        maxHeight: 2000,
-        maxWidth: 2000,
-        quality: 0.8,
-        saveToPhotos: false,
-      });
+      // Launch camera with settings sized to the upload byte budget
+      const captureOptions = getCaptureOptions();
+      const result = await launchCamera(captureOptions);
 
       if (result.assets && result.assets.length > 0) {
         const photo = result.assets[0];
+        recordCapture(photo, captureOptions);
         console.log('Photo captured:', photo);
         setUploadedImage(photo);
         Alert.alert('Success', 'Photo captured successfully!');
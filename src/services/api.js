@@ -3,6 +3,12 @@
  * Handles all backend communication
  */
 
+import { adaptiveFetch } from '../utils/adaptiveTimeout';
+import { API_CONFIG } from '../utils/config';
+import { logger } from '../utils/logger';
+import { createRequestCache } from '../utils/requestCache';
+import { tracedFetch } from '../utils/tracing';
+
 // Dynamic BASE_URL that works for both development and production
 const getBaseUrl = () => {
   // Local development configuration (backend on other device)
@@ -14,43 +20,35 @@ const getBaseUrl = () => {
 
 const BASE_URL = getBaseUrl();
 
+// Stop and pickup GETs; writes below invalidate the keys they change
+const responseCache = createRequestCache({
+  ttl: API_CONFIG.RESPONSE_CACHE.TTL,
+  maxEntries: API_CONFIG.RESPONSE_CACHE.MAX_ENTRIES,
+});
+const stopKey = (assignmentId, sequence) => `stop:${assignmentId}:${sequence}`;
+const pickupKey = (driverId, pickupIndex) => `pickup:${driverId}:${pickupIndex}`;
+
 class ApiService {
   /**
    * Authenticate driver with vehicle number and DL number
+   * Also asks the backend to start trip timing; trip_started_at in the
+   * response says whether it did
    * @param {string} vehicleNumber - 10 digit vehicle number
    * @param {string} drivingLicense - 15 digit driving license number
    * @returns {Promise<Object>} Driver data with pickup information
    */
   static async authenticateDriver(vehicleNumber, drivingLicense) {
+    const endTimer = logger.startTimer('V1 authentication');
     try {
-      console.log('🚀 ===== AUTHENTICATION START =====');
-      console.log('🔐 Attempting authentication...');
-      console.log('📡 BASE_URL:', BASE_URL);
-      console.log('📡 Full URL:', `${BASE_URL}/driver/authenticate`);
-      console.log('📡 Expected URL should be: http://192.168.4.243:5000/api/driver/authenticate');
-      console.log('📡 URL Match:', BASE_URL === 'http://192.168.4.243:5000/api');
-      console.log('📤 Request data:', { vehicle_number: vehicleNumber, dl_number: drivingLicense });
-      
-      // Test basic connectivity first
-      console.log('🔍 Testing basic connectivity...');
-      try {
-        const testResponse = await fetch(`${BASE_URL}/driver/authenticate`, {
-          method: 'GET',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-        });
-        console.log('🔍 Test response status:', testResponse.status);
-      } catch (testError) {
-        console.error('🔍 Test connectivity failed:', testError.message);
-        throw new Error(`Network connectivity test failed: ${testError.message}`);
-      }
+      logger.debug(() => ['🚀 ===== AUTHENTICATION START =====']);
+      logger.debug(() => ['📡 Full URL:', `${BASE_URL}/driver/authenticate`]);
+      logger.debug(() => ['📤 Request data:', { vehicle_number: vehicleNumber, dl_number: drivingLicense }]);
 
       // AbortController for timeout - increased to 30 seconds to match V2
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 30000);
 
-      const response = await fetch(`${BASE_URL}/driver/authenticate`, {
+      const response = await tracedFetch(`${BASE_URL}/driver/authenticate`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -58,30 +56,30 @@ class ApiService {
         body: JSON.stringify({
           vehicle_number: vehicleNumber,
           dl_number: drivingLicense,
+          start_trip: true, // Start trip timing in the same round trip
         }),
         signal: controller.signal,
       });
 
       clearTimeout(timeoutId);
 
-      console.log('📥 Response status:', response.status);
-      console.log('📥 Response headers:', Object.fromEntries(response.headers.entries()));
+      logger.debug(() => ['📥 Response status:', response.status]);
+      logger.debug(() => ['📥 Response headers:', Object.fromEntries(response.headers.entries())]);
 
       // Try JSON, fall back to text
       let data;
       const rawText = await response.text();
-      console.log('📥 Raw response text:', rawText);
-      console.log('📥 Raw response length:', rawText.length);
+      logger.debug(() => ['📥 Raw response text:', rawText]);
+      logger.debug(() => ['📥 Raw response length:', rawText.length]);
       
       try {
         data = rawText ? JSON.parse(rawText) : {};
-        console.log('📥 Successfully parsed JSON');
       } catch (e) {
-        console.warn('⚠️ JSON parse error:', e.message);
-        console.warn('⚠️ Non-JSON response:', rawText);
+        logger.warn(() => ['⚠️ JSON parse error:', e.message]);
+        logger.warn(() => ['⚠️ Non-JSON response:', rawText]);
         data = { error: rawText || 'Unexpected response from server' };
       }
-      console.log('📥 Parsed data:', JSON.stringify(data, null, 2));
+      logger.debug(() => ['📥 Parsed data:', JSON.stringify(data, null, 2)]);
 
       if (!response.ok) {
         throw new Error(data.error || `Authentication failed (status ${response.status})`);
@@ -90,11 +88,13 @@ class ApiService {
       return data;
     } catch (error) {
       if (error.name === 'AbortError') {
-        console.error('❌ Authentication error: request timed out');
+        logger.error(() => ['❌ Authentication error: request timed out']);
         throw new Error('Request timed out. Please try again.');
       }
-      console.error('❌ Authentication error:', error);
+      logger.error(() => ['❌ Authentication error:', error]);
       throw error;
+    } finally {
+      endTimer();
     }
   }
 
@@ -104,9 +104,13 @@ class ApiService {
    * @param {number} pickupIndex - Pickup sequence number (0-based)
    * @returns {Promise<Object>} Pickup location details
    */
-  static async getPickupDetails(driverId, pickupIndex) {
+  static getPickupDetails(driverId, pickupIndex) {
+    return responseCache.get(pickupKey(driverId, pickupIndex), () => this.fetchPickupDetails(driverId, pickupIndex));
+  }
+
+  static async fetchPickupDetails(driverId, pickupIndex) {
     try {
-      const response = await fetch(`${BASE_URL}/driver/${driverId}/pickup/${pickupIndex}`, {
+      const response = await tracedFetch(`${BASE_URL}/driver/${driverId}/pickup/${pickupIndex}`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -135,7 +139,7 @@ class ApiService {
    */
   static async updatePickupStatus(driverId, pickupIndex, updateData) {
     try {
-      const response = await fetch(`${BASE_URL}/driver/${driverId}/pickup/${pickupIndex}/update`, {
+      const response = await tracedFetch(`${BASE_URL}/driver/${driverId}/pickup/${pickupIndex}/update`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -153,6 +157,8 @@ class ApiService {
     } catch (error) {
       console.error('Update pickup status error:', error);
       throw error;
+    } finally {
+      responseCache.invalidate(pickupKey(driverId, pickupIndex));
     }
   }
 
@@ -163,7 +169,7 @@ class ApiService {
    */
   static async getDriverPickups(driverId) {
     try {
-      const response = await fetch(`${BASE_URL}/driver/${driverId}/pickups`, {
+      const response = await tracedFetch(`${BASE_URL}/driver/${driverId}/pickups`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -187,20 +193,23 @@ class ApiService {
 
   /**
    * Authenticate driver using new normalized system
+   * Also asks the backend to start trip timing; trip_started_at in the
+   * response says whether it did
    * @param {string} vehicleNumber - Vehicle number
    * @param {string} drivingLicense - DL number
    * @returns {Promise<Object>} Assignment data with first stop
    */
   static async authenticateDriverV2(vehicleNumber, drivingLicense) {
+    const endTimer = logger.startTimer('V2 authentication');
     try {
-      console.log('🔐 V2 Authentication attempting...');
-      console.log('📡 URL:', `${BASE_URL}/driver/authenticate/v2`);
-      console.log('📤 Request data:', { vehicle_number: vehicleNumber, driving_license: drivingLicense });
+      logger.debug(() => ['🔐 V2 Authentication attempting...']);
+      logger.debug(() => ['📡 URL:', `${BASE_URL}/driver/authenticate/v2`]);
+      logger.debug(() => ['📤 Request data:', { vehicle_number: vehicleNumber, driving_license: drivingLicense }]);
 
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 30000); // Increased to 30 seconds
 
-      const response = await fetch(`${BASE_URL}/driver/authenticate/v2`, {
+      const response = await tracedFetch(`${BASE_URL}/driver/authenticate/v2`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -208,29 +217,30 @@ class ApiService {
         body: JSON.stringify({
           vehicle_number: vehicleNumber,
           driving_license: drivingLicense,
+          start_trip: true, // Start trip timing in the same round trip
         }),
         signal: controller.signal,
       });
 
       clearTimeout(timeoutId);
 
-      console.log('📥 V2 Response status:', response.status);
-      console.log('📥 V2 Response headers:', response.headers);
+      logger.debug(() => ['📥 V2 Response status:', response.status]);
+      logger.debug(() => ['📥 V2 Response headers:', response.headers]);
 
       let data;
       const rawText = await response.text();
-      console.log('📥 V2 Raw response text:', rawText);
+      logger.debug(() => ['📥 V2 Raw response text:', rawText]);
       
       try {
         data = rawText ? JSON.parse(rawText) : {};
-        console.log('📥 V2 Parsed data:', data);
+        logger.debug(() => ['📥 V2 Parsed data:', data]);
       } catch (e) {
-        console.warn('⚠️ Non-JSON response:', rawText);
+        logger.warn(() => ['⚠️ Non-JSON response:', rawText]);
         data = { error: rawText || 'Unexpected response from server' };
       }
 
       if (!response.ok) {
-        console.error('❌ V2 Authentication failed - response not ok');
+        logger.error(() => ['❌ V2 Authentication failed - response not ok']);
         throw new Error(data.error || `Authentication failed (status ${response.status})`);
       }
 
@@ -239,19 +249,21 @@ class ApiService {
       const missingFields = requiredFields.filter(field => !data[field]);
       
       if (missingFields.length > 0) {
-        console.error('❌ V2 Authentication failed - missing fields:', missingFields);
+        logger.error(() => ['❌ V2 Authentication failed - missing fields:', missingFields]);
         throw new Error(`Invalid response: missing fields ${missingFields.join(', ')}`);
       }
 
-      console.log('✅ V2 Authentication successful!');
+      logger.debug(() => ['✅ V2 Authentication successful!']);
       return data;
     } catch (error) {
       if (error.name === 'AbortError') {
-        console.error('❌ V2 Authentication timeout');
+        logger.error(() => ['❌ V2 Authentication timeout']);
         throw new Error('Request timed out. Please try again.');
       }
-      console.error('❌ V2 Authentication error:', error);
+      logger.error(() => ['❌ V2 Authentication error:', error]);
       throw error;
+    } finally {
+      endTimer();
     }
   }
 
@@ -261,14 +273,18 @@ class ApiService {
    * @param {number} sequence - Stop sequence number (1-based)
    * @returns {Promise<Object>} Stop details
    */
-  static async getAssignmentStop(assignmentId, sequence) {
+  static getAssignmentStop(assignmentId, sequence) {
+    return responseCache.get(stopKey(assignmentId, sequence), () => this.fetchAssignmentStop(assignmentId, sequence));
+  }
+
+  static async fetchAssignmentStop(assignmentId, sequence) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}`, {
+      const response = await adaptiveFetch('GET stop', `${BASE_URL}/assignments/${assignmentId}/stops/${sequence}`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
         },
-      });
+      }, { timeout: 15000, idempotent: true });
 
       const data = await response.json();
 
@@ -278,11 +294,65 @@ class ApiService {
 
       return data;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Get assignment stop timeout');
+        throw new Error('Loading the stop timed out. Please try again.');
+      }
       console.error('Get assignment stop error:', error);
       throw error;
     }
   }
 
+  /**
+   * Get every stop of an assignment in one request
+   * @param {number} assignmentId - Assignment ID
+   * @param {Object} options - etag of the cached copy and the version to fetch changes since
+   * @returns {Promise<Object>} Stops response with etag, or { notModified: true }
+   */
+  static async getAssignmentStops(assignmentId, { etag = null, since = null } = {}) {
+    try {
+      const headers = {
+        'Content-Type': 'application/json',
+      };
+      if (etag) {
+        headers['If-None-Match'] = etag;
+      }
+      const query = since != null ? `?since=${since}` : '';
+
+      const response = await adaptiveFetch('GET stops', `${BASE_URL}/assignments/${assignmentId}/stops${query}`, {
+        method: 'GET',
+        headers,
+      }, { timeout: 30000, idempotent: true });
+
+      if (response.status === 304) {
+        return { notModified: true, etag };
+      }
+
+      let data;
+      const rawText = await response.text();
+      try {
+        data = rawText ? JSON.parse(rawText) : {};
+      } catch (e) {
+        data = { error: rawText || 'Unexpected response from server' };
+      }
+
+      if (!response.ok) {
+        const error = new Error(data.error || 'Failed to get assignment stops');
+        error.status = response.status;
+        throw error;
+      }
+
+      return { ...data, etag: response.headers.get('ETag') };
+    } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Get assignment stops timeout');
+        throw new Error('Loading the route timed out. Please try again.');
+      }
+      console.error('Get assignment stops error:', error);
+      throw error;
+    }
+  }
+
   /**
    * Mark a stop as completed
    * @param {number} assignmentId - Assignment ID
@@ -292,7 +362,7 @@ class ApiService {
    */
   static async completeAssignmentStop(assignmentId, sequence, completionData = {}) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`, {
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -310,6 +380,9 @@ class ApiService {
     } catch (error) {
       console.error('Complete assignment stop error:', error);
       throw error;
+    } finally {
+      // Also after a failure: a timed-out write may still have gone through
+      responseCache.invalidate(stopKey(assignmentId, sequence));
     }
   }
 
@@ -320,12 +393,12 @@ class ApiService {
    */
   static async getAssignmentProgress(assignmentId) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/progress`, {
+      const response = await adaptiveFetch('GET progress', `${BASE_URL}/assignments/${assignmentId}/progress`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
         },
-      });
+      }, { timeout: 15000, idempotent: true });
 
       const data = await response.json();
 
@@ -335,6 +408,10 @@ class ApiService {
 
       return data;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Get assignment progress timeout');
+        throw new Error('Loading progress timed out. Please try again.');
+      }
       console.error('Get assignment progress error:', error);
       throw error;
     }
@@ -349,13 +426,21 @@ class ApiService {
    */
   static async startTrip(assignmentId) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/start-trip`, {
+      // Fixed timeout: without an idempotency key this POST cannot be retried, so a learned
+      // (shorter) timeout would turn a slow success into a failure
+      const controller = new AbortController();
+      const timeoutId = setTimeout(() => controller.abort(), 20000);
+
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/start-trip`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
+        signal: controller.signal,
       });
 
+      clearTimeout(timeoutId);
+
       const data = await response.json();
 
       if (!response.ok) {
@@ -364,6 +449,10 @@ class ApiService {
 
       return data;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Start trip timeout');
+        throw new Error('Starting the trip timed out. Please try again.');
+      }
       console.error('Start trip error:', error);
       throw error;
     }
@@ -376,13 +465,20 @@ class ApiService {
    */
   static async endTrip(assignmentId) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/end-trip`, {
+      // Fixed timeout, as for start-trip
+      const controller = new AbortController();
+      const timeoutId = setTimeout(() => controller.abort(), 20000);
+
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/end-trip`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
+        signal: controller.signal,
       });
 
+      clearTimeout(timeoutId);
+
       const data = await response.json();
 
       if (!response.ok) {
@@ -391,6 +487,10 @@ class ApiService {
 
       return data;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ End trip timeout');
+        throw new Error('Ending the trip timed out. Please try again.');
+      }
       console.error('End trip error:', error);
       throw error;
     }
@@ -404,13 +504,20 @@ class ApiService {
    */
   static async startPickup(assignmentId, sequence) {
     try {
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/start`, {
+      // Fixed timeout, as for start-trip
+      const controller = new AbortController();
+      const timeoutId = setTimeout(() => controller.abort(), 15000);
+
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/start`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
+        signal: controller.signal,
       });
 
+      clearTimeout(timeoutId);
+
       const data = await response.json();
 
       if (!response.ok) {
@@ -419,8 +526,14 @@ class ApiService {
 
       return data;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Start pickup timeout');
+        throw new Error('Starting the pickup timed out. Please try again.');
+      }
       console.error('Start pickup error:', error);
       throw error;
+    } finally {
+      responseCache.invalidate(stopKey(assignmentId, sequence));
     }
   }
 
@@ -436,10 +549,11 @@ class ApiService {
    * @returns {Promise<Object>} Completion response
    */
   static async completeAssignmentStopWithPhoto(assignmentId, sequence, completionData = {}) {
+    const endTimer = logger.startTimer('Photo upload');
     try {
-      console.log('📸 Completing assignment stop with photo upload...');
-      console.log('📡 URL:', `${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`);
-      console.log('📤 Completion data:', completionData);
+      logger.debug(() => ['📸 Completing assignment stop with photo upload...']);
+      logger.debug(() => ['📡 URL:', `${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`]);
+      logger.debug(() => ['📤 Completion data:', completionData]);
 
       // Create FormData for multipart upload
       const formData = new FormData();
@@ -451,9 +565,19 @@ class ApiService {
       if (completionData.notes) {
         formData.append('notes', completionData.notes);
       }
+      // When the driver completed the stop, not when the queue got it through
+      if (completionData.completedAt) {
+        formData.append('completed_at', completionData.completedAt);
+      }
+      // Lets the backend answer a retry with the first attempt's result instead of completing twice
+      const headers = completionData.idempotencyKey
+        ? { 'Idempotency-Key': completionData.idempotencyKey }
+        : {};
       
-      // Add photo if provided
-      if (completionData.image && completionData.image.uri) {
+      // Add photo if provided; a photo already sent as a resumable upload is referenced by ID
+      if (completionData.photoUploadId) {
+        formData.append('photo_upload_id', completionData.photoUploadId);
+      } else if (completionData.image && completionData.image.uri) {
         const photoFile = {
           uri: completionData.image.uri,
           type: completionData.image.type || 'image/jpeg',
@@ -461,67 +585,225 @@ class ApiService {
         };
         
         formData.append('photo', photoFile);
-        console.log('📸 Photo added to FormData:', {
+        logger.debug(() => ['📸 Photo added to FormData:', {
           uri: photoFile.uri,
           type: photoFile.type,
           name: photoFile.name
-        });
+        }]);
       } else {
-        console.log('⚠️ No photo provided in completion data');
+        logger.warn(() => ['⚠️ No photo provided in completion data']);
       }
 
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 60000); // 60 seconds for photo upload
 
-      const response = await fetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`, {
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/stops/${sequence}/complete`, {
         method: 'POST',
         // Don't set Content-Type manually - let React Native set it automatically with boundary
+        headers,
         body: formData,
         signal: controller.signal,
       });
 
       clearTimeout(timeoutId);
 
-      console.log('📥 Photo upload response status:', response.status);
+      logger.debug(() => ['📥 Photo upload response status:', response.status]);
 
       let data;
       const rawText = await response.text();
       try {
         data = rawText ? JSON.parse(rawText) : {};
       } catch (e) {
-        console.warn('⚠️ Non-JSON response:', rawText);
+        logger.warn(() => ['⚠️ Non-JSON response:', rawText]);
         data = { error: rawText || 'Unexpected response from server' };
       }
 
-      console.log('📥 Photo upload response data:', data);
+      logger.debug(() => ['📥 Photo upload response data:', data]);
 
       if (!response.ok) {
-        console.error('❌ Photo upload failed:', {
+        logger.error(() => ['❌ Photo upload failed:', {
           status: response.status,
           statusText: response.statusText,
           data: data
-        });
-        throw new Error(data.error || `Photo upload failed (status ${response.status})`);
+        }]);
+        const error = new Error(data.error || `Photo upload failed (status ${response.status})`);
+        error.status = response.status;
+        throw error;
       }
 
-      console.log('✅ Photo uploaded and stop completed successfully!');
+      logger.debug(() => ['✅ Photo uploaded and stop completed successfully!']);
       return data;
     } catch (error) {
       if (error.name === 'AbortError') {
-        console.error('❌ Photo upload timeout');
+        logger.error(() => ['❌ Photo upload timeout']);
         throw new Error('Photo upload timed out. Please try again.');
       }
-      console.error('❌ Photo upload error:', error);
-      console.error('❌ Error details:', {
+      logger.error(() => ['❌ Photo upload error:', error]);
+      logger.debug(() => ['❌ Error details:', {
         message: error.message,
         name: error.name,
         stack: error.stack
+      }]);
+      throw error;
+    } finally {
+      responseCache.invalidate(stopKey(assignmentId, sequence));
+      endTimer();
+    }
+  }
+
+  /**
+   * Complete several stops of one assignment in a single multipart request
+   * @param {number} assignmentId - Assignment ID
+   * @param {Array<Object>} completions - Items with sequence, weight, notes, image, completedAt
+   * @returns {Promise<Object>} Batch response with per-stop results
+   */
+  static async completeAssignmentStopsBatch(assignmentId, completions) {
+    try {
+      const formData = new FormData();
+      const entries = completions.map(completion => {
+        const entry = {
+          sequence: completion.sequence,
+          weight: completion.weight != null ? completion.weight.toString() : null,
+          notes: completion.notes || '',
+          completed_at: completion.completedAt,
+          idempotency_key: completion.idempotencyKey,
+        };
+
+        if (completion.photoUploadId) {
+          entry.photo_upload_id = completion.photoUploadId;
+        } else if (completion.image && completion.image.uri) {
+          entry.photo_field = `photo_${completion.sequence}`;
+          formData.append(entry.photo_field, {
+            uri: completion.image.uri,
+            type: completion.image.type || 'image/jpeg',
+            name: completion.image.fileName || `photo_${completion.sequence}.jpg`
+          });
+        }
+        return entry;
+      });
+      formData.append('completions', JSON.stringify(entries));
+
+      const controller = new AbortController();
+      const timeoutId = setTimeout(() => controller.abort(), 60000); // 60 seconds, same as single photo upload
+
+      const response = await tracedFetch(`${BASE_URL}/assignments/${assignmentId}/stops/complete-batch`, {
+        method: 'POST',
+        body: formData,
+        signal: controller.signal,
       });
+
+      clearTimeout(timeoutId);
+
+      let data;
+      const rawText = await response.text();
+      try {
+        data = rawText ? JSON.parse(rawText) : {};
+      } catch (e) {
+        data = { error: rawText || 'Unexpected response from server' };
+      }
+
+      if (!response.ok) {
+        const error = new Error(data.error || `Batch completion failed (status ${response.status})`);
+        error.status = response.status;
+        throw error;
+      }
+
+      return data;
+    } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error('❌ Batch completion timeout');
+        throw new Error('Batch completion timed out. Please try again.');
+      }
+      console.error('❌ Batch completion error:', error.message);
+      throw error;
+    } finally {
+      completions.forEach(completion => responseCache.invalidate(stopKey(assignmentId, completion.sequence)));
+    }
+  }
+
+  /**
+   * Open a resumable photo upload for a stop
+   * @param {number} assignmentId - Assignment ID
+   * @param {number} sequence - Stop sequence number (1-based)
+   * @param {number} size - Photo size in bytes
+   * @returns {Promise<Object>} upload_id, offset, size, complete
+   */
+  static createPhotoUpload(assignmentId, sequence, size) {
+    return this.photoUploadRequest(`/assignments/${assignmentId}/stops/${sequence}/photo-uploads`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ size }),
+    }, 'Opening the photo upload');
+  }
+
+  /**
+   * Bytes of a resumable photo upload the backend has acknowledged
+   * @param {string} uploadId - Upload ID from createPhotoUpload
+   * @returns {Promise<Object>} upload_id, offset, size, complete
+   */
+  static getPhotoUpload(uploadId) {
+    return this.photoUploadRequest(`/photo-uploads/${uploadId}`, { method: 'GET' }, 'Checking the photo upload');
+  }
+
+  /**
+   * Append one chunk to a resumable photo upload
+   * A 409 error carries the acknowledged offset (error.offset) to resume from
+   * @param {string} uploadId - Upload ID from createPhotoUpload
+   * @param {number} offset - Acknowledged offset the chunk starts at
+   * @param {Blob} chunk - The bytes
+   * @returns {Promise<Object>} upload_id, offset, size, complete
+   */
+  static uploadPhotoChunk(uploadId, offset, chunk) {
+    return this.photoUploadRequest(`/photo-uploads/${uploadId}?offset=${offset}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/offset+octet-stream' },
+      body: chunk,
+    }, 'Uploading the photo');
+  }
+
+  static async photoUploadRequest(path, options, action) {
+    try {
+      const controller = new AbortController();
+      const timeoutId = setTimeout(() => controller.abort(), 30000); // One chunk, not the whole photo
+
+      const response = await tracedFetch(`${BASE_URL}${path}`, { ...options, signal: controller.signal });
+
+      clearTimeout(timeoutId);
+
+      let data;
+      const rawText = await response.text();
+      try {
+        data = rawText ? JSON.parse(rawText) : {};
+      } catch (e) {
+        data = { error: rawText || 'Unexpected response from server' };
+      }
+
+      if (!response.ok) {
+        const error = new Error(data.error || `${action} failed (status ${response.status})`);
+        error.status = response.status;
+        error.offset = data.offset;
+        throw error;
+      }
+
+      return data;
+    } catch (error) {
+      if (error.name === 'AbortError') {
+        console.error(`❌ ${action} timed out`);
+        throw new Error(`${action} timed out. Please try again.`);
+      }
       throw error;
     }
   }
 
   // ==================== END PHOTO UPLOAD METHODS ====================
+
+  /**
+   * Stop/pickup response cache counters since the last call
+   * @returns {Object} hits, misses, coalesced (joined a request in flight), invalidations
+   */
+  static takeCacheStats() {
+    return responseCache.takeStats();
+  }
 }
 
 export default ApiService;
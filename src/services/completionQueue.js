@@ -0,0 +1,398 @@
+/**
+ * Completion Queue
+ * Persistent outbound queue of stop completions, drained in the background
+ *
+ * Completions are written to AsyncStorage first, so the driver can move on
+ * immediately and nothing is lost in a dead zone. The stops of an
+ * assignment go out in order: only the oldest one (the head of line) has a
+ * retry time, backing off exponentially, and the stops completed while it
+ * waits go out behind it in one batch request where the backend supports it.
+ *
+ * Every completion carries an idempotency key, so a retry after a timeout
+ * (when the first attempt may have gone through) cannot complete the stop
+ * twice; the backend answers duplicates with the stored result. That makes
+ * it safe to retry transient failures straight away before backing off.
+ *
+ * A completion the backend refuses (a 4xx that no retry can get past, or a
+ * batch result with success: false MAX_REJECTIONS times), or whose photo is
+ * gone from the phone, is not retried forever: it is marked failed, stops
+ * blocking the stops behind it, and the onFailure listeners are told so the
+ * driver can retry it (without the photo, if that is what is missing) or
+ * discard it.
+ */
+
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import ApiService from './api';
+import PhotoUpload from './photoUpload';
+
+const QUEUE_KEY = 'completionQueue';
+
+const BATCH_SIZE = 5;
+const BASE_RETRY_DELAY = 2000; // 2 seconds
+const MAX_RETRY_DELAY = 5 * 60 * 1000; // 5 minutes
+const QUICK_RETRIES = 2; // Immediate retries of a timed-out or 5xx request
+const QUICK_RETRY_DELAY = 500;
+const MAX_REJECTIONS = 3; // Refusals before a completion is marked failed
+
+const newIdempotencyKey = () => {
+  let key = '';
+  for (let i = 0; i < 32; i++) {
+    key += Math.floor(Math.random() * 16).toString(16);
+  }
+  return key;
+};
+
+const isTransient = error => !error.status || error.status >= 500;
+
+// The backend answered and refused this completion (408 and 429 are load, not refusals)
+const isRejection = error =>
+  error.status >= 400 && error.status < 500 && error.status !== 408 && error.status !== 429;
+
+// Refusals no retry can change; a 409 is a photo upload the next attempt resumes
+const isPermanent = error => isRejection(error) && error.status !== 409;
+
+// Run `request` again after a short pause while it fails transiently
+const withQuickRetries = async request => {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await request();
+    } catch (error) {
+      if (attempt >= QUICK_RETRIES || !isTransient(error)) {
+        throw error;
+      }
+      await new Promise(resolve => setTimeout(resolve, QUICK_RETRY_DELAY * (attempt + 1)));
+    }
+  }
+};
+
+class CompletionQueue {
+  static draining = false;
+  static drainRequested = false;
+  static drainTimer = null;
+  // null until the first batch request tells us whether the backend supports it
+  static batchSupported = null;
+  // Serializes read-modify-write cycles on the stored queue
+  static pendingUpdate = Promise.resolve();
+  static failureListeners = new Set();
+
+  /**
+   * Persist a stop completion and start draining in the background
+   * @param {number} assignmentId - Assignment ID
+   * @param {number} sequence - Stop sequence number (1-based)
+   * @param {Object} completionData - weight, notes, image, completedAt
+   * @returns {Promise<Object>} The queued item
+   */
+  static async enqueue(assignmentId, sequence, completionData = {}) {
+    const item = {
+      id: `${assignmentId}-${sequence}-${Date.now()}`,
+      idempotencyKey: newIdempotencyKey(),
+      assignmentId,
+      sequence,
+      weight: completionData.weight,
+      notes: completionData.notes || '',
+      image: completionData.image
+        ? {
+            uri: completionData.image.uri,
+            type: completionData.image.type,
+            fileName: completionData.image.fileName,
+          }
+        : null,
+      completedAt: completionData.completedAt || new Date().toISOString(),
+      enqueuedAt: Date.now(),
+      attempts: 0,
+      rejections: 0,
+      nextAttemptAt: 0,
+      failed: null,
+    };
+
+    await this.update(queue => [...queue, item]);
+
+    this.drain();
+    return item;
+  }
+
+  /**
+   * Resume draining whatever was left in storage (call once at app start)
+   */
+  static start() {
+    this.drain();
+    // Completions refused in an earlier session still need the driver's decision
+    this.failed().then(failed => this.notifyFailure(failed));
+  }
+
+  /**
+   * Number of completions not yet acknowledged by the backend
+   * @returns {Promise<number>}
+   */
+  static async pendingCount() {
+    const queue = await this.load();
+    return queue.filter(item => !item.failed).length;
+  }
+
+  /**
+   * Completions marked failed, with failed.error and failed.at set (and
+   * failed.photoMissing when the photo is gone from the phone)
+   * @returns {Promise<Array>}
+   */
+  static async failed() {
+    const queue = await this.load();
+    return queue.filter(item => item.failed);
+  }
+
+  /**
+   * Call `listener` with the newly failed completions whenever some fail
+   * @param {Function} listener - Receives an array of failed items
+   * @returns {Function} Unsubscribe
+   */
+  static onFailure(listener) {
+    this.failureListeners.add(listener);
+    return () => this.failureListeners.delete(listener);
+  }
+
+  static notifyFailure(items) {
+    if (items.length > 0) {
+      this.failureListeners.forEach(listener => listener(items));
+    }
+  }
+
+  /**
+   * Put failed completions back in the queue and send them again
+   * @param {Object} options - withoutPhoto: drop the photos that are gone from the phone
+   */
+  static async retryFailed({ withoutPhoto = false } = {}) {
+    const dropPhoto = item => withoutPhoto && item.failed.photoMissing;
+    const failed = await this.failed();
+    await this.update(queue => queue.map(item => (item.failed
+      ? { ...item, image: dropPhoto(item) ? null : item.image, failed: null, rejections: 0, nextAttemptAt: 0 }
+      : item)));
+    await PhotoUpload.forget(failed.filter(dropPhoto));
+    this.drain();
+  }
+
+  /**
+   * Drop failed completions for good
+   */
+  static async discardFailed() {
+    const failed = await this.failed();
+    const ids = new Set(failed.map(item => item.id));
+    await this.update(queue => queue.filter(item => !ids.has(item.id)));
+    await PhotoUpload.forget(failed.filter(item => item.image));
+  }
+
+  static async load() {
+    try {
+      const stored = await AsyncStorage.getItem(QUEUE_KEY);
+      return stored ? JSON.parse(stored) : [];
+    } catch (error) {
+      console.error('Error loading completion queue:', error);
+      return [];
+    }
+  }
+
+  static async save(queue) {
+    await AsyncStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+  }
+
+  /**
+   * Apply `mutator` to the stored queue without racing other updates
+   * @param {Function} mutator - Receives the queue array, returns the new one
+   * @returns {Promise<Array>} The saved queue
+   */
+  static update(mutator) {
+    const run = this.pendingUpdate.then(async () => {
+      const queue = mutator(await this.load());
+      await this.save(queue);
+      return queue;
+    });
+    this.pendingUpdate = run.catch(() => {});
+    return run;
+  }
+
+  /**
+   * Send every due item, then schedule the next attempt for whatever is left
+   */
+  static async drain() {
+    if (this.draining) {
+      // Picked up when the running drain finishes
+      this.drainRequested = true;
+      return;
+    }
+    this.draining = true;
+    clearTimeout(this.drainTimer);
+
+    try {
+      let batch = this.nextBatch(await this.load());
+      while (batch.length > 0) {
+        const { acknowledged, rejected } = await this.send(batch);
+        await this.settle(batch, acknowledged, rejected);
+        batch = this.nextBatch(await this.load());
+      }
+      this.scheduleRetry(await this.load());
+    } catch (error) {
+      console.error('Error draining completion queue:', error);
+    } finally {
+      this.draining = false;
+      if (this.drainRequested) {
+        this.drainRequested = false;
+        this.drain();
+      }
+    }
+  }
+
+  /**
+   * First pending item of each assignment, in queue order
+   */
+  static heads(queue) {
+    const seen = new Set();
+    return queue.filter(item => {
+      if (item.failed || seen.has(item.assignmentId)) {
+        return false;
+      }
+      seen.add(item.assignmentId);
+      return true;
+    });
+  }
+
+  /**
+   * The first assignment whose head is due: the head and the items queued behind it, oldest first
+   * Only the head's retry time counts, so a stop enqueued while it backs off never overtakes it
+   */
+  static nextBatch(queue) {
+    const now = Date.now();
+    const head = this.heads(queue).find(item => item.nextAttemptAt <= now);
+    if (!head) {
+      return [];
+    }
+    const size = this.batchSupported === false ? 1 : BATCH_SIZE;
+    return queue.filter(item => !item.failed && item.assignmentId === head.assignmentId).slice(0, size);
+  }
+
+  /**
+   * Send a batch
+   * @returns {Promise<Object>} { acknowledged: Set of item IDs,
+   *   rejected: Map of item ID to { error, permanent } }
+   */
+  static async send(queued) {
+    const acknowledged = new Set();
+    const rejected = new Map();
+
+    // Photos go up first, resumably; a stop whose photo is not through waits, and so do later ones,
+    // unless the backend refused the photo or it is gone from the phone, which no retry fixes
+    const batch = [];
+    for (const item of queued) {
+      try {
+        batch.push(await PhotoUpload.prepare(item));
+      } catch (error) {
+        if (!isRejection(error) && !error.photoMissing) {
+          break;
+        }
+        rejected.set(item.id, { error: error.message, permanent: true, photoMissing: !!error.photoMissing });
+      }
+    }
+    if (batch.length === 0) {
+      return { acknowledged, rejected };
+    }
+
+    if (batch.length > 1 || this.batchSupported === true) {
+      try {
+        const result = await withQuickRetries(
+          () => ApiService.completeAssignmentStopsBatch(batch[0].assignmentId, batch)
+        );
+        this.batchSupported = true;
+        const results = new Map((result.results || []).map(r => [r.sequence, r]));
+        batch.forEach(item => {
+          const itemResult = results.get(item.sequence);
+          if (itemResult && itemResult.success) {
+            acknowledged.add(item.id);
+          } else if (itemResult) {
+            rejected.set(item.id, { error: itemResult.error || 'Refused by the server', permanent: false });
+          }
+        });
+        return { acknowledged, rejected };
+      } catch (error) {
+        if (error.status === 404 || error.status === 405) {
+          console.log('ℹ️ Batch completion not supported, sending stops one at a time');
+          this.batchSupported = false;
+        } else {
+          if (isRejection(error)) {
+            batch.forEach(item => rejected.set(item.id, { error: error.message, permanent: false }));
+          }
+          return { acknowledged, rejected };
+        }
+      }
+    }
+
+    for (const item of batch) {
+      try {
+        await withQuickRetries(
+          () => ApiService.completeAssignmentStopWithPhoto(item.assignmentId, item.sequence, item)
+        );
+        acknowledged.add(item.id);
+      } catch (error) {
+        if (!isRejection(error)) {
+          // Keep order: later stops stay behind this one, which is now the head of line
+          break;
+        }
+        rejected.set(item.id, { error: error.message, permanent: isPermanent(error) });
+      }
+    }
+    return { acknowledged, rejected };
+  }
+
+  /**
+   * Drop acknowledged items, mark refused ones failed once refused for good,
+   * and give the rest of the batch one retry time, so whichever of them is
+   * now the head waits for it and the others go out with it
+   */
+  static async settle(batch, acknowledged, rejected = new Map()) {
+    const attempted = new Set(batch.map(item => item.id));
+    const now = Date.now();
+    // Backoff follows the head; jitter so a whole fleet coming out of the same dead zone does not retry in lockstep
+    const delay = Math.min(MAX_RETRY_DELAY, BASE_RETRY_DELAY * 2 ** batch[0].attempts);
+    const nextAttemptAt = now + delay * (0.5 + Math.random() / 2);
+    const failed = [];
+    const queue = await this.update(stored => stored
+      .filter(item => !acknowledged.has(item.id))
+      .map(item => {
+        if (!attempted.has(item.id)) {
+          return item;
+        }
+        const attempts = item.attempts + 1;
+        const rejection = rejected.get(item.id);
+        const rejections = (item.rejections || 0) + (rejection ? 1 : 0);
+        if (rejection && (rejection.permanent || rejections >= MAX_REJECTIONS)) {
+          const failedItem = {
+            ...item,
+            attempts,
+            rejections,
+            failed: { error: rejection.error, at: now, photoMissing: !!rejection.photoMissing },
+          };
+          failed.push(failedItem);
+          return failedItem;
+        }
+        return { ...item, attempts, rejections, nextAttemptAt };
+      }));
+
+    await PhotoUpload.forget(batch.filter(item => item.image && acknowledged.has(item.id)));
+
+    const pending = queue.filter(item => !item.failed).length;
+    if (acknowledged.size > 0) {
+      console.log(`✅ Synced ${acknowledged.size} stop completion(s), ${pending} pending`);
+    }
+    if (failed.length > 0) {
+      console.warn(`⚠️ ${failed.length} stop completion(s) failed:`, failed[0].failed.error);
+      this.notifyFailure(failed);
+    }
+  }
+
+  static scheduleRetry(queue) {
+    const heads = this.heads(queue);
+    if (heads.length === 0) {
+      return;
+    }
+    const nextAttemptAt = Math.min(...heads.map(item => item.nextAttemptAt));
+    this.drainTimer = setTimeout(() => this.drain(), Math.max(0, nextAttemptAt - Date.now()));
+  }
+}
+
+export default CompletionQueue;
@@ -0,0 +1,155 @@
+/**
+ * Photo Upload
+ * Resumable, chunked upload of stop photos ahead of the completion request
+ *
+ * The photo goes up in CHUNK_SIZE pieces, each acknowledged by the backend
+ * with the new offset. When the connection drops, the next attempt asks the
+ * backend how much arrived and carries on from there instead of sending the
+ * whole photo again. The completion request then only names the upload, and
+ * the backend completes the stop once every byte is committed.
+ *
+ * Upload IDs are kept in AsyncStorage, so an app restart resumes too.
+ *
+ * A photo no longer on the phone (e.g. cleared from the cache) fails with
+ * error.photoMissing set; no retry can bring it back.
+ */
+
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import ApiService from './api';
+
+const UPLOADS_KEY = 'photoUploads';
+
+const CHUNK_SIZE = 64 * 1024; // Fits the 30 second chunk timeout even on 2G
+const MAX_RESUMES = 3; // Immediate resumes per attempt before backing off
+
+const uploadKey = item => `${item.assignmentId}-${item.sequence}`;
+
+class PhotoUpload {
+  // null until the first upload tells us whether the backend supports it
+  static supported = null;
+
+  /**
+   * Upload the photo of a queued completion
+   * @param {Object} item - Completion with assignmentId, sequence and image
+   * @returns {Promise<Object>} The item with photoUploadId set, or unchanged
+   *   when it has no photo or the backend only takes multipart photos
+   */
+  static async prepare(item) {
+    if (!item.image || !item.image.uri) {
+      return item;
+    }
+    // Also read when it goes up as multipart: a missing file would fail that request like a dead zone
+    const photo = await this.read(item);
+    if (this.supported === false) {
+      return item;
+    }
+    try {
+      const photoUploadId = await this.upload(item, photo);
+      this.supported = true;
+      return { ...item, photoUploadId };
+    } catch (error) {
+      if ((error.status === 404 || error.status === 405) && this.supported === null) {
+        console.log('ℹ️ Resumable photo uploads not supported, sending photos with the completion');
+        this.supported = false;
+        return item;
+      }
+      throw error;
+    }
+  }
+
+  /**
+   * The photo's bytes, from the phone's storage
+   * @returns {Promise<Blob>}
+   */
+  static async read(item) {
+    let photo = null;
+    try {
+      photo = await (await fetch(item.image.uri)).blob();
+    } catch (error) {
+      // A local file: there is no connection to wait for
+    }
+    if (!photo || photo.size === 0) {
+      const error = new Error('The photo is no longer on this phone');
+      error.photoMissing = true;
+      throw error;
+    }
+    return photo;
+  }
+
+  /**
+   * Send whatever the backend has not acknowledged yet
+   * @returns {Promise<string>} Upload ID of the complete upload
+   */
+  static async upload(item, photo) {
+    const uploads = await this.load();
+    const key = uploadKey(item);
+
+    let status = null;
+    if (uploads[key]) {
+      try {
+        status = await ApiService.getPhotoUpload(uploads[key]);
+      } catch (error) {
+        if (error.status !== 404) {
+          throw error;
+        }
+        // Expired on the backend: start over
+      }
+    }
+    if (!status || status.size !== photo.size) {
+      status = await ApiService.createPhotoUpload(item.assignmentId, item.sequence, photo.size);
+      await this.remember(key, status.upload_id);
+    }
+
+    let offset = status.offset;
+    let resumes = 0;
+    while (offset < photo.size) {
+      try {
+        const chunk = photo.slice(offset, Math.min(offset + CHUNK_SIZE, photo.size));
+        offset = (await ApiService.uploadPhotoChunk(status.upload_id, offset, chunk)).offset;
+      } catch (error) {
+        if (error.status === 409 && error.offset != null) {
+          // Part of a dropped chunk arrived after all
+          offset = error.offset;
+        } else if (!error.status && resumes < MAX_RESUMES) {
+          // Connection dropped: ask where the backend got to and carry on
+          resumes += 1;
+          offset = (await ApiService.getPhotoUpload(status.upload_id)).offset;
+        } else {
+          throw error;
+        }
+      }
+    }
+    return status.upload_id;
+  }
+
+  /**
+   * Drop the upload IDs of completions the backend acknowledged
+   * @param {Array<Object>} items - Acknowledged completions
+   */
+  static async forget(items) {
+    if (items.length === 0) {
+      return;
+    }
+    const uploads = await this.load();
+    items.forEach(item => delete uploads[uploadKey(item)]);
+    await AsyncStorage.setItem(UPLOADS_KEY, JSON.stringify(uploads));
+  }
+
+  static async remember(key, uploadId) {
+    const uploads = await this.load();
+    uploads[key] = uploadId;
+    await AsyncStorage.setItem(UPLOADS_KEY, JSON.stringify(uploads));
+  }
+
+  static async load() {
+    try {
+      const stored = await AsyncStorage.getItem(UPLOADS_KEY);
+      return stored ? JSON.parse(stored) : {};
+    } catch (error) {
+      console.error('Error loading photo uploads:', error);
+      return {};
+    }
+  }
+}
+
+export default PhotoUpload;
@@ -0,0 +1,189 @@
+/**
+ * Route Cache
+ * All stops of the current assignment, fetched once at login
+ *
+ * Stops are stored in AsyncStorage in a compact form: the field names once,
+ * then one array of values per stop keyed by sequence. The copy is
+ * refreshed with the ETag (304 when nothing changed) and the route version
+ * (only changed stops are sent), so moving to the next stop needs no
+ * request at all. Every REFRESH_EVERY_STOPS completed stops the route is
+ * refreshed in the background, so changes made on the backend during the
+ * route reach the driver.
+ */
+
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import ApiService from './api';
+import { API_CONFIG } from '../utils/config';
+
+const ROUTE_KEY = 'routeStops';
+const { REFRESH_EVERY_STOPS } = API_CONFIG.ROUTE_CACHE;
+
+class RouteCache {
+  // In-memory copy of the stored route, so lookups skip AsyncStorage
+  static route = null;
+  // In-flight refresh per assignment ID
+  static pendingRefreshes = new Map();
+  static stopsSinceRefresh = 0;
+  // Set to false once the backend answers 404/405 for the bulk stops endpoint
+  static bulkSupported = null;
+
+  /**
+   * Fetch (or refresh) all stops of an assignment and store them
+   * @param {number} assignmentId - Assignment ID
+   * @returns {Promise<Object|null>} The cached route, or null if the fetch failed
+   */
+  static refresh(assignmentId) {
+    if (this.bulkSupported === false) {
+      return Promise.resolve(null);
+    }
+    if (this.pendingRefreshes.has(assignmentId)) {
+      return this.pendingRefreshes.get(assignmentId);
+    }
+    this.stopsSinceRefresh = 0;
+    const pending = this.fetchRoute(assignmentId).finally(() => {
+      this.pendingRefreshes.delete(assignmentId);
+    });
+    this.pendingRefreshes.set(assignmentId, pending);
+    return pending;
+  }
+
+  /**
+   * Count a completed stop and refresh the route in the background every
+   * REFRESH_EVERY_STOPS stops (304 or only the changed stops when nothing much changed)
+   * @param {number} assignmentId - Assignment ID
+   */
+  static stopCompleted(assignmentId) {
+    this.stopsSinceRefresh += 1;
+    if (this.stopsSinceRefresh >= REFRESH_EVERY_STOPS) {
+      this.refresh(assignmentId);
+    }
+  }
+
+  static async fetchRoute(assignmentId) {
+    const cached = await this.load();
+    const current = cached && cached.assignmentId === assignmentId ? cached : null;
+
+    try {
+      const data = await ApiService.getAssignmentStops(assignmentId, {
+        etag: current ? current.etag : null,
+        since: current ? current.version : null,
+      });
+      this.bulkSupported = true;
+
+      if (data.notModified) {
+        console.log('✅ Route unchanged (304), using cached stops');
+        return current;
+      }
+
+      const base = current && data.delta ? current : this.encode(assignmentId, []);
+      const route = this.merge(base, data);
+      await this.save(route);
+      console.log(`✅ Route cached: ${Object.keys(route.stops).length} stops, version ${route.version}`);
+      return route;
+    } catch (error) {
+      if (error.status === 404 || error.status === 405) {
+        console.log('ℹ️ Bulk route fetch not supported, loading stops one at a time');
+        this.bulkSupported = false;
+        return null;
+      }
+      console.warn('⚠️ Could not fetch route stops:', error.message);
+      return current;
+    }
+  }
+
+  /**
+   * Stop lookup with the same shape as ApiService.getAssignmentStop,
+   * falling back to the per-stop request when the stop is not cached
+   * @param {number} assignmentId - Assignment ID
+   * @param {number} sequence - Stop sequence number (1-based)
+   * @returns {Promise<Object>} { stop, sequence, total_stops, isLast }
+   */
+  static async getAssignmentStop(assignmentId, sequence) {
+    const route = await this.load();
+    if (route && route.assignmentId === assignmentId) {
+      const stop = this.decode(route, sequence);
+      if (stop) {
+        return {
+          success: true,
+          stop,
+          sequence,
+          total_stops: route.totalStops,
+          isLast: sequence >= route.totalStops,
+        };
+      }
+    }
+
+    // Not cached (e.g. the login prefetch failed): retry it for the next stops
+    this.refresh(assignmentId);
+    return ApiService.getAssignmentStop(assignmentId, sequence);
+  }
+
+  static encode(assignmentId, stops) {
+    return this.merge({ assignmentId, fields: [], stops: {} }, { stops });
+  }
+
+  /**
+   * Fold a stops response (full or delta) into a cached route
+   */
+  static merge(route, data) {
+    const fields = [...route.fields];
+    const stops = { ...route.stops };
+
+    for (const stop of data.stops || []) {
+      Object.keys(stop).forEach(field => {
+        if (!fields.includes(field)) {
+          fields.push(field);
+        }
+      });
+      stops[stop.sequence] = fields.map(field => (stop[field] === undefined ? null : stop[field]));
+    }
+
+    return {
+      assignmentId: route.assignmentId,
+      etag: data.etag || route.etag || null,
+      version: data.version != null ? data.version : route.version,
+      totalStops: data.total_stops || route.totalStops,
+      fields,
+      stops,
+    };
+  }
+
+  static decode(route, sequence) {
+    const values = route.stops[sequence];
+    if (!values) {
+      return null;
+    }
+    const stop = {};
+    route.fields.forEach((field, index) => {
+      // Rows cached before a field first appeared are shorter than `fields`
+      stop[field] = index < values.length ? values[index] : null;
+    });
+    return stop;
+  }
+
+  static async load() {
+    if (this.route) {
+      return this.route;
+    }
+    try {
+      const stored = await AsyncStorage.getItem(ROUTE_KEY);
+      this.route = stored ? JSON.parse(stored) : null;
+    } catch (error) {
+      console.error('Error loading cached route:', error);
+    }
+    return this.route;
+  }
+
+  static async save(route) {
+    this.route = route;
+    await AsyncStorage.setItem(ROUTE_KEY, JSON.stringify(route));
+  }
+
+  static async clear() {
+    this.route = null;
+    this.stopsSinceRefresh = 0;
+    await AsyncStorage.removeItem(ROUTE_KEY);
+  }
+}
+
+export default RouteCache;
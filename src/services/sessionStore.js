@@ -0,0 +1,159 @@
+/**
+ * Session Store
+ * Persists login sessions as static route data plus a small mutable cursor
+ *
+ * Controllers read full sessions as before; moving to the next stop only
+ * rewrites the cursor key (see utils/sessionLayout). Sessions are cached in
+ * memory after the first read and written through to AsyncStorage, so hot
+ * paths (screen renders, progress, navigation) do not touch storage.
+ *
+ * The cached route and cursor are deep-frozen copies: a read hands out a new
+ * top-level object, but nested data (pickups, currentStop) is shared with the
+ * cache and cannot be modified in place.
+ */
+
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import { SESSION_LAYOUTS, mergeSession, splitSession } from '../utils/sessionLayout';
+
+const deepFreeze = value => {
+  if (value && typeof value === 'object' && !Object.isFrozen(value)) {
+    Object.values(value).forEach(deepFreeze);
+    Object.freeze(value);
+  }
+  return value;
+};
+
+// The cache keeps its own copy, never objects the caller may still change
+const frozenCopy = value => (value == null ? null : deepFreeze(JSON.parse(JSON.stringify(value))));
+
+class SessionStore {
+  // kind -> { route, cursor } as last read from or written to storage (null parts = no session)
+  static cache = new Map();
+  // kind -> in-flight storage read, so concurrent first reads share one round trip
+  static pendingLoads = new Map();
+  // Session reads requested by controllers vs. reads that reached AsyncStorage
+  static stats = { reads: 0, storageReads: 0, writes: 0 };
+
+  /**
+   * Store a full session (at login)
+   * @param {string} kind - 'driver' (V1) or 'assignment' (V2)
+   * @param {Object} session - Full session object
+   */
+  static async save(kind, session) {
+    const layout = SESSION_LAYOUTS[kind];
+    const { route, cursor } = splitSession(layout, session);
+    const entry = {
+      route: frozenCopy(route),
+      cursor: frozenCopy({ ...cursor, updatedAt: new Date().toISOString() }),
+    };
+    await this.writeThrough(kind, entry, [
+      [layout.key, JSON.stringify(entry.route)],
+      [layout.cursorKey, JSON.stringify(entry.cursor)],
+    ]);
+  }
+
+  /**
+   * Read a full session
+   * @param {string} kind - 'driver' (V1) or 'assignment' (V2)
+   * @returns {Promise<Object|null>} Session or null; top-level fields may be
+   *   reassigned, nested objects (pickups, currentStop) are frozen
+   */
+  static async get(kind) {
+    this.stats.reads += 1;
+    const { route, cursor } = await this.load(kind);
+    return mergeSession(route, cursor);
+  }
+
+  /**
+   * Change cursor fields without touching the stored route data
+   * @param {string} kind - 'driver' (V1) or 'assignment' (V2)
+   * @param {Object} changes - Cursor fields to set, e.g. { currentSequence: 5 }
+   * @returns {Promise<Object>} The new cursor
+   */
+  static async updateCursor(kind, changes) {
+    const layout = SESSION_LAYOUTS[kind];
+    const { route, cursor: current } = await this.load(kind);
+    const cursor = frozenCopy({ ...(current || {}), ...changes, updatedAt: new Date().toISOString() });
+    await this.writeThrough(kind, { route, cursor }, [[layout.cursorKey, JSON.stringify(cursor)]]);
+    return cursor;
+  }
+
+  /**
+   * Remove a session (at logout)
+   * @param {string} kind - 'driver' (V1) or 'assignment' (V2)
+   */
+  static async clear(kind) {
+    const layout = SESSION_LAYOUTS[kind];
+    this.cache.set(kind, { route: null, cursor: null });
+    await AsyncStorage.multiRemove([layout.key, layout.cursorKey]);
+  }
+
+  /**
+   * Drop cached sessions so the next read goes to storage
+   * @param {string} [kind] - Session kind; all kinds when omitted
+   */
+  static invalidate(kind) {
+    if (kind) {
+      this.cache.delete(kind);
+      this.pendingLoads.delete(kind);
+    } else {
+      this.cache.clear();
+      this.pendingLoads.clear();
+    }
+  }
+
+  /**
+   * Counters since the previous call (for per-screen instrumentation)
+   * @returns {{reads: number, storageReads: number, writes: number}}
+   */
+  static takeStats() {
+    const stats = this.stats;
+    this.stats = { reads: 0, storageReads: 0, writes: 0 };
+    return stats;
+  }
+
+  static async load(kind) {
+    if (this.cache.has(kind)) {
+      return this.cache.get(kind);
+    }
+    if (!this.pendingLoads.has(kind)) {
+      const layout = SESSION_LAYOUTS[kind];
+      this.stats.storageReads += 1;
+      const load = AsyncStorage.multiGet([layout.key, layout.cursorKey])
+        .then(([[, route], [, cursor]]) => {
+          const entry = {
+            route: route ? deepFreeze(JSON.parse(route)) : null,
+            cursor: cursor ? deepFreeze(JSON.parse(cursor)) : null,
+          };
+          // A write that landed while this read was in flight is newer than what was read,
+          // and a read dropped by invalidate() must not fill the cache
+          if (!this.cache.has(kind) && this.pendingLoads.get(kind) === load) {
+            this.cache.set(kind, entry);
+          }
+          return this.cache.get(kind) || entry;
+        })
+        .finally(() => {
+          // invalidate() may have replaced this read with a newer one
+          if (this.pendingLoads.get(kind) === load) {
+            this.pendingLoads.delete(kind);
+          }
+        });
+      this.pendingLoads.set(kind, load);
+    }
+    return this.pendingLoads.get(kind);
+  }
+
+  static async writeThrough(kind, entry, pairs) {
+    this.cache.set(kind, entry);
+    this.stats.writes += 1;
+    try {
+      await AsyncStorage.multiSet(pairs);
+    } catch (error) {
+      // Storage no longer matches memory: re-read it next time
+      this.invalidate(kind);
+      throw error;
+    }
+  }
+}
+
+export default SessionStore;
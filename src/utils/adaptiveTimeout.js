@@ -0,0 +1,177 @@
+/**
+ * Adaptive Timeouts
+ * Per-endpoint request timeouts learned from observed latency, and retried
+ * or hedged requests for idempotent GETs
+ *
+ * Each endpoint keeps a window of its recent latencies. Once there are
+ * enough, its timeout becomes a multiple of the p99 (never longer than the
+ * endpoint's fixed timeout, never shorter than MIN_TIMEOUT), so a request
+ * stuck on a bad cell is abandoned after seconds instead of half a minute.
+ * A request that is safe to send twice is then sent once more. Once its
+ * endpoint has enough samples it is hedged instead: a second copy goes out
+ * when the first is still out after the endpoint's p95, whichever answers
+ * first wins and the slower copy is aborted.
+ *
+ * straggler_harness.py measures the same policies ("adaptive" and "hedged").
+ *
+ * Settings: API_CONFIG.ADAPTIVE in src/utils/config.js
+ */
+
+import { API_CONFIG } from './config';
+import { tracedFetch } from './tracing';
+
+const settings = API_CONFIG.ADAPTIVE;
+
+// Nearest-rank percentile of a sorted array
+const percentileOf = (sorted, p) =>
+  sorted[Math.min(sorted.length - 1, Math.max(0, Math.ceil((p / 100) * sorted.length) - 1))];
+
+export const latencyStats = {
+  samples: {},
+  counters: { requests: 0, timeouts: 0, retries: 0, hedged: 0, hedgeWins: 0 },
+
+  record(endpoint, ms) {
+    const window = this.samples[endpoint] || (this.samples[endpoint] = []);
+    window.push(ms);
+    if (window.length > settings.WINDOW) {
+      window.shift();
+    }
+  },
+
+  /**
+   * Latency percentile of an endpoint's recent requests
+   * @returns {number|null} Milliseconds, or null until MIN_SAMPLES requests were seen
+   */
+  percentile(endpoint, p) {
+    const window = this.samples[endpoint];
+    if (!window || window.length < settings.MIN_SAMPLES) {
+      return null;
+    }
+    return percentileOf([...window].sort((a, b) => a - b), p);
+  },
+
+  takeCounters() {
+    const counters = this.counters;
+    this.counters = { requests: 0, timeouts: 0, retries: 0, hedged: 0, hedgeWins: 0 };
+    return counters;
+  },
+};
+
+/**
+ * Timeout for the next request to an endpoint
+ * @param {string} endpoint - Latency bucket, e.g. 'GET stop'
+ * @param {number} fixedTimeout - The endpoint's fixed timeout (ms), used until enough samples exist
+ * @returns {number} Milliseconds
+ */
+export const timeoutFor = (endpoint, fixedTimeout) => {
+  const p = settings.ENABLED ? latencyStats.percentile(endpoint, settings.TIMEOUT_PERCENTILE) : null;
+  if (p === null) {
+    return fixedTimeout;
+  }
+  return Math.min(fixedTimeout, Math.max(settings.MIN_TIMEOUT, p * settings.TIMEOUT_MULTIPLIER));
+};
+
+/**
+ * How long to wait before hedging a request to an endpoint
+ * @returns {number|null} Milliseconds, or null when the endpoint should not be hedged yet
+ */
+export const hedgeDelayFor = endpoint => {
+  if (!settings.ENABLED || !settings.HEDGING) {
+    return null;
+  }
+  const p = latencyStats.percentile(endpoint, settings.HEDGE_PERCENTILE);
+  return p === null ? null : Math.max(settings.MIN_HEDGE_DELAY, p);
+};
+
+// One copy of the request, aborted at the endpoint's current timeout
+const attempt = (endpoint, url, options, fixedTimeout, controller) => {
+  const limit = timeoutFor(endpoint, fixedTimeout);
+  const startedAt = Date.now();
+  latencyStats.counters.requests += 1;
+  const timeoutId = setTimeout(() => {
+    // A timed-out request took at least this long; keep it in the window so the timeout can grow back
+    latencyStats.counters.timeouts += 1;
+    latencyStats.record(endpoint, limit);
+    controller.abort();
+  }, limit);
+
+  return tracedFetch(url, { ...options, signal: controller.signal })
+    .then(response => {
+      latencyStats.record(endpoint, Date.now() - startedAt);
+      return response;
+    })
+    .finally(() => clearTimeout(timeoutId));
+};
+
+// One copy, and a second one straight away if the first timed out
+const withRetry = (endpoint, url, options, fixedTimeout) =>
+  attempt(endpoint, url, options, fixedTimeout, new AbortController()).catch(error => {
+    if (error.name !== 'AbortError') {
+      throw error;
+    }
+    latencyStats.counters.retries += 1;
+    return attempt(endpoint, url, options, fixedTimeout, new AbortController());
+  });
+
+/**
+ * fetch() with the endpoint's adaptive timeout; retried once after a timeout or hedged when idempotent
+ * A timeout rejects with an AbortError, like a fetch aborted by its own AbortController
+ * @param {string} endpoint - Latency bucket, e.g. 'GET stop'
+ * @param {string} url - Request URL
+ * @param {Object} options - fetch options (without signal)
+ * @param {Object} policy - timeout: fixed timeout in ms; idempotent: true if the request is safe to send twice
+ * @returns {Promise<Response>} The first response
+ */
+export const adaptiveFetch = (endpoint, url, options, { timeout, idempotent = false }) => {
+  const hedgeDelay = idempotent ? hedgeDelayFor(endpoint) : null;
+  if (hedgeDelay === null) {
+    return idempotent && settings.ENABLED
+      ? withRetry(endpoint, url, options, timeout)
+      : attempt(endpoint, url, options, timeout, new AbortController());
+  }
+
+  return new Promise((resolve, reject) => {
+    const controllers = [];
+    let failures = 0;
+    let settled = false;
+    let hedgeTimer = null;
+
+    const launch = () => {
+      const controller = new AbortController();
+      const isHedge = controllers.length > 0;
+      controllers.push(controller);
+      attempt(endpoint, url, options, timeout, controller).then(
+        response => {
+          if (settled) {
+            return;
+          }
+          settled = true;
+          clearTimeout(hedgeTimer);
+          if (isHedge) {
+            latencyStats.counters.hedgeWins += 1;
+          }
+          controllers.filter(other => other !== controller).forEach(other => other.abort());
+          resolve(response);
+        },
+        error => {
+          failures += 1;
+          // Fail once every copy has failed; an early failure still waits for the hedge
+          if (!settled && failures === controllers.length && hedgeTimer === null) {
+            settled = true;
+            clearTimeout(hedgeTimer);
+            reject(error);
+          }
+        }
+      );
+    };
+
+    launch();
+    hedgeTimer = setTimeout(() => {
+      hedgeTimer = null;
+      if (!settled) {
+        latencyStats.counters.hedged += 1;
+        launch();
+      }
+    }, hedgeDelay);
+  });
+};
@@ -1,16 +1,10 @@
 import { Alert, Linking, PermissionsAndroid, Platform } from 'react-native';
 import { launchCamera } from 'react-native-image-picker';
+import { getCaptureOptions, recordCapture } from './imageCompression';
 
 export const openCamera = () => {
   return new Promise((resolve, reject) => {
-    const options = {
-      mediaType: 'photo',
-      includeBase64: false,
-      maxHeight: 2000,
-      maxWidth: 2000,
-      quality: 0.8,
-      saveToPhotos: false,
-    };
+    const options = getCaptureOptions();
 
     launchCamera(options, (response) => {
       if (response.didCancel) {
@@ -18,6 +12,7 @@ export const openCamera = () => {
       } else if (response.error) {
         reject(new Error(response.error));
       } else if (response.assets && response.assets[0]) {
+        recordCapture(response.assets[0], options);
         resolve(response.assets[0]);
       } else {
         reject(new Error('No image captured'));
@@ -46,6 +46,24 @@ export const APP_CONFIG = {
     MAX_HEIGHT: 2000,
     ALLOW_EDITING: false,
     INCLUDE_BASE64: false,
+    
+    // Stop-photo compression before upload (see src/utils/imageCompression.js)
+    // Tune with: python photo_compression_study.py <sample photos>
+    UPLOAD: {
+      ENABLED: true,
+      TARGET_BYTES: 200 * 1024, // Byte budget per stop photo
+      MAX_EDGE: 1280,
+      MIN_EDGE: 800,
+      QUALITY_STEPS: [0.8, 0.7, 0.6, 0.5, 0.4],
+      // Starting JPEG bytes-per-pixel estimates, refined from each capture
+      BYTES_PER_PIXEL: {
+        0.8: 0.22,
+        0.7: 0.17,
+        0.6: 0.14,
+        0.5: 0.12,
+        0.4: 0.1,
+      },
+    },
   },
 };
 
@@ -72,6 +90,47 @@ export const API_CONFIG = {
     ASSIGNMENT_PROGRESS: '/assignments/{assignmentId}/progress',
   },
   TIMEOUT: 30000, // Increased to 30 seconds for V2
+
+  // Per-endpoint timeouts learned from observed latency (see src/utils/adaptiveTimeout.js)
+  // Tune with: python straggler_harness.py
+  ADAPTIVE: {
+    ENABLED: true,
+    WINDOW: 100, // Recent latencies kept per endpoint
+    MIN_SAMPLES: 20, // Below this the endpoint's fixed timeout applies
+    TIMEOUT_PERCENTILE: 99,
+    TIMEOUT_MULTIPLIER: 3,
+    MIN_TIMEOUT: 2000,
+    // Idempotent GETs are retried once after a timeout, or with HEDGING send a second copy
+    // once the first is slower than this percentile
+    HEDGING: true,
+    HEDGE_PERCENTILE: 95,
+    MIN_HEDGE_DELAY: 50,
+  },
+
+  // Stop and pickup GETs: concurrent identical requests share one, answers kept briefly
+  RESPONSE_CACHE: {
+    TTL: 5000,
+    MAX_ENTRIES: 50,
+  },
+
+  // Route cached at login (see src/services/routeCache.js), refreshed in the
+  // background while driving. Tune with: python route_prefetch_benchmark.py
+  ROUTE_CACHE: {
+    REFRESH_EVERY_STOPS: 10,
+  },
+};
+
+// Request tracing (see src/utils/tracing.js)
+// OTLP/JSON endpoint for finished spans; null keeps them in memory only.
+// e.g. 'http://192.168.4.243:5000/v1/traces' with the stand-in backend's --trace-file
+const TRACE_EXPORT_URL = null;
+
+export const TRACING_CONFIG = {
+  // Release builds only pay for traceparent headers and span buffering when spans go somewhere
+  ENABLED: __DEV__ || !!TRACE_EXPORT_URL,
+  SERVICE_NAME: 'vehicle-app',
+  EXPORT_URL: TRACE_EXPORT_URL,
+  BATCH_SIZE: 50,
 };
 
 // Navigation Configuration
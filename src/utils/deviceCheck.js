@@ -0,0 +1,71 @@
+/**
+ * Device check
+ * In-app login probe for adb_fleet.py, started over adb
+ *
+ * Stock Android has no curl, so the fleet check asks the app itself:
+ *
+ *   adb shell am start -W -a android.intent.action.VIEW \
+ *     -d 'vehicleapp://device-check?id=<id>&backend=http://localhost:5000&vehicle=...&dl=...' com.vehicle_app
+ *
+ * The app posts the V2 login to the backend (through the adb reverse
+ * forward) and logs one line, read back with `adb logcat -s ReactNativeJS`:
+ *
+ *   VehicleAppCheck id=<id> status=200 ms=84
+ *
+ * status=0 means the request did not get an answer. Only localhost
+ * backends are accepted, so a link opened elsewhere cannot point the app
+ * at another server.
+ */
+
+import { API_CONFIG } from './config';
+
+export const DEVICE_CHECK_PREFIX = 'vehicleapp://device-check';
+export const DEVICE_CHECK_MARKER = 'VehicleAppCheck';
+
+const LOCAL_BACKEND = /^https?:\/\/(localhost|127\.0\.0\.1)(:\d+)?(\/|$)/;
+
+// URLSearchParams is only partly implemented in React Native
+const parseQuery = url => {
+  const query = url.split('?')[1] || '';
+  const params = {};
+  query.split('&').filter(Boolean).forEach(pair => {
+    const [key, value = ''] = pair.split('=');
+    params[decodeURIComponent(key)] = decodeURIComponent(value.replace(/\+/g, ' '));
+  });
+  return params;
+};
+
+export const isDeviceCheckUrl = url => typeof url === 'string' && url.startsWith(DEVICE_CHECK_PREFIX);
+
+/**
+ * Run the login probe a device-check link asks for and log the result
+ * @param {string} url - vehicleapp://device-check?id=&backend=&vehicle=&dl=
+ */
+export const runDeviceCheck = async url => {
+  const params = parseQuery(url);
+  const id = params.id || '-';
+  if (!LOCAL_BACKEND.test(params.backend || '')) {
+    console.log(`${DEVICE_CHECK_MARKER} id=${id} status=0 ms=0 error=backend-not-local`);
+    return;
+  }
+
+  const controller = new AbortController();
+  const timeoutId = setTimeout(() => controller.abort(), API_CONFIG.TIMEOUT);
+  const start = Date.now();
+  let status = 0;
+  try {
+    const response = await fetch(`${params.backend.replace(/\/$/, '')}/api${API_CONFIG.ENDPOINTS.LOGIN_V2}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ vehicle_number: params.vehicle, driving_license: params.dl }),
+      signal: controller.signal,
+    });
+    await response.text();
+    status = response.status;
+  } catch (error) {
+    // No answer: reported as status 0
+  } finally {
+    clearTimeout(timeoutId);
+  }
+  console.log(`${DEVICE_CHECK_MARKER} id=${id} status=${status} ms=${Date.now() - start}`);
+};
@@ -0,0 +1,84 @@
+/**
+ * Stop photo compression
+ * Chooses capture settings so each stop photo fits the upload byte budget
+ *
+ * react-native-image-picker downscales and re-encodes the JPEG natively when
+ * maxWidth/maxHeight/quality are set, so photos are compressed on the device
+ * before completeAssignmentStopWithPhoto sends them over mobile data.
+ */
+
+import { APP_CONFIG } from './config';
+
+const { CAMERA } = APP_CONFIG;
+const { UPLOAD } = CAMERA;
+
+// Phone cameras shoot 4:3, so an edge of N pixels covers about N * N * 0.75 pixels
+const ASPECT_RATIO = 3 / 4;
+
+// Weight given to the latest capture when refining the bytes-per-pixel estimate
+const ESTIMATE_WEIGHT = 0.3;
+
+// JPEG bytes per pixel for each quality step, refined from real captures
+const bytesPerPixel = { ...UPLOAD.BYTES_PER_PIXEL };
+
+const estimateBytes = (edge, quality) => Math.round(edge * edge * ASPECT_RATIO * bytesPerPixel[quality]);
+
+/**
+ * Pick the highest quality step whose budget-fitting edge is still at least MIN_EDGE
+ * @returns {{maxEdge: number, quality: number, estimatedBytes: number}}
+ */
+export const chooseUploadSettings = () => {
+  for (const quality of UPLOAD.QUALITY_STEPS) {
+    const fittingEdge = Math.floor(Math.sqrt(UPLOAD.TARGET_BYTES / (ASPECT_RATIO * bytesPerPixel[quality])));
+    const maxEdge = Math.min(UPLOAD.MAX_EDGE, fittingEdge);
+    if (maxEdge >= UPLOAD.MIN_EDGE) {
+      return { maxEdge, quality, estimatedBytes: estimateBytes(maxEdge, quality) };
+    }
+  }
+
+  // Budget is unreachable at MIN_EDGE: use the smallest settings we allow
+  const quality = UPLOAD.QUALITY_STEPS[UPLOAD.QUALITY_STEPS.length - 1];
+  return { maxEdge: UPLOAD.MIN_EDGE, quality, estimatedBytes: estimateBytes(UPLOAD.MIN_EDGE, quality) };
+};
+
+/**
+ * Options for launchCamera, compressed for upload unless UPLOAD.ENABLED is false
+ * @returns {Object} react-native-image-picker camera options
+ */
+export const getCaptureOptions = () => {
+  const options = {
+    mediaType: 'photo',
+    includeBase64: CAMERA.INCLUDE_BASE64,
+    maxHeight: CAMERA.MAX_HEIGHT,
+    maxWidth: CAMERA.MAX_WIDTH,
+    quality: CAMERA.QUALITY,
+    saveToPhotos: false,
+  };
+
+  if (!UPLOAD.ENABLED) {
+    return options;
+  }
+
+  const { maxEdge, quality } = chooseUploadSettings();
+  return { ...options, maxHeight: maxEdge, maxWidth: maxEdge, quality };
+};
+
+/**
+ * Refine the bytes-per-pixel estimate from a captured photo
+ * @param {Object} asset - Asset returned by launchCamera
+ * @param {Object} options - Options the photo was captured with
+ */
+export const recordCapture = (asset, options) => {
+  const previous = bytesPerPixel[options.quality];
+  if (!UPLOAD.ENABLED || previous === undefined || !asset?.fileSize || !asset.width || !asset.height) {
+    return;
+  }
+
+  const observed = asset.fileSize / (asset.width * asset.height);
+  const ratio = (previous * (1 - ESTIMATE_WEIGHT) + observed * ESTIMATE_WEIGHT) / previous;
+
+  // Scene content moves every quality step together, so scale them all
+  Object.keys(bytesPerPixel).forEach(quality => {
+    bytesPerPixel[quality] *= ratio;
+  });
+};
@@ -0,0 +1,107 @@
+/**
+ * Logger
+ * Leveled logging whose disabled levels cost (almost) nothing
+ *
+ * Messages are passed as a function returning the console arguments, so a
+ * disabled level never builds them:
+ *
+ *   logger.debug(() => ['📥 Parsed data:', JSON.stringify(data, null, 2)]);
+ *
+ * Debug logging is on in development builds and off in release builds,
+ * where only warnings and errors are printed. Optional sampled timing
+ * reports how long a fraction of calls take without timing every call.
+ */
+
+export const LOG_LEVELS = {
+  debug: 10,
+  info: 20,
+  warn: 30,
+  error: 40,
+  silent: 100,
+};
+
+const isDevBuild = typeof __DEV__ !== 'undefined' && __DEV__;
+
+const now = () => (typeof performance !== 'undefined' ? performance.now() : Date.now());
+
+// Returned when a call is not sampled, so timing costs one comparison
+const skipTimer = () => null;
+
+export const logger = {
+  level: isDevBuild ? LOG_LEVELS.debug : LOG_LEVELS.warn,
+  // Fraction of startTimer() calls that are measured (0 = timing off)
+  timingSampleRate: 0,
+  sink: console,
+
+  /**
+   * Change logging settings
+   * @param {Object} options - level ('debug'...'silent'), timingSampleRate (0-1), sink (console-like)
+   */
+  configure({ level, timingSampleRate, sink } = {}) {
+    if (level !== undefined) {
+      if (!(level in LOG_LEVELS)) {
+        throw new Error(`Unknown log level: ${level}`);
+      }
+      this.level = LOG_LEVELS[level];
+    }
+    if (timingSampleRate !== undefined) {
+      this.timingSampleRate = Math.min(Math.max(timingSampleRate, 0), 1);
+    }
+    if (sink !== undefined) {
+      this.sink = sink;
+    }
+  },
+
+  /**
+   * Whether a level is printed (to guard blocks that do extra work for a log line)
+   * @param {string} level - Level name
+   * @returns {boolean}
+   */
+  isEnabled(level) {
+    return LOG_LEVELS[level] >= this.level;
+  },
+
+  debug(buildArgs) {
+    if (this.level <= LOG_LEVELS.debug) {
+      this.sink.log(...buildArgs());
+    }
+  },
+
+  info(buildArgs) {
+    if (this.level <= LOG_LEVELS.info) {
+      this.sink.log(...buildArgs());
+    }
+  },
+
+  warn(buildArgs) {
+    if (this.level <= LOG_LEVELS.warn) {
+      this.sink.warn(...buildArgs());
+    }
+  },
+
+  error(buildArgs) {
+    if (this.level <= LOG_LEVELS.error) {
+      this.sink.error(...buildArgs());
+    }
+  },
+
+  /**
+   * Start timing an operation; only a sample of calls is measured
+   * @param {string} label - Name printed with the duration
+   * @returns {Function} Call when the operation ends; returns the duration in ms, or null if not sampled
+   */
+  startTimer(label) {
+    if (this.timingSampleRate === 0 || Math.random() >= this.timingSampleRate) {
+      return skipTimer;
+    }
+    const start = now();
+    return () => {
+      const elapsedMs = now() - start;
+      // Sampling is opted into explicitly, so it prints at any level but 'silent'
+      if (this.level < LOG_LEVELS.silent) {
+        this.sink.log(`⏱️ ${label}: ${elapsedMs.toFixed(1)}ms`);
+      }
+      return elapsedMs;
+    };
+  },
+};
@@ -0,0 +1,89 @@
+/**
+ * Request Cache
+ * Coalesces concurrent identical GETs and keeps their responses briefly
+ *
+ * Callers asking for a key that is already being fetched share that
+ * request instead of starting another; a response is then served from
+ * memory for `ttl` milliseconds, with the least recently used entries
+ * dropped beyond `maxEntries`. Writes invalidate the keys they change; a
+ * fetch that was in flight when its key was invalidated is handed to its
+ * callers but not cached. Failed fetches are never cached.
+ */
+
+export const createRequestCache = ({ ttl, maxEntries }) => ({
+  ttl,
+  maxEntries,
+  // key -> { value, expiresAt }, in least-recently-used order
+  entries: new Map(),
+  inFlight: new Map(),
+  // Bumped on invalidation so a response fetched before it is not stored
+  generations: new Map(),
+  stats: { hits: 0, misses: 0, coalesced: 0, invalidations: 0 },
+
+  /**
+   * Cached value of `key`, or the result of `load()` (shared with concurrent callers)
+   * @param {string} key - e.g. 'stop:12:3'
+   * @param {Function} load - Fetches the value; returns a promise
+   * @returns {Promise<*>}
+   */
+  get(key, load) {
+    const entry = this.entries.get(key);
+    if (entry && entry.expiresAt > Date.now()) {
+      this.stats.hits += 1;
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      return Promise.resolve(entry.value);
+    }
+    if (entry) {
+      this.entries.delete(key);
+    }
+
+    const pending = this.inFlight.get(key);
+    if (pending) {
+      this.stats.coalesced += 1;
+      return pending;
+    }
+
+    this.stats.misses += 1;
+    const generation = this.generations.get(key) || 0;
+    const request = load()
+      .then(value => {
+        if ((this.generations.get(key) || 0) === generation) {
+          this.set(key, value);
+        }
+        return value;
+      })
+      .finally(() => {
+        if (this.inFlight.get(key) === request) {
+          this.inFlight.delete(key);
+        }
+      });
+    this.inFlight.set(key, request);
+    return request;
+  },
+
+  set(key, value) {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.ttl });
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value);
+    }
+  },
+
+  /**
+   * Drop a key after a write that changes it; later callers fetch again
+   * @param {string} key - e.g. 'stop:12:3'
+   */
+  invalidate(key) {
+    this.stats.invalidations += 1;
+    this.entries.delete(key);
+    this.inFlight.delete(key);
+    this.generations.set(key, (this.generations.get(key) || 0) + 1);
+  },
+
+  takeStats() {
+    const stats = this.stats;
+    this.stats = { hits: 0, misses: 0, coalesced: 0, invalidations: 0 };
+    return stats;
+  },
+});
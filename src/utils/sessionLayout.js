@@ -0,0 +1,48 @@
+/**
+ * Session layout
+ * How a login session is split between static route data and a small cursor
+ *
+ * The route part (driver, vehicle, pickups...) is written once at login.
+ * The cursor holds what changes at every stop, so advancing to the next
+ * stop rewrites a few hundred bytes instead of the whole session.
+ */
+
+export const SESSION_LAYOUTS = {
+  // V1: the route part includes the full pickups array
+  driver: {
+    key: 'driverSession',
+    cursorKey: 'driverCursor',
+    cursorFields: ['currentPickupIndex', 'updatedAt'],
+  },
+  // V2 (normalized system)
+  assignment: {
+    key: 'assignmentSession',
+    cursorKey: 'assignmentCursor',
+    cursorFields: ['currentSequence', 'currentStop', 'updatedAt'],
+  },
+};
+
+/**
+ * Split a full session into its route part and its cursor
+ * @param {Object} layout - Entry of SESSION_LAYOUTS
+ * @param {Object} session - Full session object
+ * @returns {{route: Object, cursor: Object}}
+ */
+export const splitSession = (layout, session) => {
+  const route = { ...session };
+  const cursor = {};
+  layout.cursorFields.forEach(field => {
+    if (field in route) {
+      cursor[field] = route[field];
+      delete route[field];
+    }
+  });
+  return { route, cursor };
+};
+
+/**
+ * Rebuild the full session; the cursor wins over route fields of the same name,
+ * so sessions stored as one blob before the split still read correctly
+ * @returns {Object|null} Session, or null if there is no route part
+ */
+export const mergeSession = (route, cursor) => (route ? { ...route, ...(cursor || {}) } : null);
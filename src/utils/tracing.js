@@ -0,0 +1,239 @@
+/**
+ * Tracing
+ * W3C traceparent headers and client-side request spans for ApiService
+ *
+ * Each login starts a trace for the driver's route; every request made
+ * through tracedFetch becomes a client span in it, with child spans for
+ * time to first byte (send + server + network; fetch does not expose DNS or
+ * connect separately) and body download / parse. The request span ends at
+ * the response headers; a body read is a child span of its own, which may
+ * end after its parent. The backend sees the
+ * traceparent header and can attach its own spans to the same trace.
+ *
+ * Finished spans are buffered and, when an export URL is configured,
+ * posted as OTLP/JSON (an OpenTelemetry collector at :4318/v1/traces, or
+ * the stand-in backend's /v1/traces, which writes them to its trace file).
+ */
+
+const SPAN_KIND_INTERNAL = 1;
+const SPAN_KIND_CLIENT = 3;
+const STATUS_ERROR = 2;
+
+const randomHex = length => {
+  let hex = '';
+  for (let i = 0; i < length; i++) {
+    hex += Math.floor(Math.random() * 16).toString(16);
+  }
+  return hex;
+};
+
+// Wall-clock milliseconds with sub-millisecond precision where available
+const nowMs = () =>
+  typeof performance !== 'undefined' && performance.timeOrigin
+    ? performance.timeOrigin + performance.now()
+    : Date.now();
+
+const toUnixNano = ms => String(Math.round(ms * 1e6));
+
+const toAttribute = (key, value) => {
+  if (typeof value === 'number') {
+    return Number.isInteger(value)
+      ? { key, value: { intValue: String(value) } }
+      : { key, value: { doubleValue: value } };
+  }
+  if (typeof value === 'boolean') {
+    return { key, value: { boolValue: value } };
+  }
+  return { key, value: { stringValue: String(value) } };
+};
+
+// Span name for a request URL, with IDs folded so the same endpoint aggregates
+const spanName = (method, url) => {
+  const path = url.replace(/^https?:\/\/[^/]+/, '').split('?')[0];
+  return `${method} ${path.replace(/\/\d+(?=\/|$)/g, '/{id}')}`;
+};
+
+export const tracer = {
+  enabled: true,
+  serviceName: 'vehicle-app',
+  exportUrl: null,
+  batchSize: 50,
+  maxBuffered: 500,
+  route: null,
+  finished: [],
+  exporting: false,
+
+  /**
+   * Change tracing settings
+   * @param {Object} options - enabled, serviceName, exportUrl (null = keep spans in memory only), batchSize
+   */
+  configure({ enabled, serviceName, exportUrl, batchSize } = {}) {
+    if (enabled !== undefined) this.enabled = enabled;
+    if (serviceName !== undefined) this.serviceName = serviceName;
+    if (exportUrl !== undefined) this.exportUrl = exportUrl;
+    if (batchSize !== undefined) this.batchSize = batchSize;
+  },
+
+  /**
+   * Start a span; it joins the current route trace unless a parent is given
+   * @param {string} name - Span name
+   * @param {Object} options - parent span, kind, attributes, startMs (default: now)
+   * @returns {Object} Span (call tracer.endSpan when done)
+   */
+  startSpan(name, { parent = this.route, kind = SPAN_KIND_INTERNAL, attributes = {}, startMs = nowMs() } = {}) {
+    return {
+      traceId: parent ? parent.traceId : randomHex(32),
+      spanId: randomHex(16),
+      parentSpanId: parent ? parent.spanId : null,
+      name,
+      kind,
+      startMs,
+      endMs: null,
+      attributes: { ...attributes },
+      error: null,
+    };
+  },
+
+  endSpan(span, endMs = nowMs()) {
+    if (span.endMs === null) {
+      span.endMs = endMs;
+      this.record(span);
+    }
+  },
+
+  traceparent(span) {
+    return `00-${span.traceId}-${span.spanId}-01`;
+  },
+
+  /**
+   * Start the trace for one driver's route (at login)
+   * @param {Object} attributes - e.g. { 'login.version': 'v2' }
+   */
+  startRoute(attributes = {}) {
+    if (this.route) {
+      this.endRoute();
+    }
+    this.route = this.startSpan('driver route', { parent: null, attributes });
+    return this.route;
+  },
+
+  /**
+   * End the route trace (at logout) and export what is buffered
+   */
+  endRoute() {
+    if (this.route) {
+      const route = this.route;
+      this.route = null;
+      this.endSpan(route);
+    }
+    this.flush();
+  },
+
+  record(span) {
+    this.finished.push(span);
+    if (this.finished.length > this.maxBuffered) {
+      this.finished.splice(0, this.finished.length - this.maxBuffered);
+    }
+    if (this.exportUrl && this.finished.length >= this.batchSize) {
+      this.flush();
+    }
+  },
+
+  /**
+   * Post buffered spans as an OTLP/JSON export request; kept for later if it fails
+   */
+  async flush() {
+    if (!this.exportUrl || this.exporting || this.finished.length === 0) {
+      return;
+    }
+    const batch = this.finished;
+    this.finished = [];
+    this.exporting = true;
+    try {
+      const response = await fetch(this.exportUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(this.exportRequest(batch)),
+      });
+      if (!response.ok) {
+        throw new Error(`status ${response.status}`);
+      }
+    } catch (error) {
+      this.finished = batch.concat(this.finished).slice(-this.maxBuffered);
+    } finally {
+      this.exporting = false;
+    }
+  },
+
+  exportRequest(spans) {
+    return {
+      resourceSpans: [{
+        resource: { attributes: [toAttribute('service.name', this.serviceName)] },
+        scopeSpans: [{
+          scope: { name: 'vehicle-app-tracing' },
+          spans: spans.map(span => ({
+            traceId: span.traceId,
+            spanId: span.spanId,
+            ...(span.parentSpanId ? { parentSpanId: span.parentSpanId } : {}),
+            name: span.name,
+            kind: span.kind,
+            startTimeUnixNano: toUnixNano(span.startMs),
+            endTimeUnixNano: toUnixNano(span.endMs),
+            attributes: Object.entries(span.attributes).map(([key, value]) => toAttribute(key, value)),
+            ...(span.error ? { status: { code: STATUS_ERROR, message: span.error } } : {}),
+          })),
+        }],
+      }],
+    };
+  },
+};
+
+/**
+ * fetch() that sends a traceparent header and records the request as a client span
+ * Body spans are added when the caller reads response.text() / response.json()
+ * @param {string} url - Request URL
+ * @param {Object} options - fetch options
+ * @returns {Promise<Response>} The fetch response
+ */
+export const tracedFetch = async (url, options = {}) => {
+  if (!tracer.enabled) {
+    return fetch(url, options);
+  }
+
+  const method = (options.method || 'GET').toUpperCase();
+  const span = tracer.startSpan(spanName(method, url), {
+    kind: SPAN_KIND_CLIENT,
+    attributes: { 'http.method': method, 'url.full': url },
+  });
+  const headers = { ...(options.headers || {}), traceparent: tracer.traceparent(span) };
+
+  let response;
+  try {
+    response = await fetch(url, { ...options, headers });
+  } catch (error) {
+    span.error = error.name === 'AbortError' ? 'timeout' : error.message;
+    tracer.endSpan(span);
+    throw error;
+  }
+
+  const headersMs = nowMs();
+  tracer.endSpan(tracer.startSpan('ttfb', { parent: span, startMs: span.startMs }), headersMs);
+  span.attributes['http.status_code'] = response.status;
+  if (response.status >= 500) {
+    span.error = `HTTP ${response.status}`;
+  }
+  tracer.endSpan(span, headersMs);
+
+  // Time body reads when they happen; the request span is already recorded and is left as it is
+  const timeBody = (read, name) => async () => {
+    const body = tracer.startSpan(name, { parent: span });
+    try {
+      return await read();
+    } finally {
+      tracer.endSpan(body);
+    }
+  };
+  response.text = timeBody(response.text.bind(response), 'body download');
+  response.json = timeBody(response.json.bind(response), 'body download + parse');
+  return response;
+};
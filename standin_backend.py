@@ -0,0 +1,893 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Vehicle App backend
+
+Serves the endpoints the app and the verification scripts use, backed by
+synthetic routes instead of the database, so the load tools can run
+offline and deterministically:
+
+    python standin_backend.py --port 5000 --stops 79 --latency-ms 20 --error-rate 0.01
+
+--straggler-rate / --straggler-ms add a long stall to a random fraction
+of requests, independently per request, like a congested cell or a GC
+pause; a retried or hedged copy of a straggler usually comes back fast.
+
+Only the standard library is used. Other tools can also start it
+in-process with StandinBackend(...).start().
+
+Area scoping: any request may name its area with an X-Area header (or
+an ?area= query parameter). It then applies to that request only;
+without one the global area set by POST /api/areas/switch is used.
+Assignment IDs are partitioned by area: 1..assignments belong to the
+first area, the next block to the second, and so on.
+
+Resumable photo uploads: POST .../stops/<sequence>/photo-uploads opens
+an upload, POST /api/photo-uploads/<id>?offset=N appends a chunk (bytes
+that arrive before a disconnect are kept) and GET /api/photo-uploads/<id>
+reports the acknowledged offset. A completion that names the upload in
+photo_upload_id only succeeds once every byte has arrived. Uploads not
+touched for --upload-ttl-s are dropped (404, so the client starts over).
+
+Idempotent completions: a stop completion may carry an Idempotency-Key
+header (or, per entry of a batch, an idempotency_key field). The first
+request with a key completes the stop; duplicates, including ones that
+arrive while it is still running, get its stored result back (marked
+"replayed") instead of completing the stop again. Failed completions are
+not stored, so they can be retried under the same key.
+
+Tracing: with --trace-file every request is recorded as a server span
+(child of the caller's traceparent, with the injected latency and the
+handler as child spans), and spans the app posts to /v1/traces (OTLP/JSON)
+are appended to the same file. See vehicle_tracing.py.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from vehicle_tracing import SPAN_KIND_SERVER, TRACEPARENT_HEADER, SpanFileSink, Tracer
+
+AREAS = {
+    "delhi": {"table_name": "delhi_pickups", "city": "Delhi", "center": (28.6139, 77.2090)},
+    "gurugram": {"table_name": "gurugram_pickups", "city": "Gurugram", "center": (28.4595, 77.0266)},
+}
+AREA_NAMES = list(AREAS)
+
+# Per-request area, overriding the global /api/areas/switch setting
+AREA_HEADER = "X-Area"
+
+# Client-chosen key that makes a retried stop completion safe (same as vehicle_client.IDEMPOTENCY_HEADER)
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Completion results kept for replay; the oldest are dropped beyond this
+MAX_IDEMPOTENCY_KEYS = 100_000
+
+# Photo upload sessions untouched this long are dropped
+UPLOAD_TTL_S = 24 * 60 * 60
+
+# Numeric path segments, folded to {id} in span names
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+class SyntheticRoute:
+    """A generated assignment with `total_stops` stops around an area centre"""
+
+    def __init__(self, assignment_id, total_stops, area, seed):
+        rng = random.Random(f"{seed}:{assignment_id}")
+        lat, lon = AREAS[area]["center"]
+        self.assignment_id = assignment_id
+        self.area = area
+        self.driver_name = f"Driver {assignment_id}"
+        self.driver_dl = f"DL{assignment_id:013d}"
+        self.vehicle_no = f"{area[:2].upper()}01AB{assignment_id % 10000:04d}"
+        self.stops = [
+            {
+                "sequence": sequence,
+                "customer_id_snapshot": f"CUST{assignment_id:05d}{sequence:03d}",
+                "name_snapshot": f"Customer {assignment_id}-{sequence}",
+                "address_snapshot": f"H no {rng.randint(1, 999)}, Sector {rng.randint(1, 110)}, {AREAS[area]['city']}",
+                "contact_no": f"9{rng.randint(100000000, 999999999)}",
+                "latitude": round(lat + rng.uniform(-0.08, 0.08), 6),
+                "longitude": round(lon + rng.uniform(-0.08, 0.08), 6),
+                "status": "pending",
+            }
+            for sequence in range(1, total_stops + 1)
+        ]
+        self.trip_started_at = None
+        self.trip_ended_at = None
+        # Bumped on every stop change; stop_versions records the version each stop last changed at
+        self.version = 1
+        self.stop_versions = {}
+
+    @property
+    def total_stops(self):
+        return len(self.stops)
+
+    @property
+    def etag(self):
+        return f'"{self.assignment_id}-{self.version}"'
+
+    def touch(self, stop):
+        """Record a change to `stop` (call with the state lock held)"""
+        self.version += 1
+        self.stop_versions[stop["sequence"]] = self.version
+
+    def changed_since(self, version):
+        return [self.stops[sequence - 1] for sequence, changed in sorted(self.stop_versions.items())
+                if changed > version]
+
+    def stop(self, sequence):
+        if 1 <= sequence <= len(self.stops):
+            return self.stops[sequence - 1]
+        return None
+
+    def next_pending(self):
+        return next((s for s in self.stops if s["status"] != "completed"), None)
+
+    def completed_count(self):
+        return sum(1 for s in self.stops if s["status"] == "completed")
+
+
+class StandinState:
+    """Routes, area selection and fault-injection settings shared by all handlers"""
+
+    def __init__(self, stops=79, assignments=500, latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, seed=0, straggler_rate=0.0, straggler_ms=0.0, upload_ttl_s=UPLOAD_TTL_S):
+        self.stops = stops
+        self.assignments = assignments
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.straggler_rate = straggler_rate
+        self.straggler_ms = straggler_ms
+        self.upload_ttl_s = upload_ttl_s
+        self.seed = seed
+        self.current_area = "delhi"
+        self.lock = threading.Lock()
+        self.routes = {}
+        # upload ID -> upload, least recently touched first
+        self.uploads = OrderedDict()
+        # idempotency key -> {"stop": (assignment_id, sequence), "done": Event, "result": dict or None}
+        self.completions = OrderedDict()
+        self._rng = random.Random(seed)
+
+    @property
+    def total_assignments(self):
+        return self.assignments * len(AREA_NAMES)
+
+    def route(self, assignment_id):
+        with self.lock:
+            route = self.routes.get(assignment_id)
+            if route is None:
+                route = self.routes[assignment_id] = SyntheticRoute(
+                    assignment_id, self.stops, self.area_for(assignment_id), self.seed)
+            return route
+
+    def area_for(self, assignment_id):
+        return AREA_NAMES[(assignment_id - 1) // self.assignments]
+
+    def assignment_for(self, vehicle_number, area):
+        offset = AREA_NAMES.index(area) * self.assignments
+        return offset + zlib.crc32(vehicle_number.upper().encode()) % self.assignments + 1
+
+    def claim_completion(self, key, assignment_id, sequence, wait_s=60.0):
+        """
+        Claim an idempotency key for completing a stop
+
+        Returns (entry, None) when the caller should complete the stop and then
+        call settle_completion, (None, stored result) for a duplicate, or
+        (None, None) when the key was already used for a different stop.
+        A duplicate of a completion still in flight waits for it to finish.
+        """
+        stop = (assignment_id, sequence)
+        while True:
+            with self.lock:
+                entry = self.completions.get(key)
+                if entry is None:
+                    entry = self.completions[key] = {"stop": stop, "done": threading.Event(), "result": None}
+                    while len(self.completions) > MAX_IDEMPOTENCY_KEYS:
+                        self.completions.popitem(last=False)
+                    return entry, None
+            if entry["stop"] != stop:
+                return None, None
+            if not entry["done"].wait(wait_s):
+                raise TimeoutError("The original request with this idempotency key is still running")
+            if entry["result"] is not None:
+                return None, {**entry["result"], "replayed": True}
+            # The original failed and gave the key up; try to claim it again
+
+    def settle_completion(self, key, entry, result):
+        """Store a successful completion's result for duplicates, or release the key (result None)"""
+        with self.lock:
+            entry["result"] = result
+            if result is None and self.completions.get(key) is entry:
+                del self.completions[key]
+        entry["done"].set()
+
+    def add_upload(self, upload):
+        with self.lock:
+            self._expire_uploads()
+            upload["touched"] = time.monotonic()
+            self.uploads[upload["upload_id"]] = upload
+
+    def touch_upload(self, upload_id):
+        """The upload, marked as just used, or None if unknown or expired (call with the lock held)"""
+        self._expire_uploads()
+        upload = self.uploads.get(upload_id)
+        if upload is not None:
+            upload["touched"] = time.monotonic()
+            self.uploads.move_to_end(upload_id)
+        return upload
+
+    def _expire_uploads(self):
+        cutoff = time.monotonic() - self.upload_ttl_s
+        while self.uploads and next(iter(self.uploads.values()))["touched"] < cutoff:
+            self.uploads.popitem(last=False)
+
+    def draw_fault(self):
+        """Return (delay_seconds, inject_error) for one request"""
+        with self.lock:
+            delay = self.latency_ms
+            if self.jitter_ms:
+                delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms))
+            if self.straggler_rate > 0 and self._rng.random() < self.straggler_rate:
+                delay += self.straggler_ms
+            inject_error = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay / 1000.0, inject_error
+
+
+def parse_multipart(body, content_type):
+    """Split a multipart/form-data body into (fields, {name: file_size})"""
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        return {}, {}
+    boundary = b"--" + match.group(1).encode()
+    fields, files = {}, {}
+    for part in body.split(boundary)[1:]:
+        if part.startswith(b"--"):
+            break
+        head, _, value = part.strip(b"\r\n").partition(b"\r\n\r\n")
+        disposition = head.decode("utf-8", "replace")
+        name = re.search(r'name="([^"]*)"', disposition)
+        if not name:
+            continue
+        if "filename=" in disposition:
+            files[name.group(1)] = len(value)
+        else:
+            fields[name.group(1)] = value.decode("utf-8", "replace")
+    return fields, files
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Request router for the stand-in API"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "VehicleStandin/1.0"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # responses stall on the client's delayed ACK (~40 ms each)
+    disable_nagle_algorithm = True
+
+    # (method, path regex, handler) - first match wins
+    ROUTES = [
+        ("GET", r"^/$", "handle_root"),
+        ("GET", r"^/api/pickup/areas$", "handle_areas"),
+        ("GET", r"^/api/areas/current$", "handle_current_area"),
+        ("POST", r"^/api/areas/switch$", "handle_switch_area"),
+        ("GET", r"^/api/driver/authenticate(/v2)?$", "handle_method_not_allowed"),
+        ("POST", r"^/api/driver/authenticate$", "handle_authenticate_v1"),
+        ("POST", r"^/api/driver/authenticate/v2$", "handle_authenticate_v2"),
+        ("GET", r"^/api/driver/(?P<driver_id>\d+)/pickups$", "handle_driver_pickups"),
+        ("GET", r"^/api/driver/(?P<driver_id>\d+)/pickup/(?P<index>\d+)$", "handle_driver_pickup"),
+        ("POST", r"^/api/driver/(?P<driver_id>\d+)/pickup/(?P<index>\d+)/update$", "handle_driver_pickup_update"),
+        ("GET", r"^/api/assignments/(?P<assignment_id>\d+)/stops$", "handle_stops"),
+        ("GET", r"^/api/assignments/(?P<assignment_id>\d+)/stops/(?P<sequence>\d+)$", "handle_stop"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/stops/(?P<sequence>\d+)/start$", "handle_stop_start"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/stops/(?P<sequence>\d+)/complete$", "handle_stop_complete"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/stops/complete-batch$", "handle_stop_complete_batch"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/stops/(?P<sequence>\d+)/photo-uploads$",
+         "handle_photo_upload_create"),
+        ("GET", r"^/api/photo-uploads/(?P<upload_id>[0-9a-f]+)$", "handle_photo_upload_status"),
+        ("POST", r"^/api/photo-uploads/(?P<upload_id>[0-9a-f]+)$", "handle_photo_upload_chunk"),
+        ("GET", r"^/api/assignments/(?P<assignment_id>\d+)/progress$", "handle_progress"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/start-trip$", "handle_start_trip"),
+        ("POST", r"^/api/assignments/(?P<assignment_id>\d+)/end-trip$", "handle_end_trip"),
+        ("POST", r"^/v1/traces$", "handle_otlp_traces"),
+    ]
+    _COMPILED_ROUTES = [(method, re.compile(pattern), handler) for method, pattern, handler in ROUTES]
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---------------------------------------------------------------- plumbing
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up first (its timeout, a hedged copy that lost, a dropped link)
+            pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
+
+    def _dispatch(self, method):
+        path, _, query = self.path.partition("?")
+        self.query = {key: values[-1] for key, values in parse_qs(query).items()}
+        self.body = self._read_body()
+        tracer = self.server.tracer
+        if tracer is None or path == "/v1/traces":
+            return self._handle(method, path)
+
+        span = tracer.start_span(f"{method} {_ID_SEGMENT.sub('/{id}', path)}",
+                                 traceparent=self.headers.get(TRACEPARENT_HEADER), kind=SPAN_KIND_SERVER,
+                                 **{"http.method": method, "url.path": path})
+        self.response_status = None
+        try:
+            self._handle(method, path, span)
+        finally:
+            span.set_attribute("http.status_code", self.response_status or 0)
+            if (self.response_status or 500) >= 500:
+                span.set_error(f"HTTP {self.response_status}")
+            span.end()
+
+    def _handle(self, method, path, span=None):
+        fault_start = time.time_ns()
+        delay, inject_error = self.state.draw_fault()
+        if delay:
+            time.sleep(delay)
+            if span is not None:
+                span.child("injected latency", fault_start, time.time_ns())
+        if inject_error:
+            return self.send_json(500, {"error": "Injected failure"})
+
+        handler_start = time.time_ns()
+        try:
+            return self._route(method, path)
+        finally:
+            if span is not None:
+                span.child("handler", handler_start, time.time_ns())
+
+    def _route(self, method, path):
+        path_matched = False
+        for route_method, pattern, handler in self._COMPILED_ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method == method:
+                try:
+                    return getattr(self, handler)(**match.groupdict())
+                except (BrokenPipeError, ConnectionResetError):
+                    raise
+                except Exception as e:
+                    return self.send_json(500, {"error": str(e)})
+        if path_matched:
+            return self.handle_method_not_allowed()
+        self.send_json(404, {"error": "Not found"})
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            return self._read_chunked_body()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _read_chunked_body(self):
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Skip trailers up to the terminating blank line
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def json_body(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            return {}
+
+    def form_body(self):
+        """Fields and file sizes from either a JSON or a multipart body"""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            return parse_multipart(self.body, content_type)
+        return self.json_body(), {}
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route_or_404(self, assignment_id):
+        assignment_id = int(assignment_id)
+        if not 1 <= assignment_id <= self.state.total_assignments:
+            self.send_json(404, {"error": f"Assignment {assignment_id} not found"})
+            return None
+        return self.state.route(assignment_id)
+
+    # ---------------------------------------------------------------- handlers
+
+    def handle_method_not_allowed(self, **_):
+        self.send_json(405, {"error": "Method not allowed"})
+
+    def handle_root(self):
+        self.send_json(200, {"status": "ok", "message": "Vehicle App stand-in backend", "time": _now()})
+
+    def handle_areas(self):
+        self.send_json(200, {"success": True, "areas": list(AREAS)})
+
+    def request_area(self):
+        """Area named by the request (header, then query), else the global one; None if unknown"""
+        area = (self.headers.get(AREA_HEADER) or self.query.get("area") or self.state.current_area).lower()
+        if area not in AREAS:
+            self.send_json(400, {"success": False, "error": f"Unknown area '{area}'"})
+            return None
+        return area
+
+    def handle_current_area(self):
+        area = self.request_area()
+        if area is None:
+            return
+        config = {k: v for k, v in AREAS[area].items() if k != "center"}
+        self.send_json(200, {"success": True, "current_area": area, "config": config})
+
+    def handle_switch_area(self):
+        area = str(self.json_body().get("area", "")).lower()
+        if area not in AREAS:
+            return self.send_json(400, {"success": False, "error": f"Unknown area '{area}'"})
+        self.state.current_area = area
+        self.send_json(200, {"success": True, "current_area": area})
+
+    def _authenticate(self, vehicle_number, licence):
+        if not vehicle_number or not licence:
+            self.send_json(400, {"error": "vehicle_number and driving_license are required"})
+            return None
+        if vehicle_number.upper().startswith("INVALID"):
+            self.send_json(404, {"error": "No active assignment found for this vehicle and driver"})
+            return None
+        area = self.request_area()
+        if area is None:
+            return None
+        return self.state.route(self.state.assignment_for(vehicle_number, area))
+
+    def handle_authenticate_v1(self):
+        data = self.json_body()
+        route = self._authenticate(data.get("vehicle_number"), data.get("dl_number"))
+        if route is None:
+            return
+        self.send_json(200, {
+            "driver_id": route.assignment_id,
+            "assignment_id": route.assignment_id,
+            "vehicle_number": data["vehicle_number"],
+            "driver_name": route.driver_name,
+            "area": route.area,
+            "total_pickups": route.total_stops,
+            "pickups": [self._as_pickup(stop) for stop in route.stops],
+            **self._start_trip_if_requested(route, data),
+        })
+
+    def handle_authenticate_v2(self):
+        data = self.json_body()
+        route = self._authenticate(data.get("vehicle_number"), data.get("driving_license"))
+        if route is None:
+            return
+        current = route.next_pending() or route.stops[-1]
+        self.send_json(200, {
+            "assignment_id": route.assignment_id,
+            "driver_dl": data["driving_license"],
+            "vehicle_no": data["vehicle_number"],
+            "driver_name": route.driver_name,
+            "area": route.area,
+            "route_date": date.today().isoformat(),
+            "total_stops": route.total_stops,
+            "current_sequence": current["sequence"],
+            "current_stop": current,
+            **self._start_trip_if_requested(route, data),
+        })
+
+    @staticmethod
+    def _start_trip_if_requested(route, data):
+        """Start trip timing as part of login when the client sends start_trip"""
+        if not data.get("start_trip"):
+            return {}
+        route.trip_started_at = route.trip_started_at or _now()
+        return {"trip_started_at": route.trip_started_at}
+
+    @staticmethod
+    def _as_pickup(stop):
+        return {
+            "customer_name": stop["name_snapshot"],
+            "address": stop["address_snapshot"],
+            "latitude": stop["latitude"],
+            "longitude": stop["longitude"],
+            "next_pickup_date": None,
+        }
+
+    def handle_driver_pickups(self, driver_id):
+        route = self._route_or_404(driver_id)
+        if route:
+            self.send_json(200, {"pickups": [self._as_pickup(stop) for stop in route.stops]})
+
+    def handle_driver_pickup(self, driver_id, index):
+        route = self._route_or_404(driver_id)
+        if route is None:
+            return
+        stop = route.stop(int(index) + 1)
+        if stop is None:
+            return self.send_json(404, {"error": "Pickup not found"})
+        self.send_json(200, self._as_pickup(stop))
+
+    def handle_driver_pickup_update(self, driver_id, index):
+        route = self._route_or_404(driver_id)
+        if route is None:
+            return
+        stop = route.stop(int(index) + 1)
+        if stop is None:
+            return self.send_json(404, {"error": "Pickup not found"})
+        with self.state.lock:
+            stop["status"] = self.json_body().get("status", "completed")
+            route.touch(stop)
+        self.send_json(200, {"success": True})
+
+    def handle_stops(self, assignment_id):
+        """Every stop of the route, or only those changed since ?since=<version>"""
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        with self.state.lock:
+            etag, version = route.etag, route.version
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            since = self.query.get("since", "")
+            delta = since.isdigit() and int(since) <= version
+            stops = [dict(stop) for stop in (route.changed_since(int(since)) if delta else route.stops)]
+        self.send_json(200, {
+            "success": True,
+            "assignment_id": route.assignment_id,
+            "total_stops": route.total_stops,
+            "version": version,
+            "delta": delta,
+            "stops": stops,
+        }, headers={"ETag": etag})
+
+    def handle_stop(self, assignment_id, sequence):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        stop = route.stop(int(sequence))
+        if stop is None:
+            return self.send_json(404, {"error": f"Stop {sequence} not found"})
+        self.send_json(200, {
+            "success": True,
+            "stop": stop,
+            "sequence": stop["sequence"],
+            "total_stops": route.total_stops,
+            "isLast": stop["sequence"] >= route.total_stops,
+        })
+
+    def handle_stop_start(self, assignment_id, sequence):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        stop = route.stop(int(sequence))
+        if stop is None:
+            return self.send_json(404, {"error": f"Stop {sequence} not found"})
+        with self.state.lock:
+            stop["pickup_started_at"] = _now()
+            route.touch(stop)
+        self.send_json(200, {"success": True, "pickup_started_at": stop["pickup_started_at"]})
+
+    def handle_stop_complete(self, assignment_id, sequence):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        stop = route.stop(int(sequence))
+        if stop is None:
+            return self.send_json(404, {"error": f"Stop {sequence} not found"})
+        fields, files = self.form_body()
+        key = self.headers.get(IDEMPOTENCY_HEADER) or fields.get("idempotency_key")
+        result, error = self._complete_once(key, route, stop, fields, files.get("photo", 0))
+        if error:
+            return self.send_json(*error)
+        next_stop = route.next_pending()
+        self.send_json(200, {
+            "success": True,
+            "completed_sequence": stop["sequence"],
+            "next_sequence": next_stop["sequence"] if next_stop else None,
+            **result,
+        }, headers={"Idempotent-Replayed": "true"} if result.get("replayed") else None)
+
+    def _complete_once(self, key, route, stop, fields, photo_bytes):
+        """
+        Complete `stop` unless a completion with the same idempotency key already did
+
+        Returns (result, None), where result has completed_at and photo_bytes
+        (and replayed=True for a duplicate), or (None, (status, error payload)).
+        """
+        entry = None
+        if key:
+            entry, stored = self.state.claim_completion(key, route.assignment_id, stop["sequence"])
+            if stored is not None:
+                return stored, None
+            if entry is None:
+                return None, (422, {"error": "Idempotency key was already used for a different stop"})
+
+        result = None
+        try:
+            if fields.get("photo_upload_id"):
+                photo_bytes, error = self._commit_photo_upload(fields["photo_upload_id"], route, stop)
+                if error:
+                    return None, (409, error)
+            completed_at = self._complete_stop(route, stop, fields.get("weight"), fields.get("completed_at"))
+            result = {"completed_at": completed_at, "photo_bytes": photo_bytes}
+            return result, None
+        finally:
+            if entry is not None:
+                self.state.settle_completion(key, entry, result)
+
+    def _complete_stop(self, route, stop, weight, completed_at=None):
+        # The client's completed_at is when the driver completed the stop, possibly offline long before
+        with self.state.lock:
+            stop["status"] = "completed"
+            stop["completed_at"] = completed_at or _now()
+            if weight:
+                stop["weight"] = weight
+            route.touch(stop)
+            return stop["completed_at"]
+
+    def handle_stop_complete_batch(self, assignment_id):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        fields, files = self.form_body()
+        try:
+            completions = fields.get("completions") or []
+            if isinstance(completions, str):
+                completions = json.loads(completions)
+        except ValueError:
+            return self.send_json(400, {"error": "completions must be a JSON array"})
+
+        results = []
+        for completion in completions:
+            stop = route.stop(int(completion.get("sequence", 0)))
+            if stop is None:
+                results.append({"sequence": completion.get("sequence"), "success": False,
+                                "error": "Stop not found"})
+                continue
+            result, error = self._complete_once(completion.get("idempotency_key"), route, stop, completion,
+                                                files.get(completion.get("photo_field"), 0))
+            if error:
+                results.append({"sequence": stop["sequence"], "success": False, **error[1]})
+                continue
+            results.append({"sequence": stop["sequence"], "success": True, **result})
+        self.send_json(200, {"success": all(r["success"] for r in results), "results": results})
+
+    def handle_photo_upload_create(self, assignment_id, sequence):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        stop = route.stop(int(sequence))
+        if stop is None:
+            return self.send_json(404, {"error": f"Stop {sequence} not found"})
+        try:
+            size = int(self.json_body().get("size"))
+        except (TypeError, ValueError):
+            size = -1
+        if size <= 0:
+            return self.send_json(400, {"error": "size (bytes) is required"})
+        upload = {
+            "upload_id": uuid.uuid4().hex,
+            "assignment_id": route.assignment_id,
+            "sequence": stop["sequence"],
+            "size": size,
+            "offset": 0,
+            "committed": False,
+        }
+        self.state.add_upload(upload)
+        self.send_json(201, self._upload_status(upload))
+
+    def handle_photo_upload_status(self, upload_id):
+        with self.state.lock:
+            upload = self.state.touch_upload(upload_id)
+        if upload is None:
+            return self.send_json(404, {"error": "Upload not found"})
+        self.send_json(200, self._upload_status(upload))
+
+    def handle_photo_upload_chunk(self, upload_id):
+        with self.state.lock:
+            upload = self.state.touch_upload(upload_id)
+        if upload is None:
+            return self.send_json(404, {"error": "Upload not found"})
+        try:
+            offset = int(self.query.get("offset", ""))
+        except ValueError:
+            return self.send_json(400, {"error": "offset query parameter is required"})
+        with self.state.lock:
+            # A retried chunk whose first attempt partly arrived: the client must resume from here
+            if offset != upload["offset"] or upload["committed"]:
+                return self.send_json(409, {"error": "Offset mismatch", **self._upload_status(upload)})
+            if offset + len(self.body) > upload["size"]:
+                return self.send_json(413, {"error": "Chunk runs past the declared size", **self._upload_status(upload)})
+            # Bytes that made it before a disconnect count too (Content-Length framing)
+            upload["offset"] += len(self.body)
+        self.send_json(200, self._upload_status(upload))
+
+    def _upload_status(self, upload):
+        return {
+            "success": True,
+            "upload_id": upload["upload_id"],
+            "offset": upload["offset"],
+            "size": upload["size"],
+            "complete": upload["offset"] == upload["size"],
+        }
+
+    def _commit_photo_upload(self, upload_id, route, stop):
+        """(photo_bytes, None) once the upload for this stop is complete, else (0, error payload)"""
+        with self.state.lock:
+            upload = self.state.touch_upload(upload_id)
+            if upload is None or (upload["assignment_id"], upload["sequence"]) != (route.assignment_id,
+                                                                                  stop["sequence"]):
+                return 0, {"error": "Unknown photo upload for this stop"}
+            if upload["offset"] < upload["size"]:
+                return 0, {"error": "Photo upload incomplete", "offset": upload["offset"],
+                           "size": upload["size"]}
+            upload["committed"] = True
+            return upload["size"], None
+
+    def handle_progress(self, assignment_id):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        next_stop = route.next_pending()
+        self.send_json(200, {
+            "success": True,
+            "assignment_id": route.assignment_id,
+            "total_stops": route.total_stops,
+            "completed_stops": route.completed_count(),
+            "next_sequence": next_stop["sequence"] if next_stop else None,
+            "next_stop": next_stop,
+        })
+
+    def handle_start_trip(self, assignment_id):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        route.trip_started_at = route.trip_started_at or _now()
+        self.send_json(200, {"success": True, "trip_started_at": route.trip_started_at})
+
+    def handle_end_trip(self, assignment_id):
+        route = self._route_or_404(assignment_id)
+        if route is None:
+            return
+        route.trip_ended_at = _now()
+        self.send_json(200, {"success": True, "trip_ended_at": route.trip_ended_at})
+
+    def handle_otlp_traces(self):
+        """OTLP/HTTP JSON export from the app: appended to the trace file as-is"""
+        if self.server.tracer is None:
+            return self.send_json(404, {"error": "Tracing is off (start with --trace-file)"})
+        try:
+            export = json.loads(self.body or b"{}")
+        except ValueError:
+            return self.send_json(400, {"error": "Expected an OTLP/JSON ExportTraceServiceRequest"})
+        self.server.tracer.sink.write(export)
+        self.send_json(200, {"partialSuccess": {}})
+
+
+class StandinBackend:
+    """Run the stand-in server on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, verbose=False, trace_file=None, **state_options):
+        self.server = ThreadingHTTPServer((host, port), StandinHandler)
+        self.server.daemon_threads = True
+        self.server.state = StandinState(**state_options)
+        self.server.verbose = verbose
+        # Server spans are written as they finish so a timeline can be read while running
+        self.server.tracer = Tracer("standin-backend", SpanFileSink(trace_file), batch_size=1) if trace_file else None
+        self._thread = None
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Vehicle App backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--stops", type=int, default=79, help="stops per synthetic route")
+    parser.add_argument("--assignments", type=int, default=500, help="synthetic assignments per area")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    parser.add_argument("--straggler-rate", type=float, default=0.0, help="fraction of requests that stall")
+    parser.add_argument("--straggler-ms", type=float, default=5000.0, help="extra latency of a stalled request")
+    parser.add_argument("--seed", type=int, default=0, help="seed for routes and fault injection")
+    parser.add_argument("--upload-ttl-s", type=float, default=UPLOAD_TTL_S,
+                        help="seconds an untouched photo upload session is kept")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--trace-file", default=None,
+                        help="record server spans (and app spans posted to /v1/traces) in this OTLP/JSON lines file")
+    args = parser.parse_args()
+
+    backend = StandinBackend(
+        args.host, args.port, verbose=args.verbose, trace_file=args.trace_file,
+        stops=args.stops, assignments=args.assignments,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed,
+        straggler_rate=args.straggler_rate, straggler_ms=args.straggler_ms, upload_ttl_s=args.upload_ttl_s)
+
+    print("🧪 Vehicle App Stand-in Backend")
+    print("=" * 60)
+    print(f"Serving on {backend.base_url} ({len(AREAS)} areas x {args.assignments} assignments x {args.stops} stops)")
+    print(f"Latency {args.latency_ms}±{args.jitter_ms} ms, error rate {args.error_rate:.1%}, seed {args.seed}")
+    if args.straggler_rate:
+        print(f"Stragglers: {args.straggler_rate:.1%} of requests stall {args.straggler_ms:g} ms")
+    if args.trace_file:
+        print(f"Tracing to {args.trace_file}")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+    finally:
+        backend.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Tail latency of stop/progress GETs with stragglers: fixed vs adaptive
+timeouts vs hedged requests
+
+Mirrors the request policy in src/utils/adaptiveTimeout.js: each endpoint
+keeps a window of recent latencies, its timeout becomes 3x the p99
+(between --min-timeout-ms and the fixed per-endpoint timeout), a GET
+that timed out is sent once more, and a hedged GET sends a second copy
+once the first is slower than the p95.
+Drivers walk their route GETting the stop and progress endpoints against
+a backend where a fraction of requests stall:
+
+    python standin_backend.py --port 5000 --latency-ms 20 --jitter-ms 5 --straggler-rate 0.03 &
+    python straggler_harness.py
+
+or with the stand-in started here:
+
+    python straggler_harness.py --in-process --straggler-rate 0.03 --straggler-ms 5000
+
+Modes:
+  fixed     today's fixed timeouts (15 s), no retry
+  adaptive  learned timeouts, one immediate retry after a timeout
+  hedged    learned timeouts plus a hedged copy after the p95
+
+Hedging only helps while stragglers are rarer than 1 - p95 (5%); past
+that the p95 itself is a straggler.
+
+Each mode is saved as its own run in the results store (tool
+"straggler_harness <mode>"), one sample per measured GET as the driver
+saw it, retries and hedges included.
+"""
+
+import argparse
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+
+import requests
+
+from results_store import ResultsStore, add_results_argument, open_run, resolve_results_db
+from standin_backend import StandinBackend
+from vehicle_client import VehicleClient, add_target_argument, resolve_target, timeout_for
+from vehicle_load import classify_exception, percentile
+
+MODES = ("fixed", "adaptive", "hedged")
+
+CONNECT_TIMEOUT_S = 5
+
+
+class LatencyWindow:
+    """The last `size` latencies of one endpoint, kept sorted for percentiles"""
+
+    def __init__(self, size):
+        self.size = size
+        self.recent = []
+        self.sorted = []
+
+    def record(self, seconds):
+        self.recent.append(seconds)
+        bisect.insort(self.sorted, seconds)
+        if len(self.recent) > self.size:
+            self.sorted.pop(bisect.bisect_left(self.sorted, self.recent.pop(0)))
+
+    def __len__(self):
+        return len(self.recent)
+
+    def percentile(self, p):
+        return percentile(self.sorted, p)
+
+
+class AdaptivePolicy:
+    """Per-endpoint timeouts and hedge delays from observed latency (one per device)"""
+
+    def __init__(self, window=100, min_samples=20, timeout_percentile=99, timeout_multiplier=3.0,
+                 min_timeout_s=2.0, hedge_percentile=95, min_hedge_delay_s=0.05):
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout_s = min_timeout_s
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay_s = min_hedge_delay_s
+        self.windows = {}
+        # A hedged request and its copy finish on different threads
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.windows.setdefault(endpoint, LatencyWindow(self.window)).record(seconds)
+
+    def _percentile(self, endpoint, p):
+        with self.lock:
+            window = self.windows.get(endpoint)
+            if window is None or len(window) < self.min_samples:
+                return None
+            return window.percentile(p)
+
+    def timeout(self, endpoint, fixed_timeout_s):
+        p = self._percentile(endpoint, self.timeout_percentile)
+        if p is None:
+            return fixed_timeout_s
+        return min(fixed_timeout_s, max(self.min_timeout_s, p * self.timeout_multiplier))
+
+    def hedge_delay(self, endpoint):
+        p = self._percentile(endpoint, self.hedge_percentile)
+        return None if p is None else max(self.min_hedge_delay_s, p)
+
+
+class PolicyClient:
+    """GETs an endpoint under one of the MODES, counting the extra requests it costs"""
+
+    def __init__(self, client, mode, policy):
+        self.client = client
+        self.mode = mode
+        self.policy = policy
+        # Hedged copies that lose keep running here; they cannot be aborted mid-read
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.requests = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _attempt(self, endpoint, path):
+        fixed_timeout_s = timeout_for(path)[1]
+        limit = fixed_timeout_s if self.mode == "fixed" else self.policy.timeout(endpoint, fixed_timeout_s)
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            response = self.client.get(path, timeout=(CONNECT_TIMEOUT_S, limit))
+        except requests.exceptions.Timeout:
+            self.timeouts += 1
+            # At least this slow; keeps the timeout able to grow back
+            self.policy.record(endpoint, limit)
+            raise
+        self.policy.record(endpoint, time.perf_counter() - start)
+        return response
+
+    def _hedged(self, endpoint, path):
+        delay = self.policy.hedge_delay(endpoint)
+        if delay is None:
+            return self._attempt(endpoint, path)
+        hedge = None
+        futures = [self.pool.submit(self._attempt, endpoint, path)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            self.hedges += 1
+            hedge = self.pool.submit(self._attempt, endpoint, path)
+            futures.append(hedge)
+        errors = []
+        for future in as_completed(futures):
+            if future.exception() is None:
+                self.hedge_wins += future is hedge
+                return future.result()
+            errors.append(future.exception())
+        raise errors[0]
+
+    def get(self, endpoint, path):
+        if self.mode == "hedged":
+            return self._hedged(endpoint, path)
+        try:
+            return self._attempt(endpoint, path)
+        except requests.exceptions.Timeout:
+            if self.mode == "fixed":
+                raise
+            return self._attempt(endpoint, path)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def run_driver(base_url, mode, assignment_id, args, sink=None):
+    policy = AdaptivePolicy(min_timeout_s=args.min_timeout_ms / 1000.0)
+    latencies, failures = [], 0
+    with VehicleClient(base_url, pool_size=4) as client:
+        policy_client = PolicyClient(client, mode, policy)
+        for i in range(args.warmup + args.requests):
+            sequence = i // 2 % args.stops + 1
+            endpoint, path = (("stop", f"/api/assignments/{assignment_id}/stops/{sequence}") if i % 2 == 0
+                              else ("progress", f"/api/assignments/{assignment_id}/progress"))
+            if i == args.warmup:
+                policy_client.requests = policy_client.timeouts = 0
+                policy_client.hedges = policy_client.hedge_wins = 0
+            start = time.perf_counter()
+            try:
+                policy_client.get(endpoint, path).raise_for_status()
+                error_class = "ok"
+            except requests.exceptions.RequestException as e:
+                error_class = classify_exception(e)
+            if i >= args.warmup:
+                latency_ms = (time.perf_counter() - start) * 1000.0
+                latencies.append(latency_ms)
+                failures += error_class != "ok"
+                if sink is not None:
+                    sink.record(endpoint, latency_ms, error_class)
+        policy_client.close()
+    return {"latencies": latencies, "failures": failures, "requests": policy_client.requests,
+            "timeouts": policy_client.timeouts, "hedges": policy_client.hedges,
+            "hedge_wins": policy_client.hedge_wins}
+
+
+def run_mode(base_url, mode, args, sink=None):
+    with ThreadPoolExecutor(max_workers=args.drivers) as pool:
+        results = list(pool.map(lambda i: run_driver(base_url, mode, args.first_assignment + i, args, sink),
+                                range(args.drivers)))
+    latencies = sorted(ms for r in results for ms in r["latencies"])
+    calls = len(latencies)
+    return {
+        "mode": mode,
+        "calls": calls,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "failures": sum(r["failures"] for r in results),
+        "extra_requests": sum(r["requests"] for r in results) - calls,
+        "timeouts": sum(r["timeouts"] for r in results),
+        "hedges": sum(r["hedges"] for r in results),
+        "hedge_wins": sum(r["hedge_wins"] for r in results),
+    }
+
+
+def print_straggler_report(results):
+    print("\n" + "=" * 60)
+    print("🐢 Stop/Progress GET Latency with Stragglers")
+    print("=" * 60)
+    print(f"{'mode':<9} {'p50':>8} {'p95':>8} {'p99':>9} {'max':>9} {'failed':>7} {'extra req':>10} {'timeouts':>9}")
+    for r in results:
+        extra = r["extra_requests"] / r["calls"] if r["calls"] else 0.0
+        print(f"{r['mode']:<9} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>7.1f}ms "
+              f"{r['max_ms']:>7.0f}ms {r['failures']:>7} {extra:>9.1%} {r['timeouts']:>9}")
+        if r["hedges"]:
+            print(f"{'':<9} {r['hedges']} hedged, {r['hedge_wins']} won by the hedge")
+
+    by_mode = {r["mode"]: r for r in results}
+    if "fixed" in by_mode and len(by_mode) > 1:
+        best = min((r for r in results if r["mode"] != "fixed"), key=lambda r: r["p99_ms"])
+        fixed_p99, best_p99 = round(by_mode["fixed"]["p99_ms"]), round(best["p99_ms"])
+        if best_p99 < fixed_p99:
+            print(f"\n✅ {best['mode'].capitalize()} requests cut p99 from {fixed_p99} ms to {best_p99} ms")
+        elif best_p99 == fixed_p99:
+            print(f"\n⚠️ No gain: p99 stayed at {fixed_p99} ms with {best['mode']} requests")
+        else:
+            print(f"\n❌ No mode beat fixed timeouts: p99 went from {fixed_p99} ms to {best_p99} ms "
+                  f"at best ({best['mode']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tail latency with adaptive timeouts and hedged GETs")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--in-process", action="store_true", help="start a stand-in backend with stragglers here")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="(in-process) added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="(in-process) standard deviation of it")
+    parser.add_argument("--straggler-rate", type=float, default=0.03, help="(in-process) fraction that stalls")
+    parser.add_argument("--straggler-ms", type=float, default=5000.0, help="(in-process) length of a stall")
+    parser.add_argument("--drivers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="measured GETs per driver")
+    parser.add_argument("--warmup", type=int, default=40, help="GETs per driver before measuring (fills the window)")
+    parser.add_argument("--stops", type=int, default=79)
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--min-timeout-ms", type=float, default=2000.0, help="floor of the learned timeout")
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    add_results_argument(parser)
+    args = parser.parse_args()
+
+    backend = None
+    if args.in_process:
+        backend = StandinBackend(stops=args.stops, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                 straggler_rate=args.straggler_rate, straggler_ms=args.straggler_ms).start()
+    base_url = backend.base_url if backend else resolve_target(args.target, default="local")
+    print("🐢 Vehicle App Straggler Harness")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    if backend:
+        print(f"Stand-in: {args.latency_ms:g}±{args.jitter_ms:g} ms, "
+              f"{args.straggler_rate:.1%} of requests stall {args.straggler_ms:g} ms")
+    print(f"{args.drivers} drivers x {args.requests} GETs (after {args.warmup} warm-up)")
+
+    # One results file connection for every mode's run
+    store = None if args.no_results else ResultsStore(resolve_results_db(args.results_db))
+    try:
+        results = []
+        for mode in (MODES if args.mode == "all" else (args.mode,)):
+            print(f"📡 Running {mode}...")
+            stored = open_run(args, f"straggler_harness {mode}", base_url, store)
+            results.append(run_mode(base_url, mode, args, stored))
+            if stored:
+                stored.finish()
+    finally:
+        if store is not None:
+            store.close()
+        if backend:
+            backend.stop()
+    print_straggler_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Sync-lag harness for the offline-first stop completion queue
+
+Mirrors src/services/completionQueue.js in Python: each simulated driver
+completes stops at its own pace and enqueues them, while a background
+drainer sends them in order: the oldest unsent stop (the head of line)
+backs off exponentially, and once it is due it goes out with the stops
+queued behind it, in batches of up to --batch-size. Connectivity for
+every driver flips between online and offline on a seeded random schedule.
+
+Reports end-to-end sync lag (enqueue -> acknowledged), throughput,
+requests per completion for batched and one-at-a-time sync, stops sent
+out of order, and acknowledged stops whose completed_at is not the time
+the driver completed them. Run it against the stand-in backend:
+
+    python standin_backend.py --port 5000 &
+    python sync_lag_harness.py --drivers 20 --stops 30
+"""
+
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from route_simulator import synthetic_jpeg
+from vehicle_client import IDEMPOTENCY_HEADER, VehicleClient, add_target_argument, resolve_target
+from vehicle_load import percentile
+
+
+class ConnectivitySchedule:
+    """Alternating online/offline periods with exponentially distributed lengths"""
+
+    def __init__(self, mean_online_s, mean_offline_s, seed):
+        self.rng = random.Random(seed)
+        self.mean_online_s = mean_online_s
+        self.mean_offline_s = mean_offline_s
+        self.start = time.monotonic()
+        self.boundaries = []
+        self._extend(self.start)
+
+    def _extend(self, until):
+        edge = self.boundaries[-1] if self.boundaries else self.start
+        online = len(self.boundaries) % 2 == 0
+        while edge <= until:
+            mean = self.mean_online_s if online else self.mean_offline_s
+            edge += self.rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+            self.boundaries.append(edge)
+            online = not online
+
+    def is_online(self, now=None):
+        now = now or time.monotonic()
+        self._extend(now)
+        # Even-indexed boundaries end online periods
+        return bisect.bisect_right(self.boundaries, now) % 2 == 0
+
+    def resumes_at(self, now=None):
+        """`now` when online, else the end of the current offline period"""
+        now = now or time.monotonic()
+        self._extend(now)
+        index = bisect.bisect_right(self.boundaries, now)
+        return now if index % 2 == 0 else self.boundaries[index]
+
+
+class FlakyClient:
+    """VehicleClient that fails like a phone in a dead zone"""
+
+    def __init__(self, client, schedule):
+        self.client = client
+        self.schedule = schedule
+        self.lost_responses = 0
+
+    def post(self, path, **kwargs):
+        if not self.schedule.is_online():
+            raise requests.exceptions.ConnectionError("offline (simulated)")
+        response = self.client.post(path, **kwargs)
+        if not self.schedule.is_online():
+            # The server processed it, but the phone never saw the answer
+            self.lost_responses += 1
+            raise requests.exceptions.ConnectionError("connection lost mid-request (simulated)")
+        return response
+
+
+class CompletionQueue:
+    """In-memory port of src/services/completionQueue.js for one driver"""
+
+    def __init__(self, client, photo, batch_size=5, base_retry_s=2.0, max_retry_s=300.0, seed=None):
+        self.client = client
+        self.photo = photo
+        self.batch_size = batch_size
+        self.base_retry_s = base_retry_s
+        self.max_retry_s = max_retry_s
+        self.rng = random.Random(seed)
+        self.items = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.requests_sent = 0
+        self.failed_attempts = 0
+        # Retries of completions that had gone through, answered from the backend's idempotency store
+        self.replayed = 0
+        # Stops sent before an earlier stop of the same assignment, and stops stored with the sync time
+        self.out_of_order = 0
+        self.wrong_completed_at = 0
+        self.lags_s = []
+
+    def enqueue(self, assignment_id, sequence, weight):
+        with self.lock:
+            self.items.append({
+                "assignment_id": assignment_id,
+                "sequence": sequence,
+                "weight": weight,
+                "completed_at": datetime.now().isoformat(timespec="milliseconds"),
+                "idempotency_key": uuid.uuid4().hex,
+                "enqueued_at": time.monotonic(),
+                "attempts": 0,
+                "next_attempt_at": 0.0,
+            })
+        self.wakeup.set()
+
+    def pending(self):
+        with self.lock:
+            return len(self.items)
+
+    def _heads(self):
+        """First queued item of each assignment, in queue order (call with the lock held)"""
+        heads = {}
+        for item in self.items:
+            heads.setdefault(item["assignment_id"], item)
+        return list(heads.values())
+
+    def _next_batch(self):
+        now = time.monotonic()
+        with self.lock:
+            head = next((item for item in self._heads() if item["next_attempt_at"] <= now), None)
+            if head is None:
+                return []
+            return [item for item in self.items if item["assignment_id"] == head["assignment_id"]][:self.batch_size]
+
+    def _check_order(self, batch):
+        """Count stops sent while an earlier stop of their assignment waits outside the batch"""
+        sent = {id(item) for item in batch}
+        with self.lock:
+            waiting = [item["sequence"] for item in self.items
+                       if item["assignment_id"] == batch[0]["assignment_id"] and id(item) not in sent]
+        if waiting:
+            self.out_of_order += sum(1 for item in batch if item["sequence"] > min(waiting))
+
+    def _check_completed_at(self, item, result):
+        if result.get("completed_at") != item["completed_at"]:
+            self.wrong_completed_at += 1
+
+    def _send(self, batch):
+        """Return the acknowledged items of `batch`"""
+        prefix = f"/api/assignments/{batch[0]['assignment_id']}/stops"
+        self.requests_sent += 1
+        self._check_order(batch)
+        try:
+            if len(batch) > 1:
+                completions = [{"sequence": item["sequence"], "weight": item["weight"], "notes": "",
+                                "completed_at": item["completed_at"],
+                                "photo_field": f"photo_{item['sequence']}",
+                                "idempotency_key": item["idempotency_key"]} for item in batch]
+                files = {f"photo_{item['sequence']}": (f"photo_{item['sequence']}.jpg", self.photo, "image/jpeg")
+                         for item in batch}
+                response = self.client.post(f"{prefix}/complete-batch",
+                                            data={"completions": json.dumps(completions)}, files=files)
+                if not response.ok:
+                    return []
+                results = {r["sequence"]: r for r in response.json().get("results", []) if r.get("success")}
+                self.replayed += sum(1 for r in results.values() if r.get("replayed"))
+                acknowledged = [item for item in batch if item["sequence"] in results]
+                for item in acknowledged:
+                    self._check_completed_at(item, results[item["sequence"]])
+                return acknowledged
+
+            item = batch[0]
+            response = self.client.post(
+                f"{prefix}/{item['sequence']}/complete",
+                data={"weight": item["weight"], "notes": "", "completed_at": item["completed_at"]},
+                files={"photo": (f"photo_{item['sequence']}.jpg", self.photo, "image/jpeg")},
+                headers={IDEMPOTENCY_HEADER: item["idempotency_key"]})
+            if not response.ok:
+                return []
+            result = response.json()
+            self.replayed += bool(result.get("replayed"))
+            self._check_completed_at(item, result)
+            return [item]
+        except requests.exceptions.RequestException:
+            return []
+
+    def _settle(self, batch, acknowledged):
+        now = time.monotonic()
+        acked_ids = {id(item) for item in acknowledged}
+        # One retry time for the rest of the batch, following the head's backoff
+        delay = min(self.max_retry_s, self.base_retry_s * 2 ** batch[0]["attempts"])
+        next_attempt_at = now + delay * (0.5 + self.rng.random() / 2)
+        with self.lock:
+            self.items = [item for item in self.items if id(item) not in acked_ids]
+            for item in batch:
+                if id(item) in acked_ids:
+                    self.lags_s.append(now - item["enqueued_at"])
+                    continue
+                item["attempts"] += 1
+                item["next_attempt_at"] = next_attempt_at
+        if len(acknowledged) < len(batch):
+            self.failed_attempts += 1
+
+    def drain_forever(self, stop_event):
+        while not stop_event.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._settle(batch, self._send(batch))
+                continue
+            with self.lock:
+                next_due = min((item["next_attempt_at"] for item in self._heads()), default=None)
+            wait = 0.5 if next_due is None else max(0.0, next_due - time.monotonic())
+            self.wakeup.wait(timeout=min(wait, 0.5))
+            self.wakeup.clear()
+
+
+def run_driver(base_url, assignment_id, stops, think_s, batch_size, schedule_args, retry_args,
+               photo_bytes, drain_timeout_s, seed):
+    """One driver completing a route while its queue syncs in the background"""
+    rng = random.Random(seed)
+    schedule = ConnectivitySchedule(*schedule_args, seed=seed)
+    with VehicleClient(base_url, pool_size=1) as client:
+        flaky = FlakyClient(client, schedule)
+        queue = CompletionQueue(flaky, synthetic_jpeg(photo_bytes, rng), batch_size, *retry_args, seed=seed)
+        stop_event = threading.Event()
+        drainer = threading.Thread(target=queue.drain_forever, args=(stop_event,), daemon=True)
+        drainer.start()
+
+        for sequence in range(1, stops + 1):
+            time.sleep(rng.expovariate(1.0 / think_s) if think_s > 0 else 0)
+            queue.enqueue(assignment_id, sequence, f"{rng.uniform(0.5, 25.0):.1f}")
+        last_enqueue = time.monotonic()
+
+        deadline = last_enqueue + drain_timeout_s
+        while queue.pending() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        drained_after_s = time.monotonic() - last_enqueue if not queue.pending() else None
+
+        stop_event.set()
+        queue.wakeup.set()
+        drainer.join()
+
+    return {
+        "lags_s": queue.lags_s,
+        "requests": queue.requests_sent,
+        "failed_attempts": queue.failed_attempts,
+        "lost_responses": flaky.lost_responses,
+        "replayed": queue.replayed,
+        "out_of_order": queue.out_of_order,
+        "wrong_completed_at": queue.wrong_completed_at,
+        "unsynced": queue.pending(),
+        "drained_after_s": drained_after_s,
+    }
+
+
+def run_mode(base_url, args, batch_size):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.drivers) as pool:
+        futures = [
+            pool.submit(run_driver, base_url, args.first_assignment + i, args.stops, args.think_ms / 1000.0,
+                        batch_size, (args.mean_online_s, args.mean_offline_s),
+                        (args.base_retry_ms / 1000.0, args.max_retry_ms / 1000.0),
+                        args.photo_kb * 1024, args.drain_timeout_s, seed=args.seed + i)
+            for i in range(args.drivers)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    lags = sorted(lag * 1000.0 for r in results for lag in r["lags_s"])
+    drained = sorted(r["drained_after_s"] for r in results if r["drained_after_s"] is not None)
+    return {
+        "batch_size": batch_size,
+        "elapsed_s": elapsed,
+        "synced": len(lags),
+        "unsynced": sum(r["unsynced"] for r in results),
+        "requests": sum(r["requests"] for r in results),
+        "failed_attempts": sum(r["failed_attempts"] for r in results),
+        "lost_responses": sum(r["lost_responses"] for r in results),
+        "replayed": sum(r["replayed"] for r in results),
+        "out_of_order": sum(r["out_of_order"] for r in results),
+        "wrong_completed_at": sum(r["wrong_completed_at"] for r in results),
+        "lag_p50_ms": percentile(lags, 50),
+        "lag_p95_ms": percentile(lags, 95),
+        "lag_p99_ms": percentile(lags, 99),
+        "lag_max_ms": lags[-1] if lags else None,
+        "drain_p95_s": percentile(drained, 95),
+        "throughput": len(lags) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def print_sync_report(results):
+    print("\n" + "=" * 60)
+    print("📶 Completion Sync Under Connectivity Drops")
+    print("=" * 60)
+
+    def fmt(value, unit=""):
+        return f"{value:.1f}{unit}" if value is not None else "n/a"
+
+    for r in results:
+        mode = "one at a time" if r["batch_size"] == 1 else f"batches of {r['batch_size']}"
+        print(f"\n🔁 Sync {mode}:")
+        print(f"   Synced: {r['synced']} completions, {r['unsynced']} left unsynced")
+        print(f"   Sync lag: p50 {fmt(r['lag_p50_ms'], ' ms')}, p95 {fmt(r['lag_p95_ms'], ' ms')}, "
+              f"p99 {fmt(r['lag_p99_ms'], ' ms')}, max {fmt(r['lag_max_ms'], ' ms')}")
+        print(f"   Queue drained p95 {fmt(r['drain_p95_s'], ' s')} after the last stop")
+        per_completion = r["requests"] / r["synced"] if r["synced"] else 0
+        print(f"   Requests: {r['requests']} ({per_completion:.2f} per completion), "
+              f"{r['failed_attempts']} failed attempts, {r['lost_responses']} responses lost mid-flight")
+        print(f"   Duplicates: {r['replayed']} retries answered with the stored result instead of completing again")
+        print(f"   {'✅' if not r['out_of_order'] else '❌'} Order: {r['out_of_order']} stops sent "
+              f"before an earlier stop of their assignment")
+        print(f"   {'✅' if not r['wrong_completed_at'] else '❌'} Completion times: {r['wrong_completed_at']} "
+              f"stops stored with a completed_at other than the driver's")
+        print(f"   Throughput: {r['throughput']:.1f} completions/s over {r['elapsed_s']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure offline completion queue sync lag")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--stops", type=int, default=30, help="stops completed per driver")
+    parser.add_argument("--first-assignment", type=int, default=1)
+    parser.add_argument("--think-ms", type=float, default=500, help="mean time between completions")
+    parser.add_argument("--mean-online-s", type=float, default=10.0)
+    parser.add_argument("--mean-offline-s", type=float, default=4.0)
+    parser.add_argument("--batch-size", type=int, default=5, help="coalesced completions per request")
+    parser.add_argument("--mode", choices=["batch", "single", "both"], default="both")
+    parser.add_argument("--base-retry-ms", type=float, default=2000)
+    parser.add_argument("--max-retry-ms", type=float, default=300000)
+    parser.add_argument("--photo-kb", type=int, default=150)
+    parser.add_argument("--drain-timeout-s", type=float, default=120.0,
+                        help="how long to wait for each queue to empty after the last stop")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    base_url = resolve_target(args.target, default="local")
+    print("📶 Vehicle App Completion Sync Harness")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"{args.drivers} drivers x {args.stops} stops, online ~{args.mean_online_s}s / "
+          f"offline ~{args.mean_offline_s}s, seed {args.seed}")
+
+    batch_sizes = {"batch": [args.batch_size], "single": [1], "both": [1, args.batch_size]}[args.mode]
+    print_sync_report([run_mode(base_url, args, batch_size) for batch_size in batch_sizes])
+
+
+if __name__ == "__main__":
+    main()
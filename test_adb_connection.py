@@ -2,18 +2,23 @@
 """
 Test script to verify Vehicle_App connectivity through ADB port forwarding
 """
-import requests
+import argparse
 import json
 
-def test_adb_port_forwarding():
+from adb_fleet import add_fleet_arguments, run_fleet_check
+from vehicle_client import add_target_argument, get_client, resolve_target
+
+def test_adb_port_forwarding(client=None):
     """Test if ADB port forwarding is working"""
+    client = client or get_client(default="local")
     print("🔍 Testing ADB Port Forwarding")
     print("=" * 60)
+    print(f"Target: {client.base_url}")
     
     # Test 1: Basic connectivity through localhost
     print("📡 Test 1: Basic connectivity through localhost...")
     try:
-        response = requests.get('http://localhost:5000/')
+        response = client.get('/')
         if response.status_code == 200:
             print("✅ Backend accessible through localhost")
             print(f"   Response: {response.json()}")
@@ -27,7 +32,7 @@ def test_adb_port_forwarding():
     # Test 2: API endpoints through localhost
     print("\n📡 Test 2: API endpoints through localhost...")
     try:
-        response = requests.get('http://localhost:5000/api/pickup/areas')
+        response = client.get('/api/pickup/areas')
         if response.status_code == 200:
             data = response.json()
             areas = data.get('areas', [])
@@ -45,8 +50,8 @@ def test_adb_port_forwarding():
             "driving_license": "BR5020230001371"
         }
         
-        response = requests.post(
-            'http://localhost:5000/api/driver/authenticate/v2',
+        response = client.post(
+            '/api/driver/authenticate/v2',
             json=test_data,
             headers={'Content-Type': 'application/json'}
         )
@@ -86,12 +91,22 @@ def check_adb_status():
 
 def main():
     """Main test function"""
+    parser = argparse.ArgumentParser(description="ADB port forwarding test")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--fleet", action="store_true",
+                        help="set up and check every attached device in parallel")
+    add_fleet_arguments(parser)
+    args = parser.parse_args()
+    
     print("🚀 ADB Port Forwarding Test")
     print("=" * 60)
     
-    check_adb_status()
+    if args.fleet:
+        run_fleet_check(resolve_target(args.target, default="local"), args.adb, args.workers, args.adb_timeout)
+    else:
+        check_adb_status()
     
-    if test_adb_port_forwarding():
+    if test_adb_port_forwarding(get_client(args.target, default="local")):
         print("\n✅ ADB port forwarding is working!")
         print("🚀 Vehicle_App should now connect through localhost")
     else:
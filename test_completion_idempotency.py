@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for idempotent stop completion
+
+Fires the same completion (same Idempotency-Key) from several threads at
+once, the way aggressive retries and a slow first attempt overlap, and
+checks that exactly one of them takes effect: every duplicate gets the
+original's result back, and the route version (its ETag) moves once. The
+same burst without a key shows what retries did before: one completion
+per request.
+
+Also times completions with and without a key, to show what the
+deduplication adds per request:
+
+    python test_completion_idempotency.py --in-process
+    python test_completion_idempotency.py --target local --duplicates 16
+
+Under pytest the checks run against a stand-in backend started in-process.
+"""
+
+import argparse
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from standin_backend import StandinBackend
+from vehicle_client import IDEMPOTENCY_HEADER, VehicleClient, add_target_argument, resolve_target
+from vehicle_load import percentile
+
+
+def route_version(client, assignment_id):
+    """The route's change counter, from the ETag of its stops ('"<id>-<version>"')"""
+    response = client.get(f"/api/assignments/{assignment_id}/stops")
+    response.raise_for_status()
+    return int(response.headers["ETag"].strip('"').rsplit("-", 1)[1])
+
+
+def fire_duplicates(client, assignment_id, sequence, duplicates, key):
+    """Send `duplicates` identical completions at the same moment; returns their responses"""
+    barrier = threading.Barrier(duplicates)
+    headers = {IDEMPOTENCY_HEADER: key} if key else {}
+
+    def complete(_):
+        barrier.wait()
+        return client.post(f"/api/assignments/{assignment_id}/stops/{sequence}/complete",
+                           json={"weight": "12.5", "notes": ""}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=duplicates) as pool:
+        return list(pool.map(complete, range(duplicates)))
+
+
+@contextmanager
+def client_or_standin(client, stops, duplicates):
+    """The given client, or one on a stand-in backend that lives for the test"""
+    if client:
+        yield client
+        return
+    with StandinBackend(stops=stops) as backend, \
+            VehicleClient(backend.base_url, pool_size=duplicates) as standin_client:
+        yield standin_client
+
+
+def check_duplicates_complete_once(client, assignment_id, stops, duplicates):
+    print(f"\n1️⃣ {duplicates} simultaneous duplicates per stop, {stops} stops, with an idempotency key...")
+    failures = []
+    for sequence in range(1, stops + 1):
+        before = route_version(client, assignment_id)
+        responses = fire_duplicates(client, assignment_id, sequence, duplicates, key=uuid.uuid4().hex)
+        applied = route_version(client, assignment_id) - before
+
+        bodies = [r.json() for r in responses if r.ok]
+        originals = [b for b in bodies if not b.get("replayed")]
+        if len(bodies) != duplicates:
+            failures.append(f"stop {sequence}: {duplicates - len(bodies)} duplicates failed "
+                            f"({sorted({r.status_code for r in responses if not r.ok})})")
+        elif len(originals) != 1 or applied != 1:
+            failures.append(f"stop {sequence}: {len(originals)} originals, route changed {applied} times")
+        elif len({b["completed_at"] for b in bodies}) != 1:
+            failures.append(f"stop {sequence}: duplicates saw different completion results")
+
+    if failures:
+        for failure in failures:
+            print(f"   ❌ {failure}")
+        return False
+    print(f"   ✅ Every stop completed exactly once; {duplicates - 1} duplicates each got the stored result")
+    return True
+
+
+def check_without_key(client, assignment_id, duplicates):
+    print(f"\n2️⃣ The same burst without a key...")
+    before = route_version(client, assignment_id)
+    responses = fire_duplicates(client, assignment_id, 1, duplicates, key=None)
+    applied = route_version(client, assignment_id) - before
+    print(f"   ℹ️ {sum(r.ok for r in responses)} responses, stop completed {applied} times "
+          f"(completed_at and weight overwritten by every retry)")
+    return applied
+
+
+def test_duplicates_complete_once(client=None, assignment_id=101, stops=5, duplicates=8):
+    """Simultaneous duplicates with one key complete each stop exactly once"""
+    with client_or_standin(client, stops, duplicates) as client:
+        assert check_duplicates_complete_once(client, assignment_id, stops, duplicates)
+
+
+def test_without_key(client=None, assignment_id=102, duplicates=8):
+    """Without a key every duplicate completes the stop again"""
+    with client_or_standin(client, 1, duplicates) as client:
+        assert check_without_key(client, assignment_id, duplicates) == duplicates
+
+
+def time_completions(client, assignment_id, stops):
+    """Sequential completions with and without a key; returns (keyed, plain) latencies in ms"""
+    print(f"\n3️⃣ Timing {stops} completions with and without a key...")
+    latencies = {"keyed": [], "plain": []}
+    for sequence in range(1, stops + 1):
+        for mode, assignment in (("plain", assignment_id), ("keyed", assignment_id + 1)):
+            headers = {IDEMPOTENCY_HEADER: uuid.uuid4().hex} if mode == "keyed" else {}
+            start = time.perf_counter()
+            response = client.post(f"/api/assignments/{assignment}/stops/{sequence}/complete",
+                                   json={"weight": "12.5", "notes": ""}, headers=headers)
+            latencies[mode].append((time.perf_counter() - start) * 1000.0)
+            response.raise_for_status()
+
+    for mode in ("plain", "keyed"):
+        values = sorted(latencies[mode])
+        print(f"   {mode:<6} p50 {percentile(values, 50):.2f} ms, p95 {percentile(values, 95):.2f} ms")
+    added = percentile(sorted(latencies["keyed"]), 50) - percentile(sorted(latencies["plain"]), 50)
+    print(f"   ✅ The key adds {added:+.2f} ms per completion at p50")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that duplicate stop completions take effect once")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--in-process", action="store_true", help="test a stand-in backend started here")
+    parser.add_argument("--assignment", type=int, default=101, help="first of three assignments to use")
+    parser.add_argument("--stops", type=int, default=20)
+    parser.add_argument("--duplicates", type=int, default=8, help="copies of each completion sent at once")
+    args = parser.parse_args()
+
+    backend = StandinBackend(stops=args.stops).start() if args.in_process else None
+    base_url = backend.base_url if backend else resolve_target(args.target, default="local")
+    print("🔁 Idempotent Stop Completion Test")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+
+    try:
+        with VehicleClient(base_url, pool_size=args.duplicates) as client:
+            passed = check_duplicates_complete_once(client, args.assignment, args.stops, args.duplicates)
+            check_without_key(client, args.assignment + 1, args.duplicates)
+            time_completions(client, args.assignment + 1, args.stops)
+    finally:
+        if backend:
+            backend.stop()
+
+    print("\n" + ("✅ Duplicate completions are safe to retry" if passed else "❌ Duplicate completions took effect"))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
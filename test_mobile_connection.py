@@ -2,21 +2,23 @@
 """
 Test mobile app connection with updated configuration
 """
+import argparse
 import requests
 import json
 
-def test_mobile_connection():
+from vehicle_client import add_target_argument, get_client
+
+def test_mobile_connection(client=None):
     """Test if mobile app can connect to backend with updated configuration"""
+    client = client or get_client(default="lan")
     print("🚀 Testing Mobile App Connection")
     print("=" * 50)
-    
-    # Test the exact endpoint that the mobile app uses
-    BASE_URL = 'http://192.168.4.145:5000/api'
+    print(f"Target: {client.base_url}")
     
     # Test 1: Basic connectivity
     print("📡 Test 1: Basic connectivity...")
     try:
-        response = requests.get(f'{BASE_URL.replace("/api", "")}/', timeout=10)
+        response = client.get('/')
         if response.status_code == 200:
             print("✅ Backend server is accessible")
         else:
@@ -34,11 +36,10 @@ def test_mobile_connection():
             "driving_license": "BR5020230001371"
         }
         
-        response = requests.post(
-            f'{BASE_URL}/driver/authenticate/v2',
+        response = client.post(
+            '/api/driver/authenticate/v2',
             json=auth_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+            headers={'Content-Type': 'application/json'}
         )
         
         print(f"📥 Response status: {response.status_code}")
@@ -46,6 +47,8 @@ def test_mobile_connection():
         
         if response.status_code == 200:
             data = response.json()
+            assignment_id = data.get('assignment_id')
+            sequence = data.get('current_sequence') or (data.get('current_stop') or {}).get('sequence') or 1
             print("✅ V2 Authentication successful!")
             print(f"   Assignment ID: {data.get('assignment_id')}")
             print(f"   Driver Name: {data.get('driver_name')}")
@@ -77,14 +80,8 @@ def test_mobile_connection():
     # Test 3: Test assignment stop endpoint
     print("\n📡 Test 3: Assignment stop endpoint...")
     try:
-        # Use the assignment ID from previous test
-        assignment_id = 6  # From previous test
-        sequence = 1
-        
-        response = requests.get(
-            f'{BASE_URL}/assignments/{assignment_id}/stops/{sequence}',
-            timeout=10
-        )
+        # The driver's own assignment and current stop, from the login in Test 2
+        response = client.get(f'/api/assignments/{assignment_id}/stops/{sequence}')
         
         if response.status_code == 200:
             data = response.json()
@@ -105,5 +102,8 @@ def test_mobile_connection():
     return True
 
 if __name__ == "__main__":
-    test_mobile_connection()
+    parser = argparse.ArgumentParser(description="Mobile app connection test")
+    add_target_argument(parser, default="lan")
+    args = parser.parse_args()
+    test_mobile_connection(get_client(args.target, default="lan"))
 
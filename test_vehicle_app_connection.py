@@ -2,20 +2,23 @@
 """
 Test script to verify Vehicle_App connectivity to backend server
 """
-import requests
+import argparse
 import json
+from urllib.parse import urlparse
 
-BASE_URL = 'http://192.168.4.145:5000'
+from vehicle_client import add_target_argument, get_client
 
-def test_backend_connectivity():
+def test_backend_connectivity(client=None):
     """Test if backend is accessible from mobile device perspective"""
+    client = client or get_client(default="lan")
     print("🔍 Testing Backend Connectivity")
     print("=" * 60)
+    print(f"Target: {client.base_url}")
     
     # Test 1: Basic connectivity
     print("📡 Test 1: Basic connectivity...")
     try:
-        response = requests.get(f'{BASE_URL}/')
+        response = client.get('/')
         if response.status_code == 200:
             print("✅ Backend server is accessible")
             print(f"   Response: {response.json()}")
@@ -29,7 +32,7 @@ def test_backend_connectivity():
     # Test 2: API endpoints
     print("\n📡 Test 2: API endpoints...")
     try:
-        response = requests.get(f'{BASE_URL}/api/pickup/areas')
+        response = client.get('/api/pickup/areas')
         if response.status_code == 200:
             data = response.json()
             areas = data.get('areas', [])
@@ -49,8 +52,8 @@ def test_backend_connectivity():
             "driving_license": "BR5020230001371"
         }
         
-        response = requests.post(
-            f'{BASE_URL}/api/driver/authenticate/v2',
+        response = client.post(
+            '/api/driver/authenticate/v2',
             json=test_data,
             headers={'Content-Type': 'application/json'}
         )
@@ -62,8 +65,8 @@ def test_backend_connectivity():
         elif response.status_code == 404:
             print("⚠️ V2 Authentication endpoint not found (using old endpoint)")
             # Try old endpoint
-            response = requests.post(
-                f'{BASE_URL}/api/driver/authenticate',
+            response = client.post(
+                '/api/driver/authenticate',
                 json=test_data,
                 headers={'Content-Type': 'application/json'}
             )
@@ -79,30 +82,37 @@ def test_backend_connectivity():
     
     return True
 
-def test_mobile_network():
+def test_mobile_network(client=None):
     """Test network connectivity from mobile perspective"""
+    client = client or get_client(default="lan")
+    host = urlparse(client.base_url).hostname
     print("\n📱 Testing Mobile Network Connectivity")
     print("=" * 60)
     
-    print("📡 Your laptop IP: 192.168.4.145")
-    print("📡 Backend server: http://192.168.4.145:5000")
-    print("📡 Vehicle_App should connect to: http://192.168.4.145:5000/api")
+    print(f"📡 Your laptop IP: {host}")
+    print(f"📡 Backend server: {client.base_url}")
+    print(f"📡 Vehicle_App should connect to: {client.base_url}/api")
     
     print("\n🔧 Troubleshooting steps:")
     print("1. Make sure your mobile device is on the same WiFi network as your laptop")
     print("2. Check if Windows Firewall is blocking port 5000")
     print("3. Verify the Vehicle_App is using the correct IP address")
-    print("4. Try accessing http://192.168.4.145:5000 from your mobile browser")
+    print(f"4. Try accessing {client.base_url} from your mobile browser")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vehicle_App connectivity test")
+    add_target_argument(parser, default="lan")
+    args = parser.parse_args()
+    client = get_client(args.target, default="lan")
+    
     print("🚀 Vehicle_App Connectivity Test")
     print("=" * 60)
     
-    if test_backend_connectivity():
+    if test_backend_connectivity(client):
         print("\n✅ Backend connectivity tests passed!")
         print("🚀 Vehicle_App should now be able to connect")
     else:
         print("\n❌ Backend connectivity tests failed!")
         print("🔧 Please check the network configuration")
     
-    test_mobile_network()
+    test_mobile_network(client)
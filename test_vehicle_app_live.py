@@ -3,24 +3,30 @@
 Test Vehicle App connectivity to live server
 """
 
+import argparse
 import requests
 import json
 
-LIVE_BASE_URL = "https://reactapp.tcil.in/aiml/LATEST_BACK_VEHICLE"
+from results_store import add_results_argument, open_run
+from vehicle_client import add_target_argument, get_client
+from vehicle_load import run_load, print_load_report
 
-def test_vehicle_app_endpoints():
+# Vehicle App endpoints
+VEHICLE_ENDPOINTS = [
+    ("/api/driver/authenticate", "POST", "Driver Authentication (V1)"),
+    ("/api/driver/authenticate/v2", "POST", "Driver Authentication (V2)"),
+    ("/api/assignments/{id}/stops/{sequence}", "GET", "Assignment Stop Details"),
+    ("/api/assignments/{id}/stops/{sequence}/complete", "POST", "Complete Stop"),
+    ("/api/assignments/{id}/progress", "GET", "Assignment Progress"),
+]
+
+def test_vehicle_app_endpoints(client=None):
     """Test Vehicle App specific endpoints"""
+    client = client or get_client(default="live")
     print("🚗 Testing Vehicle App Endpoints on Live Server")
     print("=" * 60)
     
-    # Vehicle App endpoints
-    vehicle_endpoints = [
-        ("/api/driver/authenticate", "POST", "Driver Authentication (V1)"),
-        ("/api/driver/authenticate/v2", "POST", "Driver Authentication (V2)"),
-        ("/api/assignments/{id}/stops/{sequence}", "GET", "Assignment Stop Details"),
-        ("/api/assignments/{id}/stops/{sequence}/complete", "POST", "Complete Stop"),
-        ("/api/assignments/{id}/progress", "GET", "Assignment Progress"),
-    ]
+    vehicle_endpoints = VEHICLE_ENDPOINTS
     
     working_endpoints = []
     failed_endpoints = []
@@ -33,14 +39,14 @@ def test_vehicle_app_endpoints():
             if method == "GET":
                 # For GET requests, use test IDs
                 test_endpoint = endpoint.replace("{id}", "1").replace("{sequence}", "1")
-                response = requests.get(f"{LIVE_BASE_URL}{test_endpoint}", timeout=15)
+                response = client.get(test_endpoint)
             else:
                 # For POST requests, send test data
                 test_data = {
                     "vehicle_number": "TEST123",
                     "driving_license": "TESTDL123"
                 }
-                response = requests.post(f"{LIVE_BASE_URL}{endpoint}", json=test_data, timeout=20)
+                response = client.post(endpoint, json=test_data)
             
             print(f"   Status: {response.status_code}")
             
@@ -110,8 +116,9 @@ def test_vehicle_app_endpoints():
         print("   ❌ Vehicle App not ready - major connectivity issues.")
         print("   🔧 Server configuration needs to be fixed.")
 
-def test_authentication_with_real_data():
+def test_authentication_with_real_data(client=None):
     """Test authentication with real vehicle/driver data"""
+    client = client or get_client(default="live")
     print("\n🔐 Testing Authentication with Real Data")
     print("=" * 60)
     
@@ -125,10 +132,9 @@ def test_authentication_with_real_data():
         print(f"\n🔍 Test {i}: Vehicle {creds['vehicle_number']}, DL {creds['driving_license']}")
         
         try:
-            response = requests.post(
-                f"{LIVE_BASE_URL}/api/driver/authenticate/v2",
-                json=creds,
-                timeout=20
+            response = client.post(
+                "/api/driver/authenticate/v2",
+                json=creds
             )
             
             print(f"   Status: {response.status_code}")
@@ -157,63 +163,98 @@ def test_authentication_with_real_data():
         except requests.exceptions.RequestException as e:
             print(f"   ❌ Request failed: {e}")
 
-def test_multi_area_authentication():
+def test_multi_area_authentication(client=None):
     """Test authentication for different areas"""
+    client = client or get_client(default="live")
     print("\n🌍 Testing Multi-Area Authentication")
     print("=" * 60)
     
-    # Test area switching and authentication
+    # Scope each request to its area; fall back to the global switch for backends without area scoping
     areas = ["delhi", "gurugram"]
     
     for area in areas:
         print(f"\n🔍 Testing {area.upper()} area:")
         
-        # Switch to area
+        test_creds = {
+            "vehicle_number": f"{area.upper()[:2]}01AB1234",
+            "driving_license": f"{area.upper()[:2]}012345678901234"
+        }
+        
         try:
-            switch_response = requests.post(
-                f"{LIVE_BASE_URL}/api/areas/switch",
-                json={"area": area},
-                timeout=15
+            auth_response = client.post(
+                "/api/driver/authenticate/v2",
+                json=test_creds,
+                area=area
             )
             
-            if switch_response.status_code == 200:
+            answered_area = None
+            if auth_response.status_code == 200:
+                answered_area = auth_response.json().get("area")
+            
+            if answered_area != area:
+                print(f"   ⚠️ Backend ignored the area parameter, switching area globally")
+                switch_response = client.post(
+                    "/api/areas/switch",
+                    json={"area": area}
+                )
+                if switch_response.status_code != 200:
+                    print(f"   ❌ Failed to switch to {area} area")
+                    continue
                 print(f"   ✅ Switched to {area} area")
                 
-                # Test authentication in this area
-                test_creds = {
-                    "vehicle_number": f"{area.upper()[:2]}01AB1234",
-                    "driving_license": f"{area.upper()[:2]}012345678901234"
-                }
-                
-                auth_response = requests.post(
-                    f"{LIVE_BASE_URL}/api/driver/authenticate/v2",
-                    json=test_creds,
-                    timeout=20
+                auth_response = client.post(
+                    "/api/driver/authenticate/v2",
+                    json=test_creds
                 )
-                
-                print(f"   Authentication Status: {auth_response.status_code}")
-                if auth_response.status_code == 200:
-                    print(f"   ✅ Authentication works in {area} area")
-                elif auth_response.status_code == 400:
-                    print(f"   ⚠️ Expected failure in {area} area (test credentials)")
-                else:
-                    print(f"   ❌ Authentication failed in {area} area")
             else:
-                print(f"   ❌ Failed to switch to {area} area")
+                print(f"   ✅ Request scoped to {area} area")
+            
+            print(f"   Authentication Status: {auth_response.status_code}")
+            if auth_response.status_code == 200:
+                print(f"   ✅ Authentication works in {area} area")
+            elif auth_response.status_code == 400:
+                print(f"   ⚠️ Expected failure in {area} area (test credentials)")
+            else:
+                print(f"   ❌ Authentication failed in {area} area")
                 
         except requests.exceptions.RequestException as e:
             print(f"   ❌ Request failed: {e}")
 
+def run_vehicle_app_load(base_url, drivers, rounds, results=None):
+    """Replay the endpoint table with concurrent simulated drivers"""
+    print(f"\n🚦 Load Testing Vehicle App Endpoints ({drivers} drivers x {rounds} rounds)")
+    print("=" * 60)
+    
+    summaries, elapsed = run_load(base_url, VEHICLE_ENDPOINTS, drivers=drivers, rounds=rounds, sink=results)
+    print_load_report(summaries, elapsed, drivers)
+    return summaries
+
 def main():
     """Main test function"""
+    parser = argparse.ArgumentParser(description="Vehicle App live server checks")
+    parser.add_argument("--load", type=int, metavar="DRIVERS",
+                        help="run the endpoint table with N concurrent simulated drivers instead of the serial checks")
+    parser.add_argument("--rounds", type=int, default=5, help="endpoint table passes per driver in load mode")
+    add_target_argument(parser, default="live")
+    add_results_argument(parser)
+    args = parser.parse_args()
+    client = get_client(args.target, default="live")
+    
     print("🚗 Vehicle App Live Server Testing")
     print("=" * 60)
-    print(f"Target: {LIVE_BASE_URL}")
+    print(f"Target: {client.base_url}")
     print()
     
-    test_vehicle_app_endpoints()
-    test_authentication_with_real_data()
-    test_multi_area_authentication()
+    if args.load:
+        results = open_run(args, "test_vehicle_app_live", client.base_url)
+        run_vehicle_app_load(client.base_url, args.load, args.rounds, results)
+        if results:
+            results.finish()
+        return
+    
+    test_vehicle_app_endpoints(client)
+    test_authentication_with_real_data(client)
+    test_multi_area_authentication(client)
     
     print("\n" + "=" * 60)
     print("🏁 Vehicle App Testing Complete!")
@@ -3,29 +3,31 @@
 Test script to verify Vehicle App login functionality
 """
 
+import argparse
 import requests
 import json
+import time
 
-BASE_URL = "http://localhost:5000/api"
+from vehicle_client import TEST_CREDENTIALS, VehicleClient, add_target_argument, get_client
+from vehicle_load import percentile
 
-def test_vehicle_app_login():
+def test_vehicle_app_login(client=None):
+    client = client or get_client(default="local")
     print("🚛 Testing Vehicle App Login Functionality")
     print("=" * 60)
+    print(f"Target: {client.base_url}")
     
     # Test 1: Check if V2 authentication endpoint exists
     print("\n1️⃣ Testing V2 Authentication Endpoint...")
     
     # Test with sample credentials (you'll need to replace with actual data)
-    test_credentials = {
-        "vehicle_number": "DL1LAN3660",  # Replace with actual vehicle number from your database
-        "driving_license": "BR5020230001371"  # Replace with actual DL number from your database
-    }
+    test_credentials = TEST_CREDENTIALS
     
     print(f"   Testing with vehicle: {test_credentials['vehicle_number']}")
     print(f"   Testing with DL: {test_credentials['driving_license']}")
     
     try:
-        response = requests.post(f"{BASE_URL}/driver/authenticate/v2", 
+        response = client.post("/api/driver/authenticate/v2",
                                json=test_credentials,
                                timeout=10)
         
@@ -68,7 +70,7 @@ def test_vehicle_app_login():
     # Test 2: Check current area configuration
     print("\n2️⃣ Checking Current Area Configuration...")
     try:
-        response = requests.get(f"{BASE_URL}/areas/current")
+        response = client.get("/api/areas/current")
         data = response.json()
         
         if data['success']:
@@ -88,7 +90,7 @@ def test_vehicle_app_login():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/driver/authenticate/v2", 
+        response = client.post("/api/driver/authenticate/v2",
                                json=invalid_credentials,
                                timeout=10)
         
@@ -112,5 +114,77 @@ def test_vehicle_app_login():
     print("- Make sure the backend server is running")
     print("- Check that the vehicle_driver_master table has the correct city column")
 
+def legacy_login(client, credentials):
+    """Login as the app did before: connectivity probe, authenticate, start trip"""
+    client.get("/api/driver/authenticate", timeout=10).content
+    response = client.post("/api/driver/authenticate/v2", json=credentials, timeout=10)
+    response.raise_for_status()
+    assignment_id = response.json()["assignment_id"]
+    client.post(f"/api/assignments/{assignment_id}/start-trip", timeout=10).raise_for_status()
+    return 3
+
+
+def single_roundtrip_login(client, credentials):
+    """Authenticate and start the trip in one request, falling back when the backend ignores start_trip"""
+    response = client.post("/api/driver/authenticate/v2", json={**credentials, "start_trip": True}, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    if data.get("trip_started_at"):
+        return 1
+    client.post(f"/api/assignments/{data['assignment_id']}/start-trip", timeout=10).raise_for_status()
+    return 2
+
+
+def time_login_paths(client=None, iterations=20, credentials=None):
+    """Time both login paths, each on a fresh connection like a cold app start"""
+    client = client or get_client(default="local")
+    credentials = credentials or TEST_CREDENTIALS
+    print("⏱️ Timing Vehicle App Login Paths")
+    print("=" * 60)
+    print(f"Target: {client.base_url}")
+    print(f"{iterations} logins per path as {credentials['vehicle_number']}")
+
+    paths = [("legacy (probe + auth + start-trip)", legacy_login),
+             ("single round trip", single_roundtrip_login)]
+    results = {}
+    for name, login in paths:
+        latencies, round_trips, errors = [], 0, 0
+        for _ in range(iterations):
+            with VehicleClient(client.base_url, pool_size=1) as fresh:
+                start = time.perf_counter()
+                try:
+                    round_trips += login(fresh, credentials)
+                except (requests.exceptions.RequestException, KeyError, ValueError):
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000.0)
+        latencies.sort()
+        results[name] = latencies
+        print(f"\n🔐 {name}:")
+        if not latencies:
+            print(f"   ❌ All {errors} logins failed")
+            continue
+        print(f"   Round trips per login: {round_trips / len(latencies):.1f}")
+        print(f"   Latency: p50 {percentile(latencies, 50):.1f} ms, p95 {percentile(latencies, 95):.1f} ms, "
+              f"max {latencies[-1]:.1f} ms, {errors} errors")
+
+    legacy, single = (results[name] for name, _ in paths)
+    if legacy and single:
+        saved = percentile(legacy, 50) - percentile(single, 50)
+        print("\n" + "=" * 60)
+        print(f"✅ Single round trip saves {saved:.1f} ms per login at p50 "
+              f"({saved / percentile(legacy, 50):.0%})")
+    return results
+
+
 if __name__ == "__main__":
-    test_vehicle_app_login()
+    parser = argparse.ArgumentParser(description="Vehicle App login test")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--timing", type=int, metavar="N", default=0,
+                        help="time N logins over the legacy and the single-round-trip path instead")
+    args = parser.parse_args()
+    client = get_client(args.target, default="local")
+    if args.timing:
+        time_login_paths(client, args.timing)
+    else:
+        test_vehicle_app_login(client)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the Vehicle App verification scripts
+
+One keep-alive connection pool per target, per-endpoint timeouts and a
+single target selector (--target or the VEHICLE_APP_TARGET environment
+variable) so every script talks to the same backend the same way.
+
+With a Tracer (see vehicle_tracing.py) every request carries a W3C
+traceparent header and is recorded as a client span with connect, send,
+time-to-first-byte, body download and JSON parse phases.
+"""
+
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from vehicle_tracing import SPAN_KIND_CLIENT, TRACEPARENT_HEADER
+
+TARGETS = {
+    "live": "https://reactapp.tcil.in/aiml/LATEST_BACK_VEHICLE",
+    "lan": "http://192.168.4.145:5000",
+    "local": "http://localhost:5000",
+}
+
+TARGET_ENV_VAR = "VEHICLE_APP_TARGET"
+
+# Scopes a request to one area instead of the server-wide /api/areas/switch setting
+AREA_HEADER = "X-Area"
+
+# Test driver used by the verification scripts; replace with a vehicle and DL from your database
+TEST_CREDENTIALS = {
+    "vehicle_number": "DL1LAN3660",
+    "driving_license": "BR5020230001371",
+}
+
+# Client-chosen key that makes a retried stop completion safe (the app sends one per queued completion)
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# (connect, read) timeouts in seconds, matched against the request path in order.
+# Auth and photo upload mirror the app's 30 s / 60 s AbortController timeouts.
+ENDPOINT_TIMEOUTS = [
+    (r"^/api/driver/authenticate(/v2)?$", (5, 30)),
+    (r"^/api/assignments/[^/]+/stops/[^/]+/complete$", (5, 60)),
+    (r"^/api/photo-uploads/", (5, 30)),
+    (r"^/api/assignments/[^/]+/(start-trip|end-trip)$", (5, 20)),
+    (r"^/api/assignments/", (5, 15)),
+    (r"^/api/areas/", (5, 15)),
+    (r"", (5, 10)),
+]
+_TIMEOUT_PATTERNS = [(re.compile(pattern), timeout) for pattern, timeout in ENDPOINT_TIMEOUTS]
+
+
+def resolve_target(target=None, default="local"):
+    """
+    Resolve a target name or URL to a base URL (without a trailing /api)
+
+    Precedence: explicit `target`, then $VEHICLE_APP_TARGET, then `default`.
+    """
+    target = target or os.environ.get(TARGET_ENV_VAR) or default
+    base_url = TARGETS.get(target, target)
+    if not base_url.startswith(("http://", "https://")):
+        raise ValueError(f"Unknown target '{target}' (expected one of {', '.join(TARGETS)} or a URL)")
+    base_url = base_url.rstrip("/")
+    if base_url.endswith("/api"):
+        base_url = base_url[:-len("/api")]
+    return base_url
+
+
+def timeout_for(path):
+    """Per-endpoint (connect, read) timeout for a request path"""
+    path = path.split("?", 1)[0]
+    for pattern, timeout in _TIMEOUT_PATTERNS:
+        if pattern.search(path):
+            return timeout
+    return _TIMEOUT_PATTERNS[-1][1]
+
+
+def add_target_argument(parser, default="local"):
+    """Add the shared --target option to an argparse parser"""
+    parser.add_argument(
+        "--target", default=None,
+        help=f"backend to test: {', '.join(TARGETS)} or a URL "
+             f"(default: ${TARGET_ENV_VAR} or '{default}')")
+
+
+# Phase timestamps (time.time_ns) of the request in flight on this thread
+_phases = threading.local()
+
+
+class _PhaseTiming:
+    """Records when a pooled connection connects, sends and gets the response headers"""
+
+    def connect(self):
+        _phases.connect_start = time.time_ns()
+        super().connect()
+        _phases.connect_end = time.time_ns()
+
+    def request(self, *args, **kwargs):
+        _phases.send_start = time.time_ns()
+        super().request(*args, **kwargs)
+        _phases.send_end = time.time_ns()
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        _phases.headers_received = time.time_ns()
+        return response
+
+
+class TracingHTTPConnection(_PhaseTiming, HTTPConnection):
+    pass
+
+
+class TracingHTTPSConnection(_PhaseTiming, HTTPSConnection):
+    pass
+
+
+class TracingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracingHTTPConnection
+
+
+class TracingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracingHTTPSConnection
+
+
+class TracingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record phase timings for tracing"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TracingHTTPConnectionPool,
+            "https": TracingHTTPSConnectionPool,
+        }
+
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def span_name(method, path):
+    """Span name for a request, with IDs folded so the same endpoint aggregates"""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path.split('?', 1)[0])}"
+
+
+class VehicleClient:
+    """Keep-alive requests session bound to one backend target (and optionally one area)"""
+
+    def __init__(self, target=None, default="local", pool_size=10, retries=0, area=None, tracer=None):
+        self.base_url = resolve_target(target, default)
+        self.area = area
+        self.tracer = tracer
+        self.session = requests.Session()
+        if area:
+            self.session.headers[AREA_HEADER] = area
+        adapter_class = TracingHTTPAdapter if tracer else HTTPAdapter
+        adapter = adapter_class(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, timeout=None, area=None, **kwargs):
+        """Send a request; `timeout` defaults to the per-endpoint value, `area` to the client's"""
+        if timeout is None:
+            timeout = timeout_for(path)
+        if area:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), AREA_HEADER: area}
+        if self.tracer is not None:
+            return self._traced_request(method, path, timeout, **kwargs)
+        return self.session.request(method, self.url(path), timeout=timeout, **kwargs)
+
+    def _traced_request(self, method, path, timeout, stream=False, **kwargs):
+        """Send a request as a client span (child of the tracer's current span) with phase spans"""
+        span = self.tracer.start_span(span_name(method, path), kind=SPAN_KIND_CLIENT,
+                                      **{"http.method": method, "url.path": path.split("?", 1)[0]})
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), TRACEPARENT_HEADER: span.traceparent}
+        _phases.__dict__.clear()
+        try:
+            # Stream so time-to-first-byte and body download are measured separately
+            response = self.session.request(method, self.url(path), timeout=timeout, stream=True, **kwargs)
+        except Exception as e:
+            span.set_error(e)
+            span.end()
+            raise
+
+        phases = _phases.__dict__
+        if "connect_end" in phases:
+            span.child("connect", phases["connect_start"], phases["connect_end"])
+        if "send_end" in phases:
+            send_start = max(phases["send_start"], phases.get("connect_end", 0))
+            span.child("send", send_start, phases["send_end"])
+            if "headers_received" in phases:
+                span.child("ttfb", phases["send_end"], phases["headers_received"])
+        if not stream:
+            body_start = time.time_ns()
+            response.content
+            span.child("body download", body_start, time.time_ns(), **{"http.response_bytes": len(response.content)})
+
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_error(f"HTTP {response.status_code}")
+        span.end()
+
+        # JSON parsing happens when the caller asks for it; record it then
+        parse_json = response.json
+
+        def traced_json(**json_kwargs):
+            parse_start = time.time_ns()
+            try:
+                return parse_json(**json_kwargs)
+            finally:
+                span.child("body parse", parse_start, time.time_ns())
+
+        response.json = traced_json
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_shared_clients = {}
+
+
+def get_client(target=None, default="local", area=None):
+    """Process-wide client for a target (and area), so every check reuses the same pool"""
+    base_url = resolve_target(target, default)
+    client = _shared_clients.get((base_url, area))
+    if client is None:
+        client = _shared_clients[(base_url, area)] = VehicleClient(base_url, area=area)
+    return client
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Concurrent load generator for the Vehicle App endpoints
+
+Replays an endpoint table with N simulated drivers in parallel and reports
+per-endpoint latency percentiles, throughput and error-class counts.
+"""
+
+import bisect
+import collections
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from vehicle_client import VehicleClient
+
+DEFAULT_TEST_DATA = {
+    "vehicle_number": "TEST123",
+    "driving_license": "TESTDL123"
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def classify_response(status_code):
+    """Map an HTTP status to an error class ('ok' for success)"""
+    if 200 <= status_code < 300:
+        return "ok"
+    if status_code == 304:
+        # Conditional GET answered from the client's cached copy
+        return "not_modified"
+    if status_code in (400, 404, 422):
+        # The live checks treat these as "endpoint reachable" for test data
+        return "http_4xx_expected"
+    if 400 <= status_code < 500:
+        return "http_4xx"
+    if status_code >= 500:
+        return "http_5xx"
+    return f"http_{status_code}"
+
+
+def classify_exception(error):
+    """Map a requests exception to an error class"""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        # From raise_for_status(): the backend answered
+        return classify_response(error.response.status_code)
+    if isinstance(error, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return "connect_error"
+    return "request_error"
+
+
+class EndpointStats:
+    """Latency samples and error counts for a single endpoint"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies_ms = []
+        self.error_classes = {}
+
+    def record(self, latency_ms, error_class):
+        self.latencies_ms.append(latency_ms)
+        self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+
+    @property
+    def count(self):
+        return len(self.latencies_ms)
+
+    def summary(self, elapsed_s):
+        ordered = sorted(self.latencies_ms)
+        return {
+            "endpoint": self.name,
+            "requests": self.count,
+            "p50_ms": percentile(ordered, 50),
+            "p95_ms": percentile(ordered, 95),
+            "p99_ms": percentile(ordered, 99),
+            "max_ms": ordered[-1] if ordered else None,
+            "throughput_rps": self.count / elapsed_s if elapsed_s > 0 else 0.0,
+            "errors": dict(self.error_classes),
+        }
+
+
+class LoadRecorder:
+    """
+    Thread-safe collection of EndpointStats keyed by endpoint name
+
+    Every sample is also passed to `sink` (e.g. a results_store.StoredRun)
+    when one is given.
+    """
+
+    def __init__(self, sink=None):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.sink = sink
+
+    def record(self, endpoint, latency_ms, error_class):
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(endpoint)
+            stats.record(latency_ms, error_class)
+        if self.sink is not None:
+            self.sink.record(endpoint, latency_ms, error_class)
+
+    def summaries(self, elapsed_s):
+        with self._lock:
+            return [stats.summary(elapsed_s) for stats in self.endpoints.values()]
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Error classes that count as a healthy answer for probes and soak runs
+HEALTHY_CLASSES = ("ok", "not_modified", "http_4xx_expected")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram: constant memory however many samples it sees"""
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.errors = 0
+
+    def observe(self, latency_ms, error=False):
+        self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        if error:
+            self.errors += 1
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.sum_ms += other.sum_ms
+        self.errors += other.errors
+        return self
+
+    def quantile(self, q):
+        """Estimate the q-quantile (0-1) by interpolating inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets_ms[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets_ms):
+                    # Open-ended bucket: the best bound we have is its lower edge
+                    return float(lower)
+                return lower + (self.buckets_ms[index] - lower) * (rank - seen) / count
+            seen += count
+        return float(self.buckets_ms[-1])
+
+    @property
+    def error_rate(self):
+        return self.errors / self.count if self.count else 0.0
+
+    def cumulative(self):
+        """[(upper_bound_ms or None for +Inf, samples at or below it)]"""
+        running, rows = 0, []
+        for bound, count in zip(self.buckets_ms + (None,), self.counts):
+            running += count
+            rows.append((bound, running))
+        return rows
+
+
+class RollingHistogram:
+    """LatencyHistogram over the last `window_s` seconds, kept as a ring of time slots"""
+
+    def __init__(self, window_s=300, slot_s=10, buckets_ms=DEFAULT_BUCKETS_MS, clock=time.monotonic):
+        self.slot_s = slot_s
+        self.buckets_ms = buckets_ms
+        self.clock = clock
+        self.slots = collections.deque(maxlen=max(1, math.ceil(window_s / slot_s)))
+
+    def observe(self, latency_ms, error=False):
+        slot = int(self.clock() // self.slot_s)
+        if not self.slots or self.slots[-1][0] != slot:
+            self.slots.append((slot, LatencyHistogram(self.buckets_ms)))
+        self.slots[-1][1].observe(latency_ms, error)
+
+    def snapshot(self):
+        """Merged histogram of the slots still inside the window"""
+        oldest = int(self.clock() // self.slot_s) - self.slots.maxlen + 1
+        merged = LatencyHistogram(self.buckets_ms)
+        for slot, histogram in self.slots:
+            if slot >= oldest:
+                merged.merge(histogram)
+        return merged
+
+
+def timed_request(client, recorder, name, method, path, **kwargs):
+    """Issue one request, record its latency and error class, return the response"""
+    start = time.perf_counter()
+    try:
+        response = client.request(method, path, **kwargs)
+        # Drain the body so the connection goes back to the pool
+        response.content
+        error_class = classify_response(response.status_code)
+    except requests.exceptions.RequestException as e:
+        response = None
+        error_class = classify_exception(e)
+    latency_ms = (time.perf_counter() - start) * 1000.0
+    recorder.record(name, latency_ms, error_class)
+    return response
+
+
+def _driver_worker(base_url, endpoints, rounds, recorder, start_barrier,
+                   assignment_id, sequence, test_data):
+    """One simulated driver: a keep-alive client walking the endpoint table"""
+    with VehicleClient(base_url, pool_size=1) as client:
+        start_barrier.wait()
+        for _ in range(rounds):
+            for endpoint, method, description in endpoints:
+                path = endpoint.replace("{id}", str(assignment_id)).replace("{sequence}", str(sequence))
+                kwargs = {"json": test_data} if method == "POST" else {}
+                timed_request(client, recorder, endpoint, method, path, **kwargs)
+
+
+def run_load(base_url, endpoints, drivers=10, rounds=5, assignment_id=1, sequence=1,
+             test_data=None, sink=None):
+    """
+    Replay `endpoints` with `drivers` concurrent simulated drivers
+
+    All drivers are released together to mimic the morning route-start rush.
+    Per-endpoint timeouts come from vehicle_client.ENDPOINT_TIMEOUTS; every
+    sample also goes to `sink` if given (see LoadRecorder).
+    Returns (summaries, elapsed_seconds).
+    """
+    test_data = test_data or DEFAULT_TEST_DATA
+    recorder = LoadRecorder(sink)
+    start_barrier = threading.Barrier(drivers + 1)
+
+    with ThreadPoolExecutor(max_workers=drivers) as pool:
+        futures = [
+            pool.submit(_driver_worker, base_url, endpoints, rounds, recorder, start_barrier,
+                        assignment_id, sequence, test_data)
+            for _ in range(drivers)
+        ]
+        start_barrier.wait()
+        start = time.perf_counter()
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+
+    return recorder.summaries(elapsed), elapsed
+
+
+def _fmt_ms(value):
+    return f"{value:8.1f}" if value is not None else "     n/a"
+
+
+def print_load_report(summaries, elapsed, drivers):
+    """Print the per-endpoint latency/throughput/error table"""
+    total = sum(s["requests"] for s in summaries)
+    print("\n" + "=" * 60)
+    print(f"📊 Load Test Results ({drivers} drivers, {elapsed:.1f}s)")
+    print("=" * 60)
+    print(f"{'Endpoint':<50} {'reqs':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>7}")
+    for s in summaries:
+        print(f"{s['endpoint']:<50} {s['requests']:>6} {_fmt_ms(s['p50_ms'])} "
+              f"{_fmt_ms(s['p95_ms'])} {_fmt_ms(s['p99_ms'])} {s['throughput_rps']:>7.1f}")
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(s["errors"].items()))
+        print(f"   {errors}")
+    print(f"\n📈 Total: {total} requests, {total / elapsed if elapsed > 0 else 0:.1f} req/s")
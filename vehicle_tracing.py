@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Request tracing for the Vehicle App tools, the stand-in backend and the app
+
+Spans follow W3C Trace Context (the `traceparent` header) and are written
+to a local file as OTLP/JSON, one ExportTraceServiceRequest per line (the
+OpenTelemetry collector's file exporter format), so the file can be loaded
+into any OTLP viewer. The Python tools, the stand-in backend and the app
+(through the stand-in's POST /v1/traces) can all write to the same file,
+and a driver's whole route then reads as one timeline:
+
+    python standin_backend.py --port 5000 --latency-ms 80 --trace-file traces.jsonl &
+    python route_prefetch_benchmark.py --drivers 2 --stops 10 --trace-file traces.jsonl
+    python vehicle_tracing.py traces.jsonl
+
+Only the standard library is used; HTTP client instrumentation lives in
+vehicle_client.py.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+TRACEPARENT_HEADER = "traceparent"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def new_trace_id():
+    return os.urandom(16).hex()
+
+
+def new_span_id():
+    return os.urandom(8).hex()
+
+
+def parse_traceparent(value):
+    """(trace_id, parent_span_id) from a traceparent header, or None if missing or invalid"""
+    match = _TRACEPARENT_PATTERN.match((value or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Span:
+    """One timed operation; end() hands it to the tracer's sink"""
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, kind=SPAN_KIND_INTERNAL,
+                 start_ns=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = None
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_error(self, message):
+        self.status = (STATUS_ERROR, str(message))
+
+    def child(self, name, start_ns=None, end_ns=None, kind=SPAN_KIND_INTERNAL, **attributes):
+        """Start a child span; with end_ns it is recorded as already finished"""
+        span = Span(self.tracer, name, self.trace_id, self.span_id, kind, start_ns, attributes)
+        if end_ns is not None:
+            span.end(end_ns)
+        return span
+
+    def end(self, end_ns=None):
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+            self.tracer.record(self)
+        return self
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status:
+            span["status"] = {"code": self.status[0], "message": self.status[1]}
+        return span
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class SpanFileSink:
+    """Appends OTLP/JSON export requests to a file, one per line (thread-safe, shareable)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, export_request):
+        line = json.dumps(export_request, separators=(",", ":")) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class Tracer:
+    """
+    Creates spans for one service and batches finished ones to a sink
+
+    `span()` makes a span the current parent on this thread, so requests
+    sent inside it (see VehicleClient) join its trace.
+    """
+
+    def __init__(self, service_name, sink=None, batch_size=100):
+        self.service_name = service_name
+        self.sink = sink
+        self.batch_size = batch_size
+        self._finished = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def start_span(self, name, parent=None, traceparent=None, kind=SPAN_KIND_INTERNAL, **attributes):
+        """
+        Start a span under `parent` (a Span), a remote `traceparent` header,
+        or the current span of this thread; otherwise it starts a new trace
+        """
+        if parent is None and traceparent is None:
+            parent = self.current()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            remote = parse_traceparent(traceparent)
+            trace_id, parent_id = remote if remote else (new_trace_id(), None)
+        return Span(self, name, trace_id, parent_id, kind, attributes=attributes)
+
+    def span(self, name, **attributes):
+        """Context manager: a span that is the current parent until the block ends"""
+        return _ActiveSpan(self, self.start_span(name, **attributes))
+
+    def record(self, span):
+        with self._lock:
+            self._finished.append(span)
+            if len(self._finished) < self.batch_size:
+                return
+            batch, self._finished = self._finished, []
+        self._export(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._finished = self._finished, []
+        if batch:
+            self._export(batch)
+
+    def _export(self, spans):
+        if self.sink is not None:
+            self.sink.write(export_request(self.service_name, [span.to_otlp() for span in spans]))
+
+
+class _ActiveSpan:
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        stack = getattr(self.tracer._local, "stack", None)
+        if stack is None:
+            stack = self.tracer._local.stack = []
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._local.stack.pop()
+        if exc is not None:
+            self.span.set_error(exc)
+        self.span.end()
+
+
+def export_request(service_name, otlp_spans):
+    """OTLP/JSON ExportTraceServiceRequest for spans of one service"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "vehicle_tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+def add_tracing_argument(parser):
+    """Add the shared --trace-file option to an argparse parser"""
+    parser.add_argument("--trace-file", default=None,
+                        help="append request spans to this OTLP/JSON lines file")
+
+
+def tracer_from_args(args, service_name):
+    """Tracer writing to --trace-file, or None when tracing is off"""
+    if not args.trace_file:
+        return None
+    return Tracer(service_name, SpanFileSink(args.trace_file))
+
+
+# ------------------------------------------------------------------ timeline
+
+
+def load_spans(paths):
+    """Read spans from OTLP/JSON lines files, as flat dicts"""
+    spans = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for resource_spans in json.loads(line).get("resourceSpans", []):
+                    service = next((a["value"].get("stringValue") for a in resource_spans.get("resource", {})
+                                    .get("attributes", []) if a["key"] == "service.name"), "unknown")
+                    for scope_spans in resource_spans.get("scopeSpans", []):
+                        for span in scope_spans.get("spans", []):
+                            spans.append({
+                                "service": service,
+                                "trace_id": span["traceId"],
+                                "span_id": span["spanId"],
+                                "parent_id": span.get("parentSpanId") or None,
+                                "name": span["name"],
+                                "start_ns": int(span["startTimeUnixNano"]),
+                                "end_ns": int(span["endTimeUnixNano"]),
+                                "error": span.get("status", {}).get("code") == STATUS_ERROR,
+                            })
+    return spans
+
+
+def print_timeline(spans, width=40, max_spans=200):
+    """Waterfall of one trace: spans in start order, indented under their parents"""
+    children = defaultdict(list)
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children[parent].append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s["start_ns"])
+
+    origin = min(span["start_ns"] for span in spans)
+    total_ns = max(max(span["end_ns"] for span in spans) - origin, 1)
+    rows = []
+
+    def walk(parent, depth):
+        for span in children.get(parent, []):
+            rows.append((span, depth))
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    for span, depth in rows[:max_spans]:
+        offset = int((span["start_ns"] - origin) / total_ns * width)
+        length = max(1, int((span["end_ns"] - span["start_ns"]) / total_ns * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = ("  " * depth + span["name"])[:44]
+        mark = "❌" if span["error"] else "  "
+        print(f"{label:<44} {span['service'][:14]:<14} {(span['end_ns'] - span['start_ns']) / 1e6:>9.1f}ms "
+              f"{mark} |{bar:<{width}}|")
+    if len(rows) > max_spans:
+        print(f"... {len(rows) - max_spans} more spans")
+
+
+def print_phase_totals(spans):
+    """Where the time went: total and mean duration per span name (top-level spans excluded)"""
+    totals = defaultdict(lambda: [0, 0])
+    for span in spans:
+        if span["parent_id"] is None:
+            continue
+        entry = totals[(span["service"], span["name"])]
+        entry[0] += 1
+        entry[1] += span["end_ns"] - span["start_ns"]
+    print(f"\n{'service':<16} {'span':<40} {'count':>6} {'total':>10} {'mean':>9}")
+    for (service, name), (count, total_ns) in sorted(totals.items(), key=lambda item: -item[1][1])[:25]:
+        print(f"{service[:16]:<16} {name[:40]:<40} {count:>6} {total_ns / 1e6:>8.0f}ms {total_ns / count / 1e6:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render traces from OTLP/JSON lines files as timelines")
+    parser.add_argument("files", nargs="+", help="trace files written with --trace-file")
+    parser.add_argument("--trace", default=None, help="trace ID to show (default: the longest trace)")
+    parser.add_argument("--list", action="store_true", help="list traces instead of rendering one")
+    args = parser.parse_args()
+
+    traces = defaultdict(list)
+    for span in load_spans(args.files):
+        traces[span["trace_id"]].append(span)
+    if not traces:
+        print("❌ No spans found")
+        return
+
+    def duration_ms(trace_spans):
+        return (max(s["end_ns"] for s in trace_spans) - min(s["start_ns"] for s in trace_spans)) / 1e6
+
+    print("🧭 Vehicle App Trace Timeline")
+    print("=" * 60)
+    if args.list:
+        for trace_id, trace_spans in sorted(traces.items(), key=lambda item: -duration_ms(item[1])):
+            roots = [s["name"] for s in trace_spans if s["parent_id"] is None]
+            print(f"{trace_id}  {len(trace_spans):>5} spans  {duration_ms(trace_spans):>9.0f}ms  {roots[0] if roots else ''}")
+        return
+
+    trace_id = args.trace or max(traces, key=lambda t: duration_ms(traces[t]))
+    if trace_id not in traces:
+        print(f"❌ Trace {trace_id} not found ({len(traces)} traces in file)")
+        return
+    spans = traces[trace_id]
+    services = sorted({span["service"] for span in spans})
+    print(f"Trace {trace_id}: {len(spans)} spans, {duration_ms(spans):.0f}ms, services: {', '.join(services)}\n")
+    print_timeline(spans)
+    print_phase_totals(spans)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,31 @@
 """
 Comprehensive test to verify Vehicle_App connectivity to backend
 """
-import requests
+import argparse
 import json
 import time
 
-def test_vehicle_app_connectivity():
+from adb_fleet import add_fleet_arguments, run_fleet_check
+from vehicle_client import TEST_CREDENTIALS, add_target_argument, get_client, resolve_target
+
+# (name, method, path, json body) of the HTTP checks below; probe_daemon.py runs them on a schedule
+HTTP_CHECKS = [
+    ("backend_status", "GET", "/", None),
+    ("pickup_areas", "GET", "/api/pickup/areas", None),
+    ("driver_authenticate_v2", "POST", "/api/driver/authenticate/v2", TEST_CREDENTIALS),
+]
+
+def test_vehicle_app_connectivity(client=None):
     """Test Vehicle_App connectivity comprehensively"""
+    client = client or get_client(default="local")
     print("🔍 Comprehensive Vehicle_App Connectivity Test")
     print("=" * 60)
+    print(f"Target: {client.base_url}")
     
     # Test 1: Backend server status
     print("📡 Test 1: Backend server status...")
     try:
-        response = requests.get('http://localhost:5000/')
+        response = client.get('/')
         if response.status_code == 200:
             print("✅ Backend server is running and accessible")
             print(f"   Response: {response.json()}")
@@ -44,7 +56,7 @@ def test_vehicle_app_connectivity():
     # Test 3: API endpoints
     print("\n📡 Test 3: API endpoints...")
     try:
-        response = requests.get('http://localhost:5000/api/pickup/areas')
+        response = client.get('/api/pickup/areas')
         if response.status_code == 200:
             data = response.json()
             areas = data.get('areas', [])
@@ -59,13 +71,10 @@ def test_vehicle_app_connectivity():
     print("\n📡 Test 4: Vehicle_App authentication endpoint...")
     try:
         # Test with real credentials
-        test_data = {
-            "vehicle_number": "DL1LAN3660",
-            "driving_license": "BR5020230001371"
-        }
+        test_data = TEST_CREDENTIALS
         
-        response = requests.post(
-            'http://localhost:5000/api/driver/authenticate/v2',
+        response = client.post(
+            '/api/driver/authenticate/v2',
             json=test_data,
             headers={'Content-Type': 'application/json'}
         )
@@ -134,12 +143,22 @@ def provide_test_instructions():
 
 def main():
     """Main test function"""
+    parser = argparse.ArgumentParser(description="Vehicle_App connectivity verification")
+    add_target_argument(parser, default="local")
+    parser.add_argument("--fleet", action="store_true",
+                        help="check every attached device in parallel instead of the single implicit one")
+    add_fleet_arguments(parser)
+    args = parser.parse_args()
+    
     print("🚀 Vehicle_App Connectivity Verification")
     print("=" * 60)
     
-    check_mobile_device()
+    if args.fleet:
+        run_fleet_check(resolve_target(args.target, default="local"), args.adb, args.workers, args.adb_timeout)
+    else:
+        check_mobile_device()
     
-    if test_vehicle_app_connectivity():
+    if test_vehicle_app_connectivity(get_client(args.target, default="local")):
         print("\n✅ All connectivity tests passed!")
         print("🚀 Vehicle_App should now work correctly")
     else: